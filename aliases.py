@@ -0,0 +1,117 @@
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+
+from normalization import normalize_name
+
+# --- Resoluções Manuais de Nomes ---
+#
+# Quando alguém resolve à mão uma ambiguidade (ou confirma uma coincidência
+# parcial ou uma sugestão), a escolha fica guardada em um arquivo SQLite:
+# nome padronizado da série -> matrícula. Nas próximas provas, esses alunos são
+# resolvidos por uma consulta ao dicionário, antes de qualquer comparação.
+#
+# Para importar as resoluções de um relatório de ocorrências, basta deixar em
+# cada bloco só a linha da matrícula correta, ou marcar a linha correta com '*'
+# no início (ex.: "* - Matrícula: 123, ..."). Coincidências parciais e sugestões
+# de nomes parecidos já vêm com uma linha só (ou sem revisão nenhuma), então só
+# são importadas se estiverem marcadas.
+
+PADRAO_ALUNO = re.compile(r"^Aluno da Série: '(.*)' \(Nota: .*\)$")
+PADRAO_MATRICULA = re.compile(r"^\s*(\*?)\s*-\s*Matrícula:\s*([^,]+),")
+SEPARADOR = '----------------------------------------'
+MARCA_AMBIGUIDADE = 'Possíveis correspondências (Ambíguas)'
+
+
+class AliasStore:
+    """Resoluções manuais (nome padronizado -> matrícula) guardadas em SQLite."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS resolucoes ("
+            " nome_std TEXT PRIMARY KEY,"
+            " matricula TEXT NOT NULL,"
+            " origem TEXT,"
+            " atualizado_em TEXT)"
+        )
+        return conn
+
+    def load(self):
+        """Retorna todas as resoluções em um dicionário (vazio se o arquivo não existir ou estiver ilegível)."""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with closing(sqlite3.connect(self.path)) as conn:
+                return dict(conn.execute("SELECT nome_std, matricula FROM resolucoes"))
+        except sqlite3.Error:
+            return {}
+
+    def add(self, nome, matricula, origem=None):
+        """Grava (ou substitui) a resolução de um nome da série."""
+        self.add_many([(nome, matricula)], origem)
+
+    def add_many(self, pairs, origem=None):
+        agora = time.strftime('%Y-%m-%d %H:%M:%S')
+        rows = [(normalize_name(str(nome).strip().upper()), str(matricula).strip(), origem, agora) for nome, matricula in pairs]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO resolucoes VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def remove(self, nome):
+        """Apaga a resolução de um nome; retorna se ela existia."""
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute("DELETE FROM resolucoes WHERE nome_std = ?", (normalize_name(nome.strip().upper()),))
+            return cursor.rowcount > 0
+
+    def items(self):
+        """Lista (nome padronizado, matrícula, origem, data) em ordem de nome."""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT nome_std, matricula, origem, atualizado_em FROM resolucoes ORDER BY nome_std").fetchall()
+
+    def import_report(self, report_path):
+        """Importa as resoluções de um relatório TXT. Retorna (importadas, blocos sem resolução)."""
+        with open(report_path, 'r', encoding='utf-8') as f:
+            pairs, pending = parse_report(f.read())
+        if pairs:
+            self.add_many(pairs, origem=report_path)
+        return len(pairs), pending
+
+
+def parse_report(text):
+    """
+    Lê os blocos de um relatório de ocorrências/coincidências parciais. Retorna os
+    pares (nome da série, matrícula) resolvidos e quantos blocos ficaram sem resolução.
+    """
+    pairs, pending = [], 0
+    nome, candidatos, marcados, ambiguo = None, [], [], False
+    for line in text.splitlines() + [SEPARADOR]:
+        match_aluno = PADRAO_ALUNO.match(line.strip())
+        if match_aluno:
+            nome, candidatos, marcados, ambiguo = match_aluno.group(1), [], [], False
+        elif nome is None:
+            continue
+        elif line.strip() == SEPARADOR:
+            if len(marcados) == 1:
+                pairs.append((nome, marcados[0]))
+            elif len(candidatos) == 1 and not marcados and ambiguo:
+                # Só em ocorrências: apagar as outras linhas é uma decisão explícita
+                pairs.append((nome, candidatos[0]))
+            else:
+                pending += 1
+            nome = None
+        elif MARCA_AMBIGUIDADE in line:
+            ambiguo = True
+        else:
+            match_matricula = PADRAO_MATRICULA.match(line)
+            if match_matricula:
+                candidatos.append(match_matricula.group(2).strip())
+                if match_matricula.group(1):
+                    marcados.append(match_matricula.group(2).strip())
+    return pairs, pending
@@ -0,0 +1,170 @@
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from gerar_planilha import COLUNA_NOTA, SERIES, generate_workbook
+from matching import prepare_roster
+from processing import match_serie, prepare_serie, read_serie, write_outputs
+from workbook import open_workbook, read_roster_sheet
+
+# --- Benchmark do Processamento ---
+#
+# Mede cada etapa do processamento (leitura, pré-processamento, comparação e
+# escrita) em planilhas sintéticas de vários tamanhos e grava os resultados em
+# JSON Lines (uma linha por execução), para comparar versões ao longo do tempo.
+#
+# Exemplo:
+#   python benchmarks/bench_process_excel.py --tamanhos 100 1000 10000 100000
+
+TAMANHOS_PADRAO = [100, 1000, 10000, 100000]
+ARQUIVO_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resultados.jsonl')
+
+
+def run_phases(excel_path, destination_path):
+    """Executa o processamento de uma série, etapa por etapa, retornando as etapas e o resultado."""
+    workbook = open_workbook(excel_path)
+    try:
+        df_serie, = read_serie(workbook, SERIES[0], [COLUNA_NOTA])
+        df_lista_alunos = read_roster_sheet(workbook)
+    finally:
+        workbook.close()
+    yield 'leitura'
+
+    roster = prepare_roster(df_lista_alunos)
+    df_serie = prepare_serie(df_serie)
+    yield 'pre_processamento'
+
+    result = match_serie(df_serie, roster, SERIES[0], "Benchmark")
+    yield 'comparacao'
+
+    write_outputs(result, destination_path)
+    yield 'escrita'
+
+    yield result
+
+
+def time_phases(excel_path, destination_path):
+    """Tempo (segundos) de cada etapa, sem rastreamento de memória."""
+    timings = {}
+    start = time.perf_counter()
+    for step in run_phases(excel_path, destination_path):
+        if isinstance(step, str):
+            now = time.perf_counter()
+            timings[step] = round(now - start, 6)
+            start = now
+        else:
+            result = step
+    return timings, result
+
+
+def memory_phases(excel_path, destination_path):
+    """Pico de memória alocada (bytes, via tracemalloc) em cada etapa."""
+    peaks = {}
+    tracemalloc.start()
+    try:
+        for step in run_phases(excel_path, destination_path):
+            if isinstance(step, str):
+                peaks[step] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.reset_peak()
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def peak_rss():
+    """Pico de memória do processo (bytes), quando o sistema informa."""
+    try:
+        import resource
+    except ImportError: # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark_size(num_alunos, work_dir, repeticoes, memoria):
+    """Gera (ou reaproveita) a planilha de um tamanho e mede o processamento."""
+    excel_path = os.path.join(work_dir, f"sintetica_{num_alunos}.xlsx")
+    if not os.path.exists(excel_path):
+        generate_workbook(excel_path, num_alunos)
+
+    runs = []
+    for _ in range(repeticoes):
+        with tempfile.TemporaryDirectory() as destination_path:
+            gc.collect()
+            timings, result = time_phases(excel_path, destination_path)
+        runs.append(timings)
+
+    # Melhor tempo de cada etapa entre as repetições (menos sujeito a ruído)
+    best = {phase: min(run[phase] for run in runs) for phase in runs[0]}
+    entry = {
+        'alunos': num_alunos,
+        'tempos_s': best,
+        'total_s': round(sum(best.values()), 6),
+        'alunos_serie': result.total_alunos,
+        'encontrados': len(result.matched_alunos),
+        'parciais': len(result.partial_matches_log),
+        'ambiguos': len(result.ambiguities_list),
+        'nao_encontrados': len(result.not_found_alunos),
+    }
+    if memoria:
+        with tempfile.TemporaryDirectory() as destination_path:
+            entry['pico_memoria_bytes'] = memory_phases(excel_path, destination_path)
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do processamento de notas em planilhas sintéticas.")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO, help="Números de alunos a testar.")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Execuções por tamanho (vale o melhor tempo).")
+    parser.add_argument('--sem-memoria', action='store_true', help="Não mede os picos de memória (tracemalloc).")
+    parser.add_argument('--pasta', default=os.path.join(tempfile.gettempdir(), 'notas_benchmark'),
+                        help="Onde guardar as planilhas geradas (reaproveitadas entre execuções).")
+    parser.add_argument('--saida', default=ARQUIVO_RESULTADOS, help="Arquivo JSON Lines onde o resultado é acrescentado.")
+    args = parser.parse_args()
+
+    os.makedirs(args.pasta, exist_ok=True)
+    results = []
+    for num_alunos in args.tamanhos:
+        entry = benchmark_size(num_alunos, args.pasta, args.repeticoes, not args.sem_memoria)
+        results.append(entry)
+        tempos = ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in entry['tempos_s'].items())
+        print(f"{num_alunos:>7} alunos: {entry['total_s']:.3f}s ({tempos})")
+
+    run = {
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'revisao': git_revision(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'plataforma': platform.platform(),
+        'pico_rss_bytes': peak_rss(),
+        'resultados': results,
+    }
+    with open(args.saida, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run, ensure_ascii=False) + '\n')
+    print(f"Resultados acrescentados em '{args.saida}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import argparse
+import random
+
+import openpyxl
+
+# --- Gerador de Planilhas Sintéticas ---
+#
+# Gera um arquivo Excel no formato descrito no README: planilhas '1ª Série',
+# '2ª Série', '3ª Série' (nomes a partir da linha 7, nota geral na coluna N) e
+# 'Lista de Alunos' (matrícula na coluna A e nome completo na coluna B, a partir
+# da linha 1). Os nomes imitam os casos reais: acentos, nomes truncados,
+# nomes repetidos, nomes ambíguos e erros de digitação.
+
+SERIES = ["1ª Série", "2ª Série", "3ª Série"]
+PLANILHA_LISTA_ALUNOS = "Lista de Alunos"
+LINHA_INICIAL_SERIE = 7
+COLUNA_NOTA = 13 # Coluna N (base zero)
+
+PRIMEIROS_NOMES = [
+    "João", "José", "Ana", "Maria", "Luíza", "Lúcia", "Ícaro", "Ângela", "Cecília", "Inês",
+    "Vitória", "Caio", "Tânia", "Conceição", "Júlia", "Gabriel", "Rafael", "Letícia", "Mônica",
+    "Sérgio", "Fábio", "Márcia", "Élio", "Débora", "Heitor", "Lívia", "Otávio", "Bárbara",
+    "Mariana", "Antônio", "Benedito", "Cláudia", "Rosângela", "Vinícius", "Natália", "Iúri",
+]
+SOBRENOMES = [
+    "Silva", "Souza", "Araújo", "Conceição", "Gonçalves", "Falcão", "Magalhães", "Brandão",
+    "Simões", "Guimarães", "Assunção", "Oliveira", "Santos", "Pereira", "Lima", "Carvalho",
+    "Gomes", "Ribeiro", "Almeida", "Nascimento", "Barbosa", "Sá", "Leão", "Müller", "Mendonça",
+    "Vieira", "Rocha", "Monteiro", "Cardoso", "Teixeira", "Peçanha", "Aragão", "Lopes", "Batista",
+]
+PARTICULAS = ["de", "da", "do", "dos", "das", "e"]
+
+
+def random_name(rng):
+    """Gera um nome completo com acentos e partículas (DE, DA, DOS...)."""
+    partes = [rng.choice(PRIMEIROS_NOMES)]
+    if rng.random() < 0.3:
+        partes.append(rng.choice(PRIMEIROS_NOMES))
+    for _ in range(rng.randint(2, 4)):
+        if rng.random() < 0.25:
+            partes.append(rng.choice(PARTICULAS))
+        partes.append(rng.choice(SOBRENOMES))
+    return " ".join(partes).upper()
+
+
+def truncate_name(rng, nome):
+    """Nome truncado, como aparece quando a célula corta os últimos sobrenomes."""
+    partes = nome.split()
+    return " ".join(partes[:rng.randint(2, max(2, len(partes) - 1))])
+
+
+def typo_name(rng, nome):
+    """Nome com uma letra trocada ou faltando (não será encontrado pela regra atual)."""
+    posicao = rng.randrange(1, len(nome))
+    if rng.random() < 0.5:
+        return nome[:posicao] + nome[posicao + 1:]
+    return nome[:posicao] + rng.choice("AEIOURSTN") + nome[posicao + 1:]
+
+
+def build_roster(rng, num_alunos):
+    """Lista de alunos com alguns nomes repetidos e alguns nomes que estendem outros (ambíguos)."""
+    nomes = []
+    for _ in range(num_alunos):
+        sorteio = rng.random()
+        if nomes and sorteio < 0.01:
+            nomes.append(rng.choice(nomes)) # Homônimo exato
+        elif nomes and sorteio < 0.03:
+            nomes.append(rng.choice(nomes) + " " + rng.choice(SOBRENOMES).upper()) # Estende outro nome
+        else:
+            nomes.append(random_name(rng))
+    return [(100000 + posicao, nome) for posicao, nome in enumerate(nomes)]
+
+
+def serie_name_for(rng, nome):
+    """Como o nome do aluno aparece na planilha da série."""
+    sorteio = rng.random()
+    if sorteio < 0.08:
+        return truncate_name(rng, nome)
+    if sorteio < 0.12:
+        return typo_name(rng, nome)
+    if sorteio < 0.20:
+        return nome.lower() if rng.random() < 0.5 else nome.title()
+    if sorteio < 0.25:
+        return "  " + nome + " "
+    return nome
+
+
+def random_grade(rng):
+    """Nota como aparece nas planilhas: número, texto com vírgula, vazia ou inválida."""
+    sorteio = rng.random()
+    if sorteio < 0.03:
+        return None
+    if sorteio < 0.04:
+        return "AUSENTE"
+    nota = round(rng.uniform(0, 10), 2)
+    if sorteio < 0.15:
+        return f"{nota}".replace('.', ',')
+    return nota
+
+
+def generate_workbook(path, num_alunos, seed=0):
+    """Gera o arquivo Excel sintético com num_alunos alunos no total."""
+    rng = random.Random(seed)
+    roster = build_roster(rng, num_alunos)
+
+    workbook = openpyxl.Workbook(write_only=True)
+    alunos = list(roster)
+    rng.shuffle(alunos)
+    por_serie = len(alunos) // len(SERIES)
+    for numero, serie in enumerate(SERIES):
+        sheet = workbook.create_sheet(serie)
+        for linha in range(LINHA_INICIAL_SERIE - 1):
+            sheet.append([f"Cabeçalho {linha + 1}"])
+        fim = len(alunos) if numero == len(SERIES) - 1 else (numero + 1) * por_serie
+        for _, nome in alunos[numero * por_serie:fim]:
+            linha = [serie_name_for(rng, nome)] + [rng.choice(["A", "B", "C", "D", "E"]) for _ in range(COLUNA_NOTA - 1)]
+            linha.append(random_grade(rng))
+            sheet.append(linha)
+            if rng.random() < 0.02:
+                sheet.append(linha) # Linha repetida na série
+
+    lista = workbook.create_sheet(PLANILHA_LISTA_ALUNOS)
+    for matricula, nome in roster:
+        lista.append([matricula, nome])
+    workbook.save(path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um arquivo Excel sintético para testes de desempenho.")
+    parser.add_argument('arquivo', help="Caminho do .xlsx a gerar.")
+    parser.add_argument('-n', '--alunos', type=int, default=1000, help="Número de alunos (padrão: 1000).")
+    parser.add_argument('--semente', type=int, default=0, help="Semente do gerador aleatório.")
+    args = parser.parse_args()
+    generate_workbook(args.arquivo, args.alunos, args.semente)
+    print(f"Arquivo gerado: {args.arquivo} ({args.alunos} alunos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+import zipfile
+from posixpath import join as zip_join, normpath as zip_normpath
+
+import numpy as np
+import pandas as pd
+
+# --- Cache Local (Lista de Alunos, Planilhas e Estado das Séries) ---
+#
+# A 'Lista de Alunos' padronizada e o seu índice de busca são gravados em disco.
+# A chave rápida (caminho, tamanho, data de modificação) evita qualquer leitura
+# do arquivo quando ele não mudou; se o arquivo foi salvo de novo, o hash do
+# conteúdo da planilha decide se a lista ainda é a mesma (ex.: só as notas de
+# uma série foram corrigidas).
+#
+# As colunas lidas de cada planilha ficam em arquivos colunares (.npy), para
+# que o .xlsx nem precise ser aberto enquanto não mudar. O estado de cada
+# (arquivo, série, prova) também fica aqui, para que uma nova execução só
+# compare as linhas da série que mudaram.
+
+CACHE_VERSION = 5 # Incrementar ao mudar o formato do cache (inclusive os atributos do RosterIndex) ou a padronização dos nomes
+TAMANHO_MAXIMO_CACHE = 256 * 1024 * 1024 # Bytes; entradas mais antigas são removidas acima disso
+ROSTER_CACHE_DIR = 'lista_alunos'
+STATE_CACHE_DIR = 'estado_series'
+SHEET_CACHE_DIR = 'planilhas'
+ARQUIVO_CHAVE_PLANILHAS = 'chave.txt'
+ARQUIVO_COLUNAS = 'colunas.json'
+ARQUIVO_CHAVES = f'chaves_v{CACHE_VERSION}.json' # Por versão: as chaves rápidas de outra versão levariam a entradas antigas
+
+NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+
+def workbook_fingerprint(excel_path):
+    """Chave rápida do arquivo: caminho absoluto, tamanho e data de modificação."""
+    stat = os.stat(excel_path)
+    return f"{os.path.abspath(excel_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+def _sheet_part_name(zf, sheet_name):
+    """Localiza, dentro do .xlsx, o arquivo XML de uma planilha pelo nome."""
+    workbook_xml = ET.fromstring(zf.read('xl/workbook.xml'))
+    rel_id = None
+    for sheet in workbook_xml.iter(f'{NS_MAIN}sheet'):
+        if sheet.get('name') == sheet_name:
+            rel_id = sheet.get(f'{NS_REL}id')
+            break
+    if rel_id is None:
+        return None
+
+    rels_xml = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    for rel in rels_xml.iter(f'{NS_PKG_REL}Relationship'):
+        if rel.get('Id') == rel_id:
+            target = rel.get('Target')
+            if target.startswith('/'):
+                return target.lstrip('/')
+            return zip_normpath(zip_join('xl', target))
+    return None
+
+
+def sheet_content_hash(excel_path, sheet_name):
+    """
+    Hash do conteúdo de uma planilha (XML da planilha + textos compartilhados).
+    Retorna None se o arquivo não for um .xlsx legível.
+    """
+    try:
+        with zipfile.ZipFile(excel_path) as zf:
+            part_name = _sheet_part_name(zf, sheet_name)
+            if part_name is None:
+                return None
+            digest = hashlib.sha256(f"v{CACHE_VERSION}|{sheet_name}|".encode('utf-8'))
+            digest.update(zf.read(part_name))
+            if 'xl/sharedStrings.xml' in zf.namelist():
+                digest.update(zf.read('xl/sharedStrings.xml'))
+            return digest.hexdigest()
+    except (zipfile.BadZipFile, KeyError, ET.ParseError, OSError):
+        return None
+
+
+def _atomic_write(path, data):
+    """Grava bytes em um arquivo temporário e o move para o destino."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class RosterCache:
+    """Cache em disco da lista de alunos padronizada e do seu índice."""
+
+    def __init__(self, cache_dir, max_bytes=TAMANHO_MAXIMO_CACHE):
+        self.cache_dir = os.path.join(cache_dir, ROSTER_CACHE_DIR)
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, content_hash):
+        return os.path.join(self.cache_dir, f"{content_hash}.pkl")
+
+    def _read_keys(self):
+        try:
+            with open(os.path.join(self.cache_dir, ARQUIVO_CHAVES), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _set_key(self, keys, fingerprint, content_hash):
+        """Associa a chave rápida ao hash, descartando versões antigas do mesmo arquivo."""
+        excel_path = fingerprint.split('|', 1)[0]
+        for key in [key for key in keys if key.split('|', 1)[0] == excel_path]:
+            del keys[key]
+        keys[fingerprint] = content_hash
+        self._write_keys(keys)
+
+    def _write_keys(self, keys):
+        # Chaves que apontam para entradas já removidas são descartadas
+        keys = {key: value for key, value in keys.items() if os.path.exists(self._entry_path(value))}
+        try:
+            _atomic_write(os.path.join(self.cache_dir, ARQUIVO_CHAVES), json.dumps(keys).encode('utf-8'))
+        except OSError:
+            pass # Outro processo pode estar gravando ao mesmo tempo; a chave rápida é só um atalho
+
+    def _read_entry(self, content_hash):
+        path = self._entry_path(content_hash)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Entrada corrompida ou de outra versão: descarta e reconstrói
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        os.utime(path) # Marca como usada recentemente (para a remoção das mais antigas)
+        return entry
+
+    def load(self, excel_path, sheet_name):
+        """Retorna a entrada em cache da planilha, ou None se precisar ser lida de novo."""
+        fingerprint = workbook_fingerprint(excel_path)
+        keys = self._read_keys()
+
+        content_hash = keys.get(fingerprint)
+        if content_hash is not None:
+            entry = self._read_entry(content_hash)
+            if entry is not None:
+                return entry
+
+        # O arquivo mudou (ou é novo): confere se a planilha em si continua igual
+        content_hash = sheet_content_hash(excel_path, sheet_name)
+        if content_hash is None:
+            return None
+        entry = self._read_entry(content_hash)
+        if entry is not None:
+            self._set_key(keys, fingerprint, content_hash)
+        return entry
+
+    def store(self, excel_path, sheet_name, entry):
+        """Grava a entrada no cache e remove as mais antigas se passar do limite."""
+        content_hash = sheet_content_hash(excel_path, sheet_name)
+        if content_hash is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        try:
+            _atomic_write(self._entry_path(content_hash), pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+            self.evict(keep=content_hash)
+        except OSError:
+            return # Falhar ao gravar o cache não impede o processamento
+
+        self._set_key(self._read_keys(), workbook_fingerprint(excel_path), content_hash)
+
+    def evict(self, keep=None):
+        """Remove as entradas usadas há mais tempo até o cache caber no limite."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pkl'):
+                path = os.path.join(self.cache_dir, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if keep is not None and path == self._entry_path(keep):
+                continue
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        """Apaga todas as entradas do cache."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            os.remove(os.path.join(self.cache_dir, name))
+
+
+class SheetCache:
+    """
+    Colunas já lidas das planilhas de cada arquivo, no formato colunar: cada
+    coluna numérica é um .npy e cada coluna de texto é o texto UTF-8 de todas as
+    células em sequência, mais os limites de cada célula e as células vazias
+    (como no Arrow). Os arquivos são lidos com np.load(mmap_mode='r').
+    Só a versão atual de cada arquivo Excel é mantida (chave rápida em chave.txt).
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = os.path.join(cache_dir, SHEET_CACHE_DIR)
+
+    def _workbook_dir(self, excel_path):
+        return os.path.join(self.cache_dir, hashlib.sha256(os.path.abspath(excel_path).encode('utf-8')).hexdigest())
+
+    def _entry_dir(self, excel_path, sheet_name, columns, start_row):
+        key = f"v{CACHE_VERSION}|{sheet_name}|{','.join(map(str, columns))}|{start_row}"
+        return os.path.join(self._workbook_dir(excel_path), hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+    def _read_fingerprint(self, excel_path):
+        try:
+            with open(os.path.join(self._workbook_dir(excel_path), ARQUIVO_CHAVE_PLANILHAS), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def load(self, excel_path, sheet_name, columns, start_row=1):
+        """Retorna o DataFrame das colunas pedidas, ou None se o arquivo mudou (ou a planilha não foi lida ainda)."""
+        if self._read_fingerprint(excel_path) != workbook_fingerprint(excel_path):
+            return None
+        entry_dir = self._entry_dir(excel_path, sheet_name, columns, start_row)
+        try:
+            with open(os.path.join(entry_dir, ARQUIVO_COLUNAS), 'r', encoding='utf-8') as f:
+                descricao = json.load(f)
+            data = {
+                position: _load_column(entry_dir, position, coluna)
+                for position, coluna in enumerate(descricao['colunas'])
+            }
+        except FileNotFoundError:
+            return None
+        except Exception:
+            shutil.rmtree(entry_dir, ignore_errors=True) # Entrada corrompida: a planilha é lida de novo
+            return None
+        return pd.DataFrame(data, index=pd.RangeIndex(descricao['linhas']), columns=range(len(data)))
+
+    def store(self, excel_path, sheet_name, columns, start_row, df):
+        """Grava as colunas lidas; falhar ao gravar não impede o processamento."""
+        workbook_dir = self._workbook_dir(excel_path)
+        fingerprint = workbook_fingerprint(excel_path)
+        try:
+            if self._read_fingerprint(excel_path) != fingerprint:
+                # Outra versão do arquivo: as planilhas dela não servem mais
+                shutil.rmtree(workbook_dir, ignore_errors=True)
+                os.makedirs(workbook_dir, exist_ok=True)
+                _atomic_write(os.path.join(workbook_dir, ARQUIVO_CHAVE_PLANILHAS), fingerprint.encode('utf-8'))
+
+            temp_dir = tempfile.mkdtemp(dir=workbook_dir, suffix='.tmp')
+            try:
+                descricao = {'linhas': len(df), 'colunas': []}
+                for position, column in enumerate(df.columns):
+                    coluna = _store_column(temp_dir, position, df[column])
+                    if coluna is None:
+                        return # Tipo de coluna sem formato colunar: a planilha continua sendo lida do .xlsx
+                    descricao['colunas'].append(coluna)
+                with open(os.path.join(temp_dir, ARQUIVO_COLUNAS), 'w', encoding='utf-8') as f:
+                    json.dump(descricao, f)
+                try:
+                    os.replace(temp_dir, self._entry_dir(excel_path, sheet_name, columns, start_row))
+                except OSError:
+                    pass # Outro processo gravou a mesma planilha antes
+            finally:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+        except OSError:
+            return
+
+    def clear(self):
+        """Apaga todas as planilhas do cache."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+def _store_column(entry_dir, position, series):
+    """Grava uma coluna (numérica ou de texto); retorna a sua descrição, ou None se o tipo não for suportado."""
+    if series.dtype.kind in 'biufcmM':
+        np.save(os.path.join(entry_dir, f"{position}.npy"), series.to_numpy())
+        return {'tipo': 'numpy'}
+    if series.dtype != object and not isinstance(series.dtype, pd.StringDtype):
+        return None
+
+    # Células de texto (ou mistas): valores não nulos como texto. O processamento
+    # converte estas colunas com map(str), que dá o mesmo texto que str(valor).
+    nulos = series.isna().to_numpy()
+    textos = ['' if nulo else str(valor) for valor, nulo in zip(series.tolist(), nulos)]
+    limites = np.zeros(len(textos) + 1, dtype=np.int64)
+    np.cumsum([len(texto) for texto in textos], out=limites[1:])
+    np.save(os.path.join(entry_dir, f"{position}.npy"), np.frombuffer(''.join(textos).encode('utf-8'), dtype=np.uint8))
+    np.save(os.path.join(entry_dir, f"{position}_limites.npy"), limites)
+    np.save(os.path.join(entry_dir, f"{position}_nulos.npy"), nulos)
+    return {'tipo': 'texto', 'dtype': str(series.dtype)}
+
+
+def _load_column(entry_dir, position, coluna):
+    """Lê uma coluna gravada por _store_column (os dados são copiados do arquivo mapeado)."""
+    valores = _load_npy(os.path.join(entry_dir, f"{position}.npy"))
+    if coluna['tipo'] == 'numpy':
+        return np.array(valores)
+
+    texto = valores.tobytes().decode('utf-8')
+    limites = _load_npy(os.path.join(entry_dir, f"{position}_limites.npy")).tolist()
+    nulos = _load_npy(os.path.join(entry_dir, f"{position}_nulos.npy")).tolist()
+    textos = [np.nan if nulo else texto[inicio:fim] for inicio, fim, nulo in zip(limites, limites[1:], nulos)]
+    # Com o dtype original: colunas mistas ('object') não viram 'str' só por conterem apenas textos agora
+    return pd.Series(textos, dtype=coluna['dtype'])
+
+
+def _load_npy(path):
+    return np.load(path, mmap_mode='r')
+
+
+class SerieStateStore:
+    """
+    Estado da última execução de cada (arquivo, série, prova): o resultado de cada
+    linha da série, para que uma nova execução só compare as linhas alteradas.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = os.path.join(cache_dir, STATE_CACHE_DIR)
+
+    def _entry_path(self, excel_path, serie_selecionada, prova_nome):
+        key = f"v{CACHE_VERSION}|{os.path.abspath(excel_path)}|{serie_selecionada}|{prova_nome}"
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.pkl')
+
+    def load(self, excel_path, serie_selecionada, prova_nome):
+        """Retorna o estado gravado, ou None se não houver (ou estiver ilegível)."""
+        try:
+            with open(self._entry_path(excel_path, serie_selecionada, prova_nome), 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            return None # Sem estado, ou corrompido: a série é processada por completo
+
+    def store(self, excel_path, serie_selecionada, prova_nome, state):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            _atomic_write(
+                self._entry_path(excel_path, serie_selecionada, prova_nome),
+                pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL),
+            )
+        except OSError:
+            pass # Sem o estado, a próxima execução apenas compara todas as linhas de novo
+
+    def clear(self):
+        """Apaga o estado de todas as séries."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            os.remove(os.path.join(self.cache_dir, name))
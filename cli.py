@@ -0,0 +1,353 @@
+import argparse
+import os
+import sys
+
+from aliases import AliasStore
+from common import ARQUIVO_RESOLUCOES, delta_file_name, get_output_path, parse_job_spec, report_file_name
+from parallel import process_workbooks, workbook_output_path
+from processing import ProcessingError
+from server import ENDERECO_PADRAO, PORTA_PADRAO, TRABALHADORES_PADRAO, serve
+from streaming import TAMANHO_BLOCO_PADRAO, process_workbook_chunked
+from watcher import ESPERA_PADRAO, INTERVALO_PADRAO, watch_folder
+
+# --- Modo de Linha de Comando (sem interface gráfica) ---
+#
+# Exemplo:
+#   python cli.py processar notas.xlsx -j "1ª Série:N:Simulado 1" -j "2ª Série:N:Simulado 1" -j "1ª Série:P:Redação"
+#   python cli.py processar unidade1.xlsx unidade2.xlsx -j "1ª Série:N:Simulado 1" --workers 8
+#   python cli.py processar consolidado.xlsx -j "1ª Série:N:Simulado 1" --blocos 50000
+#   python cli.py processar consolidado.xlsx -j "1ª Série:N:Simulado 1" --nucleos 8
+#   python cli.py monitorar "D:\Notas recebidas" -j "1ª Série:N:Simulado 1" -j "2ª Série:N:Simulado 1"
+#   python cli.py servir --porta 8765
+
+
+def parse_job(text):
+    """Converte 'SÉRIE:COLUNA:PROVA' em (série, índice da coluna, prova)."""
+    try:
+        return parse_job_spec(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_chunk_size(text):
+    """Tamanho do bloco: inteiro positivo."""
+    try:
+        value = int(text)
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"Tamanho de bloco inválido '{text}'. Use um número inteiro positivo de linhas.")
+    return value
+
+
+def parse_core_count(text):
+    """Número de processos da comparação de cada série: inteiro positivo."""
+    try:
+        value = int(text)
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"Número de processos inválido '{text}'. Use um número inteiro positivo.")
+    return value
+
+
+def print_result(result, destination_path, delta=False):
+    """Mostra o resumo de um trabalho no terminal."""
+    titulo = f"{result.serie_selecionada} - {result.prova_nome}"
+    if result.total_alunos == 0:
+        print(f"[{titulo}] Nenhum aluno com nota válida encontrado na planilha '{result.serie_selecionada}'.")
+        return
+
+    output_file_name_main, output_file_name_ambiguities, output_file_name_partial, output_file_name_not_found = result.file_names
+    print(f"[{titulo}] {result.total_alunos} alunos, {len(result.matched_alunos)} no arquivo principal.")
+    if result.matched_alunos:
+        print(f"  Arquivo principal: {os.path.join(destination_path, output_file_name_main)}")
+    else:
+        print("  Aviso: nenhum aluno correspondente único encontrado para o arquivo TXT principal.")
+    if result.has_partial_matches:
+        print(f"  {len(result.partial_matches_log)} coincidências parciais: verifique '{output_file_name_partial}'.")
+    if result.has_occurrences:
+        print(f"  {len(result.ambiguities_list)} coincidências ambíguas: verifique '{output_file_name_ambiguities}'.")
+    if result.not_found_alunos:
+        print(f"  {len(result.not_found_alunos)} alunos não encontrados: verifique '{output_file_name_not_found}'.")
+    if result.has_suggestions:
+        print(f"  {len(result.suggestions_log)} sugestões de nomes parecidos: verifique '{output_file_name_partial}'.")
+    if result.changed_alunos is not None:
+        print(f"  {len(result.changed_alunos)} notas novas ou alteradas desde a execução anterior.")
+        if delta:
+            print(f"  Alterações: {os.path.join(destination_path, delta_file_name(result.serie_selecionada, result.prova_nome))}")
+    for line in result.stats.summary().splitlines():
+        print(f"  {line}")
+    print(f"  Relatório: {report_file_name(result.serie_selecionada, result.prova_nome)}")
+
+
+def print_stream_result(result, destination_path):
+    """Mostra o resumo de um trabalho processado em blocos (só contadores: os alunos já estão nos arquivos)."""
+    titulo = f"{result.serie_selecionada} - {result.prova_nome}"
+    if result.total_alunos == 0:
+        print(f"[{titulo}] Nenhum aluno com nota válida encontrado na planilha '{result.serie_selecionada}'.")
+        return
+
+    output_file_name_main, output_file_name_ambiguities, output_file_name_partial, output_file_name_not_found = result.file_names
+    print(f"[{titulo}] {result.total_alunos} alunos, {result.count('encontrados')} no arquivo principal.")
+    if result.count('encontrados'):
+        print(f"  Arquivo principal: {os.path.join(destination_path, output_file_name_main)}")
+    else:
+        print("  Aviso: nenhum aluno correspondente único encontrado para o arquivo TXT principal.")
+    for contador, descricao, file_name in (
+        ('parciais', "coincidências parciais", output_file_name_partial),
+        ('ambiguos', "coincidências ambíguas", output_file_name_ambiguities),
+        ('nao_encontrados', "alunos não encontrados", output_file_name_not_found),
+        ('sugestoes', "sugestões de nomes parecidos", output_file_name_partial),
+    ):
+        if result.count(contador):
+            print(f"  {result.count(contador)} {descricao}: verifique '{file_name}'.")
+    for line in result.stats.summary().splitlines():
+        print(f"  {line}")
+    print(f"  Relatório: {report_file_name(result.serie_selecionada, result.prova_nome)}")
+
+
+def cmd_processar_blocos(args):
+    """Pipeline em blocos: um arquivo de cada vez, com memória limitada (ver streaming.py)."""
+    destination_path = args.saida or get_output_path()
+    several_workbooks = len(args.arquivos) > 1
+    exit_code = 0
+    for excel_path in args.arquivos:
+        if several_workbooks:
+            print(f"== {excel_path} ==")
+        output_path = workbook_output_path(destination_path, excel_path, several_workbooks)
+        try:
+            results = process_workbook_chunked(
+                excel_path, args.jobs, destination_path=output_path, chunk_size=args.blocos,
+                profile=args.perfil or None, trace_memory=args.memoria or None,
+                alias_path=args.resolucoes or os.path.join(destination_path, ARQUIVO_RESOLUCOES),
+            )
+        except ProcessingError as e:
+            print(f"{e.title}: {e.message}", file=sys.stderr)
+            exit_code = 1
+            continue
+        for result in results:
+            print_stream_result(result, output_path)
+    return exit_code
+
+
+def cmd_processar(args):
+    if args.blocos:
+        if args.alteracoes:
+            print("Aviso: --alteracoes não vale no processamento em blocos (sem estado da execução anterior).", file=sys.stderr)
+        if args.nucleos:
+            print("Aviso: --nucleos não vale no processamento em blocos (a comparação é feita em um só processo).", file=sys.stderr)
+        return cmd_processar_blocos(args)
+    destination_path = args.saida or get_output_path()
+    outcomes = process_workbooks(
+        args.arquivos, args.jobs, destination_path=destination_path, workers=args.workers,
+        profile=args.perfil or None, trace_memory=args.memoria or None,
+        incremental=not args.completo, delta=args.alteracoes,
+        alias_path=args.resolucoes or os.path.join(destination_path, ARQUIVO_RESOLUCOES), match_workers=args.nucleos,
+    )
+
+    exit_code = 0
+    several_workbooks = len(args.arquivos) > 1
+    for excel_path, outcome in outcomes:
+        if several_workbooks:
+            print(f"== {excel_path} ==")
+        if isinstance(outcome, ProcessingError):
+            print(f"{outcome.title}: {outcome.message}", file=sys.stderr)
+            exit_code = 1
+            continue
+        for result in outcome:
+            print_result(result, workbook_output_path(destination_path, excel_path, several_workbooks), args.alteracoes)
+    return exit_code
+
+
+def cmd_monitorar(args):
+    if not os.path.isdir(args.pasta):
+        print(f"Pasta não encontrada: '{args.pasta}'.", file=sys.stderr)
+        return 1
+    destination_path = args.saida or get_output_path()
+
+    def on_result(excel_path, results, output_path, latency):
+        print(f"== {excel_path} (pronto {latency:.1f}s depois de salvo) ==")
+        for result in results:
+            print_result(result, output_path, args.alteracoes)
+        sys.stdout.flush()
+
+    def on_error(excel_path, error):
+        print(f"== {excel_path} ==\n{error.title}: {error.message}", file=sys.stderr)
+
+    print(f"Monitorando '{args.pasta}' (Ctrl+C para encerrar). Resultados em '{destination_path}'.")
+    sys.stdout.flush()
+    try:
+        watch_folder(
+            args.pasta, args.jobs, destination_path=destination_path, interval=args.intervalo, settle=args.espera,
+            skip_existing=args.ignorar_existentes, incremental=not args.completo, delta=args.alteracoes,
+            alias_path=args.resolucoes or os.path.join(destination_path, ARQUIVO_RESOLUCOES),
+            on_result=on_result, on_error=on_error,
+        )
+    except KeyboardInterrupt:
+        print("Monitoramento encerrado.")
+    return 0
+
+
+def cmd_servir(args):
+    print(f"Serviço de processamento em http://{args.endereco}:{args.porta} (Ctrl+C para encerrar).")
+    sys.stdout.flush()
+    try:
+        serve(args.endereco, args.porta, workers=args.trabalhadores, alias_path=args.resolucoes)
+    except OSError as e:
+        print(f"Não foi possível iniciar o serviço em {args.endereco}:{args.porta}: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        print("Serviço encerrado.")
+    return 0
+
+
+def cmd_resolucoes(args):
+    store = AliasStore(args.arquivo or os.path.join(get_output_path(), ARQUIVO_RESOLUCOES))
+    if args.acao == 'importar':
+        for report_path in args.relatorios:
+            try:
+                imported, pending = store.import_report(report_path)
+            except OSError as e:
+                print(f"Não foi possível ler '{report_path}': {e}", file=sys.stderr)
+                return 1
+            print(f"{report_path}: {imported} resoluções importadas, {pending} blocos sem resolução.")
+    elif args.acao == 'adicionar':
+        store.add(args.nome, args.matricula, origem='manual')
+        print(f"Resolução gravada: '{args.nome}' -> {args.matricula}.")
+    elif args.acao == 'remover':
+        if not store.remove(args.nome):
+            print(f"Nenhuma resolução para '{args.nome}'.", file=sys.stderr)
+            return 1
+        print(f"Resolução de '{args.nome}' removida.")
+    else:
+        for nome_std, matricula, origem, atualizado_em in store.items():
+            print(f"{nome_std}\t{matricula}\t{atualizado_em}\t{origem or ''}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Processador de Notas (modo sem interface gráfica).")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    processar = subparsers.add_parser(
+        'processar',
+        help="Processa várias séries/colunas de nota de um arquivo Excel de uma só vez.",
+    )
+    processar.add_argument(
+        'arquivos', nargs='+', metavar='arquivo',
+        help="Arquivo(s) Excel (.xlsx) com as planilhas das séries e a 'Lista de Alunos'. "
+             "Com vários arquivos, cada um grava em uma subpasta com o seu nome.",
+    )
+    processar.add_argument(
+        '-j', '--job', dest='jobs', action='append', type=parse_job, required=True, metavar='SÉRIE:COLUNA:PROVA',
+        help="Trabalho a processar (pode ser repetido), ex: '1ª Série:N:Simulado 1'.",
+    )
+    processar.add_argument('-o', '--saida', help="Diretório de saída (padrão: o mesmo da interface gráfica).")
+    processar.add_argument(
+        '-w', '--workers', type=int, default=None,
+        help="Número de processos em paralelo (padrão: número de núcleos do computador).",
+    )
+    processar.add_argument('--perfil', action='store_true', help="Inclui no relatório JSON o perfil do cProfile (o mesmo que NOTAS_PERFIL=1).")
+    processar.add_argument('--memoria', action='store_true', help="Mede o pico de memória de cada etapa com tracemalloc (o mesmo que NOTAS_MEMORIA=1).")
+    processar.add_argument(
+        '--completo', action='store_true',
+        help="Compara todas as linhas de novo, ignorando os resultados guardados da execução anterior. O resultado "
+             "desta execução passa a ser a base do próximo arquivo de alterações.",
+    )
+    processar.add_argument(
+        '--alteracoes', action='store_true',
+        help="Grava também 'alteracoes {Série} - {Prova}.txt' só com as notas novas ou alteradas desde a execução anterior "
+             "(qualquer execução, com ou sem --alteracoes ou --completo).",
+    )
+    processar.add_argument(
+        '--resolucoes', metavar='ARQUIVO',
+        help=f"Arquivo das resoluções manuais de nomes (padrão: '{ARQUIVO_RESOLUCOES}' no diretório de saída).",
+    )
+    processar.add_argument(
+        '--blocos', type=parse_chunk_size, nargs='?', const=TAMANHO_BLOCO_PADRAO, default=None, metavar='LINHAS',
+        help=f"Processa em blocos de LINHAS linhas (padrão: {TAMANHO_BLOCO_PADRAO}), com memória limitada, para listas e séries "
+             "muito grandes. Um arquivo de cada vez, sem reaproveitar a execução anterior.",
+    )
+    processar.add_argument(
+        '--nucleos', type=parse_core_count, nargs='?', const=os.cpu_count() or 1, default=None, metavar='N',
+        help="Divide a comparação de cada série grande entre N processos (padrão: número de núcleos do computador). "
+             "O resultado é o mesmo da comparação em um só processo.",
+    )
+    processar.set_defaults(func=cmd_processar)
+
+    monitorar = subparsers.add_parser(
+        'monitorar',
+        help="Fica monitorando uma pasta e processa cada arquivo Excel novo ou alterado assim que ele é salvo.",
+    )
+    monitorar.add_argument('pasta', help="Pasta monitorada (os arquivos .xlsx salvos nela são processados).")
+    monitorar.add_argument(
+        '-j', '--job', dest='jobs', action='append', type=parse_job, required=True, metavar='SÉRIE:COLUNA:PROVA',
+        help="Trabalho a processar em cada arquivo (pode ser repetido), ex: '1ª Série:N:Simulado 1'.",
+    )
+    monitorar.add_argument(
+        '-o', '--saida',
+        help="Diretório de saída (padrão: o mesmo da interface gráfica); cada arquivo grava em uma subpasta com o seu nome.",
+    )
+    monitorar.add_argument(
+        '--intervalo', type=float, default=INTERVALO_PADRAO, help=f"Segundos entre duas verificações da pasta (padrão: {INTERVALO_PADRAO}).",
+    )
+    monitorar.add_argument(
+        '--espera', type=float, default=ESPERA_PADRAO,
+        help=f"Segundos sem mudanças no arquivo antes de processá-lo, para não ler uma gravação pela metade (padrão: {ESPERA_PADRAO}).",
+    )
+    monitorar.add_argument(
+        '--ignorar-existentes', action='store_true', help="Só processa arquivos salvos depois do início do monitoramento.",
+    )
+    monitorar.add_argument('--completo', action='store_true', help="Compara todas as linhas a cada vez (veja 'processar').")
+    monitorar.add_argument('--alteracoes', action='store_true', help="Grava também o arquivo de alterações (veja 'processar').")
+    monitorar.add_argument('--resolucoes', metavar='ARQUIVO', help="Arquivo das resoluções manuais de nomes (veja 'processar').")
+    monitorar.set_defaults(func=cmd_monitorar)
+
+    servir = subparsers.add_parser(
+        'servir',
+        help="Inicia o serviço local de processamento (HTTP), usado pela interface quando NOTAS_SERVIDOR aponta para ele.",
+    )
+    servir.add_argument(
+        '--endereco', default=ENDERECO_PADRAO,
+        help=f"Endereço de escuta (padrão: {ENDERECO_PADRAO}, só o próprio computador; use 0.0.0.0 para aceitar a rede local).",
+    )
+    servir.add_argument('--porta', type=int, default=PORTA_PADRAO, help=f"Porta do serviço (padrão: {PORTA_PADRAO}).")
+    servir.add_argument(
+        '--trabalhadores', type=int, default=TRABALHADORES_PADRAO,
+        help=f"Pedidos processados ao mesmo tempo (padrão: {TRABALHADORES_PADRAO}).",
+    )
+    servir.add_argument('--resolucoes', metavar='ARQUIVO', help="Arquivo das resoluções manuais de nomes (padrão: o da pasta de resultados).")
+    servir.set_defaults(func=cmd_servir)
+
+    resolucoes = subparsers.add_parser(
+        'resolucoes',
+        help="Gerencia as resoluções manuais de nomes (nome da série -> matrícula) usadas antes da comparação.",
+    )
+    resolucoes.add_argument(
+        '--arquivo', help=f"Arquivo das resoluções (padrão: '{ARQUIVO_RESOLUCOES}' na pasta de resultados).",
+    )
+    acoes = resolucoes.add_subparsers(dest='acao', required=True)
+    importar = acoes.add_parser(
+        'importar',
+        help="Importa dos relatórios de ocorrências os blocos com uma única matrícula (ou com a matrícula correta "
+             "marcada com '*') e dos de coincidências parciais os blocos marcados com '*'.",
+    )
+    importar.add_argument('relatorios', nargs='+', metavar='relatorio')
+    adicionar = acoes.add_parser('adicionar', help="Grava a matrícula de um nome da série.")
+    adicionar.add_argument('nome')
+    adicionar.add_argument('matricula')
+    remover = acoes.add_parser('remover', help="Apaga a resolução de um nome da série.")
+    remover.add_argument('nome')
+    acoes.add_parser('listar', help="Lista as resoluções gravadas.")
+    resolucoes.set_defaults(func=cmd_resolucoes)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
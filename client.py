@@ -0,0 +1,153 @@
+import getpass
+import json
+import os
+import socket
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from common import ProcessingError, column_index_to_letter, get_output_path, output_file_names
+from writer import OutputWriteError, OutputWriter
+
+# --- Cliente do Serviço Local de Processamento (server.py) ---
+#
+# Sem pandas/openpyxl: envia o arquivo Excel ao serviço e grava na pasta de
+# resultados os arquivos devolvidos, do mesmo jeito que o processamento local.
+# Na interface, é usado quando a variável de ambiente NOTAS_SERVIDOR aponta
+# para o serviço (ex: NOTAS_SERVIDOR=http://127.0.0.1:8765).
+
+VARIAVEL_SERVIDOR = 'NOTAS_SERVIDOR'
+TEMPO_LIMITE = 600 # Segundos de espera pela resposta do serviço
+
+
+def server_url():
+    """Endereço do serviço configurado no ambiente (ou None para processar localmente)."""
+    return os.environ.get(VARIAVEL_SERVIDOR, '').strip().rstrip('/') or None
+
+
+class _RemoteStats:
+    """Resumo dos tempos e contadores calculado pelo serviço."""
+
+    def __init__(self, summary_text):
+        self._summary = summary_text
+
+    def summary(self):
+        return self._summary
+
+
+class RemoteResult:
+    """Resultado de um trabalho processado pelo serviço, com os mesmos atributos de um SerieResult."""
+
+    def __init__(self, data):
+        self.serie_selecionada = data['serie']
+        self.prova_nome = data['prova']
+        self.total_alunos = data['total_alunos']
+        self.matched_alunos = data['encontrados']
+        self.ambiguities_list = data['ocorrencias']
+        self.partial_matches_log = data['parciais']
+        self.not_found_alunos = data['nao_encontrados']
+        self.suggestions_log = data['sugestoes']
+        self.changed_alunos = data['alteracoes']
+        self.stats = _RemoteStats(data['resumo'])
+        self.files = data['arquivos']
+        self.removed_files = data['remover']
+
+    @property
+    def has_occurrences(self):
+        return bool(self.ambiguities_list)
+
+    @property
+    def has_partial_matches(self):
+        return bool(self.partial_matches_log)
+
+    @property
+    def has_suggestions(self):
+        return bool(self.suggestions_log)
+
+    @property
+    def file_names(self):
+        return output_file_names(self.serie_selecionada, self.prova_nome)
+
+
+def client_id():
+    """Identifica este computador e usuário para o serviço, que separa por cliente as cópias dos arquivos enviados."""
+    try:
+        usuario = getpass.getuser()
+    except Exception: # Sem variável de ambiente nem conta conhecida
+        usuario = ''
+    return f"{usuario}@{socket.gethostname()}"
+
+
+def _request(url, params, data, timeout):
+    request = urllib.request.Request(f"{url}/processar?{urllib.parse.urlencode(params)}", data=data, method='POST', headers={'Content-Type': 'application/octet-stream'})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        try:
+            erro = json.loads(e.read().decode('utf-8'))['erro']
+        except (ValueError, KeyError, TypeError):
+            raise ProcessingError("Erro do Serviço", f"O serviço de processamento respondeu com erro {e.code}.", f"Erro: serviço ({e.code}).")
+        raise ProcessingError(erro['titulo'], erro['mensagem'], erro['status'])
+    except (urllib.error.URLError, OSError) as e:
+        raise ProcessingError(
+            "Erro de Conexão", f"Não foi possível acessar o serviço de processamento em '{url}'. Erro: {e}", "Erro: serviço indisponível.",
+        )
+
+
+def _write_files(result, destination_path):
+    writer = OutputWriter(destination_path)
+    for file_name, text in result.files.items():
+        writer.write(os.path.basename(file_name), text) # Só grava dentro da pasta de destino
+    for file_name in result.removed_files:
+        writer.remove(os.path.basename(file_name))
+    try:
+        writer.commit()
+    except (OutputWriteError, OSError) as e:
+        raise ProcessingError(
+            "Erro de Escrita",
+            f"Não foi possível salvar os arquivos de saída em '{getattr(e, 'file_name', None) or destination_path}'. Erro: {getattr(e, 'error', e)}",
+            "Erro de escrita.",
+        )
+
+
+def process_remote(url, excel_path, jobs, destination_path=None, progress=None, incremental=True, delta=False, cancel=None,
+                   timeout=TEMPO_LIMITE):
+    """
+    Processa os trabalhos (série, índice da coluna da nota, prova) no serviço em
+    `url` e grava os arquivos devolvidos em destination_path (padrão:
+    get_output_path()). Retorna os RemoteResult na ordem dos trabalhos. O
+    cancelamento (CancelToken) só vale antes do envio ou antes da gravação: o
+    serviço termina o pedido de qualquer forma.
+    """
+    destination_path = destination_path or get_output_path()
+    progress = progress or (lambda value, text=None: None)
+    if not os.path.exists(excel_path):
+        raise ProcessingError(
+            "Erro de Arquivo",
+            f"Arquivo Excel não encontrado: '{excel_path}'. Por favor, verifique o caminho.",
+            "Erro: Arquivo Excel não encontrado.",
+        )
+    with open(excel_path, 'rb') as f:
+        data = f.read()
+
+    params = [('nome', os.path.basename(excel_path)), ('cliente', client_id())]
+    params += [('trabalho', f"{serie}:{column_index_to_letter(column_index)}:{prova}") for serie, column_index, prova in jobs]
+    if not incremental:
+        params.append(('completo', '1'))
+    if delta:
+        params.append(('alteracoes', '1'))
+
+    if cancel is not None:
+        cancel.check()
+    progress(10, "Enviando arquivo ao serviço de processamento...")
+    response = _request(url, params, data, timeout)
+    if cancel is not None:
+        cancel.check()
+
+    progress(90, "Gerando arquivos de saída...")
+    results = [RemoteResult(item) for item in response['resultados']]
+    for result in results:
+        if result.total_alunos:
+            _write_files(result, destination_path)
+    return results
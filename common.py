@@ -0,0 +1,95 @@
+import os
+import re
+
+# --- Funções Auxiliares (caminhos, nomes de arquivos e colunas) ---
+#
+# Sem pandas/openpyxl: a interface importa este módulo ao abrir a janela e só
+# carrega o núcleo de processamento (processing.py) em segundo plano.
+
+NUMERO_MAXIMO_COLUNAS = 16384 # Última coluna do Excel (XFD)
+ARQUIVO_RESOLUCOES = 'resolucoes.sqlite' # Resoluções manuais de nomes (aliases.py)
+
+
+class ProcessingError(Exception):
+    """Erro que interrompe o processamento, com título e texto de status para a interface."""
+
+    def __init__(self, title, message, status):
+        super().__init__(message)
+        self.title = title
+        self.message = message
+        self.status = status
+
+    def __reduce__(self):
+        # Permite devolver o erro de um processo de trabalho (ProcessPoolExecutor)
+        return (ProcessingError, (self.title, self.message, self.status))
+
+
+def get_output_path():
+    """Retorna o caminho desejado para salvar os arquivos."""
+    # O caminho fixo que você deseja usar
+    return r"D:\Meus Arquivos\Documents\resultados"
+
+def get_cache_path():
+    """Retorna o diretório do cache local, ao lado da pasta de resultados."""
+    return get_output_path() + "_cache"
+
+def get_alias_path():
+    """Retorna o arquivo das resoluções manuais de nomes, na pasta de resultados."""
+    return os.path.join(get_output_path(), ARQUIVO_RESOLUCOES)
+
+def is_valid_column_letter(column_letter):
+    """Indica se o texto é uma coluna Excel válida (A ... XFD)."""
+    try:
+        column_letter_to_index(column_letter)
+    except ValueError:
+        return False
+    return True
+
+def column_letter_to_index(column_letter):
+    """Converte letras de coluna Excel (A, B, ..., Z, AA, AB...) para o índice baseado em zero."""
+    if not isinstance(column_letter, str) or not re.fullmatch(r'[A-Za-z]{1,3}', column_letter):
+        raise ValueError("A coluna deve ser formada apenas por letras (ex: 'N' ou 'AA').")
+
+    # Converte para maiúscula para padronização
+    column_letter = column_letter.upper()
+
+    # 'A' é 0, ..., 'Z' é 25, 'AA' é 26, ... (numeração em base 26)
+    index = 0
+    for letter in column_letter:
+        index = index * 26 + (ord(letter) - ord('A') + 1)
+    if index > NUMERO_MAXIMO_COLUNAS:
+        raise ValueError(f"A coluna '{column_letter}' passa da última coluna do Excel (XFD).")
+    return index - 1
+
+def column_index_to_letter(column_index):
+    """Converte o índice baseado em zero de volta para as letras da coluna Excel."""
+    letters = ''
+    column_index += 1
+    while column_index:
+        column_index, resto = divmod(column_index - 1, 26)
+        letters = chr(ord('A') + resto) + letters
+    return letters
+
+def parse_job_spec(text):
+    """Converte 'SÉRIE:COLUNA:PROVA' em (série, índice da coluna, prova); ValueError se inválido."""
+    parts = [part.strip() for part in text.split(':', 2)]
+    if len(parts) != 3 or not all(parts):
+        raise ValueError(f"Trabalho inválido '{text}'. Use o formato 'SÉRIE:COLUNA:PROVA' (ex: '1ª Série:N:Simulado 1').")
+    serie_selecionada, coluna_nota_letra, prova_nome = parts
+    return serie_selecionada, column_letter_to_index(coluna_nota_letra), prova_nome
+
+def output_file_names(serie_selecionada, prova_nome):
+    """Nomes dos arquivos gerados para uma série e prova."""
+    output_file_name_main = f"{serie_selecionada} - {prova_nome}.txt"
+    output_file_name_ambiguities = f"ocorrencias {serie_selecionada} - {prova_nome}.txt" # Múltiplas matches, ambiguidade
+    output_file_name_partial = f"Coincidencias parciais {serie_selecionada} - {prova_nome}.txt" # Coincidências parciais
+    output_file_name_not_found = f"alunos_nao_encontrados {serie_selecionada} - {prova_nome}.txt" # Alunos não encontrados
+    return output_file_name_main, output_file_name_ambiguities, output_file_name_partial, output_file_name_not_found
+
+def delta_file_name(serie_selecionada, prova_nome):
+    """Nome do arquivo (mesmo formato do principal) só com as notas novas ou alteradas."""
+    return f"alteracoes {serie_selecionada} - {prova_nome}.txt"
+
+def report_file_name(serie_selecionada, prova_nome):
+    """Nome do relatório (JSON) com tempos e contadores da execução."""
+    return f"relatorio {serie_selecionada} - {prova_nome}.json"
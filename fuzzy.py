@@ -0,0 +1,209 @@
+import heapq
+import re
+import sys
+from array import array
+from collections import Counter
+from functools import lru_cache
+
+# --- Sugestões por Nome Aproximado ---
+#
+# Para alunos não encontrados pela regra de tokens ordenados (ex.: letra trocada
+# ou partícula "DE"/"DA" a mais). Comparar cada nome com a lista inteira seria
+# lento demais, então os nomes da lista são agrupados em blocos por pares de
+# chaves fonéticas dos seus tokens, e a distância de edição só é calculada para
+# as linhas que compartilham algum bloco com o nome procurado. As sugestões
+# apenas vão para o relatório: o aluno continua fora do arquivo principal.
+
+PARTICULAS = {'DE', 'DA', 'DO', 'DAS', 'DOS', 'E'}
+SCORE_MINIMO = 0.8 # Semelhança mínima (0 a 1) para uma sugestão
+SIMILARIDADE_TOKEN = 0.7 # Abaixo disso, dois tokens não são considerados o mesmo
+MAX_SUGESTOES = 3
+MAX_CANDIDATOS = 64 # Linhas pontuadas por nome (as que compartilham mais blocos)
+TAMANHO_MAXIMO_BLOCO = 500 # Blocos maiores (nomes muito comuns) só são usados se não houver outros
+
+# Regras fonéticas simplificadas para nomes em português, aplicadas em ordem
+REGRAS_FONETICAS = [(re.compile(padrao), troca) for padrao, troca in [
+    (r'[^A-Z]', ''),
+    (r'PH', 'F'),
+    (r'[CS]H', 'X'),
+    (r'LH', 'L'),
+    (r'NH', 'N'),
+    (r'SC(?=[EI])', 'S'),
+    (r'C(?=[EIY])', 'S'),
+    (r'QU|GU(?=[EI])', lambda m: 'K' if m.group().startswith('Q') else 'G'),
+    (r'G(?=[EIY])', 'J'),
+    (r'[CQ]', 'K'),
+    (r'Z', 'S'),
+    (r'Y', 'I'),
+    (r'W', 'V'),
+    (r'H', ''),
+    (r'M$', 'N'),
+]]
+VOGAIS = re.compile(r'[AEIOU]')
+
+
+@lru_cache(maxsize=65536)
+def phonetic_key(token):
+    """Chave fonética do token: primeira letra e consoantes, sem repetições (ex.: SOUZA e SOUSA -> S)."""
+    for regra, troca in REGRAS_FONETICAS:
+        token = regra.sub(troca, token)
+    if not token:
+        return ''
+    chave = token[0] + VOGAIS.sub('', token[1:])
+    return re.sub(r'(.)\1+', r'\1', chave)
+
+
+def significant_tokens(nome_std):
+    """Tokens do nome padronizado, sem as partículas (DE, DA, DOS...)."""
+    return tuple(token for token in nome_std.split() if token not in PARTICULAS)
+
+
+def _block_keys(tokens):
+    """Blocos de um nome: cada par (em ordem) de chaves fonéticas dos seus tokens."""
+    chaves = [phonetic_key(token) for token in tokens]
+    if len(chaves) == 1:
+        return {(chaves[0],)}
+    return {(chaves[i], chaves[j]) for i in range(len(chaves)) for j in range(i + 1, len(chaves))}
+
+
+def edit_distance(a, b, limite=None):
+    """
+    Distância de edição com transposição de letras vizinhas (ex.: MAIRA -> MARIA
+    custa 1). Com `limite`, só a faixa da matriz que pode ficar dentro dele é
+    calculada, e qualquer distância maior é devolvida como limite + 1.
+    """
+    if a == b:
+        return 0
+    if limite is None:
+        limite = max(len(a), len(b))
+    if abs(len(a) - len(b)) > limite:
+        return limite + 1
+
+    fora = limite + 1 # Valor das células fora da faixa
+    anterior2 = None
+    anterior = [j if j <= limite else fora for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        atual = [fora] * (len(b) + 1)
+        if i <= limite:
+            atual[0] = i
+        menor = atual[0]
+        letra = a[i - 1]
+        for j in range(max(1, i - limite), min(len(b), i + limite) + 1):
+            if letra == b[j - 1]:
+                valor = anterior[j - 1]
+            else:
+                valor = min(anterior[j], atual[j - 1], anterior[j - 1]) + 1
+                if i > 1 and j > 1 and letra == b[j - 2] and a[i - 2] == b[j - 1] and anterior2[j - 2] + 1 < valor:
+                    valor = anterior2[j - 2] + 1
+            atual[j] = valor
+            if valor < menor:
+                menor = valor
+        if menor > limite:
+            return fora
+        anterior2, anterior = anterior, atual
+    return min(anterior[-1], fora)
+
+
+@lru_cache(maxsize=65536)
+def token_similarity(a, b):
+    """Semelhança (0 a 1) entre dois tokens."""
+    if a == b:
+        return 1.0
+    maior = max(len(a), len(b))
+    # Distâncias acima do limite dariam semelhança menor que SIMILARIDADE_TOKEN (vale 0)
+    limite = int(maior * (1 - SIMILARIDADE_TOKEN))
+    distancia = edit_distance(a, b, limite)
+    return 0.0 if distancia > limite else 1 - distancia / maior
+
+
+def _joined_similarity(tokens_serie, tokens_lista):
+    """
+    Semelhança entre os nomes inteiros, sem espaços, quando a diferença é pequena
+    (ex.: 'JULIADEBORA' por 'JULIA DEBORA'); 0 se passar de 1 - SCORE_MINIMO.
+    """
+    a, b = ''.join(tokens_serie), ''.join(tokens_lista)
+    maior = max(len(a), len(b))
+    limite = int(maior * (1 - SCORE_MINIMO))
+    distancia = edit_distance(a, b, limite)
+    return 0.0 if distancia > limite else 1 - distancia / maior
+
+
+def name_similarity(tokens_serie, tokens_lista):
+    """
+    Semelhança (0 a 1) entre dois nomes, na mesma lógica da regra de tokens
+    ordenados: o primeiro token deve corresponder ao primeiro nome da lista e os
+    demais, em ordem, a algum dos nomes seguintes. Cada token pesa pelo seu tamanho.
+    """
+    if not tokens_serie or not tokens_lista:
+        return 0.0
+    primeiro = token_similarity(tokens_serie[0], tokens_lista[0])
+    if primeiro < SIMILARIDADE_TOKEN:
+        return 0.0
+
+    total = primeiro * len(tokens_serie[0])
+    posicao = 1
+    for token in tokens_serie[1:]:
+        melhor, melhor_posicao = 0.0, None
+        for j in range(posicao, len(tokens_lista)):
+            semelhanca = token_similarity(token, tokens_lista[j])
+            if semelhanca > melhor:
+                melhor, melhor_posicao = semelhanca, j
+                if semelhanca == 1.0:
+                    break
+        if melhor >= SIMILARIDADE_TOKEN:
+            total += melhor * len(token)
+            posicao = melhor_posicao + 1
+    return total / sum(len(token) for token in tokens_serie)
+
+
+class FuzzyIndex:
+    """Blocos fonéticos (par de chaves -> linhas da lista de alunos) para a busca aproximada."""
+
+    def __init__(self, nomes_std):
+        # Tokens internados: cada sobrenome comum fica uma única vez na memória
+        self.tokens = [tuple(map(sys.intern, significant_tokens(nome))) for nome in nomes_std]
+        self.blocos = {}
+        for row_id, tokens in enumerate(self.tokens):
+            if tokens:
+                for chave in _block_keys(tokens):
+                    bloco = self.blocos.get(chave)
+                    if bloco is None:
+                        bloco = self.blocos[chave] = array('i')
+                    bloco.append(row_id)
+
+    def candidates(self, tokens):
+        """Linhas que compartilham mais blocos com o nome (no máximo MAX_CANDIDATOS)."""
+        # Em ordem fixa (conjuntos de textos variam de uma execução para outra), para empates sempre iguais
+        blocos = [self.blocos[chave] for chave in sorted(_block_keys(tokens)) if chave in self.blocos]
+        if not blocos:
+            return []
+        pequenos = [bloco for bloco in blocos if len(bloco) <= TAMANHO_MAXIMO_BLOCO]
+        if not pequenos:
+            pequenos = [min(blocos, key=len)]
+
+        contagem = Counter()
+        for bloco in pequenos:
+            contagem.update(bloco)
+        return heapq.nsmallest(MAX_CANDIDATOS, contagem, key=lambda row_id: (-contagem[row_id], row_id))
+
+    def suggestions(self, nome_std, limit=MAX_SUGESTOES, min_score=SCORE_MINIMO):
+        """Retorna até `limit` pares (linha, semelhança), da mais para a menos semelhante."""
+        tokens = significant_tokens(nome_std)
+        if not tokens:
+            return []
+        candidatos = self.candidates(tokens)
+        pontuados = []
+        for row_id in candidatos:
+            score = name_similarity(tokens, self.tokens[row_id])
+            if score >= min_score:
+                pontuados.append((row_id, score))
+        if not pontuados:
+            # Um espaço a menos ou a mais desalinha os tokens; compara os nomes inteiros
+            for row_id in candidatos:
+                if len(self.tokens[row_id]) != len(tokens):
+                    score = _joined_similarity(tokens, self.tokens[row_id])
+                    if score >= min_score:
+                        pontuados.append((row_id, score))
+        # Empates: primeiro o nome com quantidade de tokens mais próxima, depois a ordem da lista
+        pontuados.sort(key=lambda item: (-item[1], abs(len(self.tokens[item[0]]) - len(tokens)), item[0]))
+        return pontuados[:limit]
@@ -0,0 +1,111 @@
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+# --- Instrumentação do Processamento ---
+#
+# Tempos por etapa, contadores e, opcionalmente, perfil (cProfile) e picos de
+# memória (tracemalloc). O perfil e a memória são ligados pelas variáveis de
+# ambiente NOTAS_PERFIL=1 e NOTAS_MEMORIA=1 (ou pelas opções da linha de comando).
+
+VARIAVEL_PERFIL = 'NOTAS_PERFIL'
+VARIAVEL_MEMORIA = 'NOTAS_MEMORIA'
+LINHAS_PERFIL = 30 # Funções mostradas no resumo do cProfile
+
+
+def env_flag(name):
+    """Indica se a variável de ambiente está ligada (1, true, sim...)."""
+    return os.environ.get(name, '').strip().lower() in ('1', 'true', 'sim', 's', 'yes', 'on')
+
+
+class RunStats:
+    """Tempos por etapa e contadores de uma execução."""
+
+    def __init__(self):
+        self.phases = {} # Etapa -> segundos
+        self.memory_peaks = {} # Etapa -> pico de memória alocada (bytes), com tracemalloc ligado
+        self.counters = {}
+        self.profile_text = None
+
+    @contextmanager
+    def phase(self, name):
+        """Mede o tempo (e o pico de memória, se o tracemalloc estiver ligado) de uma etapa."""
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (time.perf_counter() - start)
+            if tracing:
+                self.memory_peaks[name] = max(self.memory_peaks.get(name, 0), tracemalloc.get_traced_memory()[1])
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def copy(self):
+        stats = RunStats()
+        stats.phases = dict(self.phases)
+        stats.memory_peaks = dict(self.memory_peaks)
+        stats.counters = dict(self.counters)
+        stats.profile_text = self.profile_text
+        return stats
+
+    def to_dict(self):
+        data = {
+            'etapas_s': {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            'total_s': round(sum(self.phases.values()), 6),
+            'contadores': dict(self.counters),
+        }
+        if self.memory_peaks:
+            data['pico_memoria_bytes'] = dict(self.memory_peaks)
+        if self.profile_text:
+            data['perfil'] = self.profile_text
+        return data
+
+    def summary(self):
+        """Resumo curto (uma linha por assunto) para a mensagem de conclusão."""
+        lines = ["Tempo total: {:.2f}s ({})".format(
+            sum(self.phases.values()),
+            ", ".join(f"{name.replace('_', ' ')} {seconds:.2f}s" for name, seconds in self.phases.items()),
+        )]
+        if self.counters:
+            lines.append("Contadores: " + ", ".join(f"{name.replace('_', ' ')} {value}" for name, value in self.counters.items()))
+        if self.memory_peaks:
+            lines.append("Pico de memória: {:.1f} MB".format(max(self.memory_peaks.values()) / (1024 * 1024)))
+        return "\n".join(lines)
+
+
+@contextmanager
+def profiling(enabled=None, trace_memory=None):
+    """
+    Liga o cProfile e/ou o tracemalloc durante o bloco (por padrão, conforme as
+    variáveis de ambiente). Produz um objeto cujo atributo `text` recebe, ao final,
+    o resumo do perfil (ou None se o perfil estiver desligado).
+    """
+    enabled = env_flag(VARIAVEL_PERFIL) if enabled is None else enabled
+    trace_memory = env_flag(VARIAVEL_MEMORIA) if trace_memory is None else trace_memory
+
+    output = SimpleNamespace(text=None)
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler = cProfile.Profile() if enabled else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield output
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            buffer = io.StringIO()
+            pstats.Stats(profiler, stream=buffer).sort_stats('cumulative').print_stats(LINHAS_PERFIL)
+            output.text = buffer.getvalue()
+        if started_tracing:
+            tracemalloc.stop()
@@ -0,0 +1,134 @@
+import itertools
+import os
+
+from progress import CancelToken
+
+# --- Fila de Trabalhos da Interface ---
+#
+# Cada trabalho é um (arquivo Excel, série, coluna da nota, prova). Os trabalhos
+# entram na fila e são executados em ordem, no máximo `max_concurrent` ao mesmo
+# tempo; quem de fato executa é a função start_job (uma thread por trabalho, na
+# interface). A fila em si só é usada pela thread principal do Tk: o fim de um
+# trabalho é informado por finished(), chamada pelos eventos do seu canal.
+
+SITUACAO_NA_FILA = 'Na fila'
+SITUACAO_PROCESSANDO = 'Processando'
+SITUACAO_CONCLUIDO = 'Concluído'
+SITUACAO_ERRO = 'Erro'
+SITUACAO_CANCELANDO = 'Cancelando...'
+SITUACAO_CANCELADO = 'Cancelado'
+SITUACOES_FINAIS = (SITUACAO_CONCLUIDO, SITUACAO_ERRO, SITUACAO_CANCELADO)
+
+CONCORRENCIA_PADRAO = 1 # Trabalhos executados ao mesmo tempo
+CONCORRENCIA_MAXIMA = 4
+
+
+class Job:
+    """Um trabalho da fila, com o seu andamento e o seu pedido de cancelamento."""
+
+    def __init__(self, job_id, excel_path, serie_selecionada, column_letter, column_note_index, prova_nome):
+        self.job_id = job_id
+        self.excel_path = excel_path
+        self.serie_selecionada = serie_selecionada
+        self.column_letter = column_letter
+        self.column_note_index = column_note_index
+        self.prova_nome = prova_nome
+        self.cancel_token = CancelToken()
+        self.status = SITUACAO_NA_FILA
+        self.progress = 0
+        self.message = None # Mensagem final (resultado ou erro)
+        self.start_time = None
+        self.elapsed = None # Segundos do início ao resultado
+
+    @property
+    def file_name(self):
+        return os.path.basename(self.excel_path)
+
+    @property
+    def finished(self):
+        return self.status in SITUACOES_FINAIS
+
+
+class JobScheduler:
+    """Fila de trabalhos com limite de execuções simultâneas (usada só pela thread principal)."""
+
+    def __init__(self, start_job, on_change=None, max_concurrent=CONCORRENCIA_PADRAO):
+        """
+        start_job(job): inicia a execução do trabalho (sem bloquear).
+        on_change(job): chamada a cada mudança de situação de um trabalho.
+        """
+        self.start_job = start_job
+        self.on_change = on_change
+        self.max_concurrent = max_concurrent
+        self.jobs = [] # Todos os trabalhos, na ordem em que entraram
+        self._ids = itertools.count(1)
+
+    def _changed(self, job):
+        if self.on_change is not None:
+            self.on_change(job)
+
+    @property
+    def running(self):
+        return [job for job in self.jobs if job.status in (SITUACAO_PROCESSANDO, SITUACAO_CANCELANDO)]
+
+    @property
+    def pending(self):
+        return [job for job in self.jobs if job.status == SITUACAO_NA_FILA]
+
+    @property
+    def active(self):
+        """Indica se ainda há trabalhos na fila ou em execução."""
+        return any(not job.finished for job in self.jobs)
+
+    def get(self, job_id):
+        for job in self.jobs:
+            if job.job_id == job_id:
+                return job
+        return None
+
+    def submit(self, excel_path, serie_selecionada, column_letter, column_note_index, prova_nome):
+        """Coloca um trabalho na fila (e o inicia, se houver vaga). Retorna o Job."""
+        job = Job(next(self._ids), excel_path, serie_selecionada, column_letter, column_note_index, prova_nome)
+        self.jobs.append(job)
+        self._changed(job)
+        self._start_pending()
+        return job
+
+    def cancel(self, job_id):
+        """Cancela um trabalho: se ainda está na fila, sai dela; se está em execução, o processamento é interrompido."""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return
+        job.cancel_token.cancel()
+        if job.status == SITUACAO_NA_FILA:
+            job.status = SITUACAO_CANCELADO
+        else:
+            job.status = SITUACAO_CANCELANDO # Vira 'Cancelado' quando a thread terminar
+        self._changed(job)
+
+    def cancel_all(self):
+        for job in list(self.jobs):
+            self.cancel(job.job_id)
+
+    def set_max_concurrent(self, max_concurrent):
+        self.max_concurrent = max(1, min(CONCORRENCIA_MAXIMA, max_concurrent))
+        self._start_pending()
+
+    def clear_finished(self):
+        """Remove da lista os trabalhos já terminados."""
+        self.jobs = [job for job in self.jobs if not job.finished]
+
+    def finished(self, job, status, message=None):
+        """Registra o fim de um trabalho (chamada na thread principal) e inicia os próximos."""
+        job.status = status
+        if message is not None:
+            job.message = message
+        self._changed(job)
+        self._start_pending()
+
+    def _start_pending(self):
+        livres = self.max_concurrent - len(self.running)
+        for job in self.pending[:max(0, livres)]:
+            job.status = SITUACAO_PROCESSANDO
+            self._changed(job)
+            self.start_job(job)
@@ -1,30 +1,27 @@
+import time
+INICIO = time.perf_counter() # Para medir o tempo até a janela aparecer
+
+import functools
+import importlib
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import ttkbootstrap as tb
-import pandas as pd
 import os
-import re
 import threading
 import sys
 import subprocess # Para abrir pastas
+from common import column_letter_to_index, get_alias_path, get_output_path, is_valid_column_letter, report_file_name
+from jobs import (
+    CONCORRENCIA_MAXIMA, CONCORRENCIA_PADRAO, SITUACAO_CANCELADO, SITUACAO_CANCELANDO, SITUACAO_CONCLUIDO, SITUACAO_ERRO, SITUACAO_PROCESSANDO,
+    JobScheduler,
+)
+from progress import ProcessingCancelled, ProgressChannel
 
-# --- Funções Auxiliares ---
+# pandas/openpyxl (processing.py) e o SQLite das resoluções não são importados
+# aqui: a janela aparece primeiro e o núcleo de processamento é carregado em
+# segundo plano (preload_processing), antes de o usuário terminar de preencher os campos.
 
-def get_output_path():
-    """Retorna o caminho desejado para salvar os arquivos."""
-    # O caminho fixo que você deseja usar
-    return r"D:\Meus Arquivos\Documents\resultados"
-
-def remove_accents(text):
-    """Remove acentos de uma string para padronização."""
-    text = str(text) # Garante que seja string
-    text = re.sub(r'[ÁÀÂÃÄ]', 'A', text)
-    text = re.sub(r'[ÉÈÊË]', 'E', text)
-    text = re.sub(r'[ÍÌÎÏ]', 'I', text)
-    text = re.sub(r'[ÓÒÔÕÖ]', 'O', text)
-    text = re.sub(r'[ÚÙÛÜ]', 'U', text)
-    text = re.sub(r'[Ç]', 'C', text)
-    return text
+# --- Funções Auxiliares ---
 
 def open_folder(path):
     """Abre um diretório no Explorador de Arquivos (Windows)."""
@@ -40,282 +37,89 @@ def open_folder(path):
     except Exception as e:
         messagebox.showerror("Erro ao Abrir Pasta", f"Não foi possível abrir o diretório: {e}")
 
-def column_letter_to_index(column_letter):
-    """Converte uma letra de coluna Excel (A, B, C...) para o índice baseado em zero."""
-    if not isinstance(column_letter, str) or not column_letter.isalpha() or len(column_letter) != 1:
-        raise ValueError("A letra da coluna deve ser uma única letra alfabética.")
-    
-    # Converte para maiúscula para padronização
-    column_letter = column_letter.upper()
-    
-    # 'A' é 0, 'B' é 1, ..., 'Z' é 25
-    return ord(column_letter) - ord('A')
+def preload_processing():
+    """Importa o núcleo de processamento (pandas, openpyxl) em segundo plano."""
+    try:
+        importlib.import_module('processing')
+    except Exception:
+        pass # O erro aparece, com a mensagem certa, ao iniciar o processamento
+
+
+def warm_up_roster(excel_path, channel):
+    """Prepara a lista de alunos do arquivo escolhido enquanto os campos são preenchidos."""
+    try:
+        from processing import warm_up_roster as warm_up
+        channel.post('warm_up', excel_path, warm_up(excel_path))
+    except Exception:
+        pass
+    finally:
+        channel.close()
 
 # --- Lógica de Processamento do Excel ---
 
-def process_excel(excel_path, prova_nome, serie_selecionada, column_note_index, progress_bar, status_label, not_found_text_area, root):
+def process_excel(excel_path, prova_nome, serie_selecionada, column_note_index, channel, cancel=None):
     """
     Processa o arquivo Excel, compara os dados e gera o arquivo TXT.
-    Executado em uma thread separada.
+    Executado em uma thread separada: a interface só é atualizada pelos eventos
+    publicados no canal (ProgressChannel), nunca diretamente pelos widgets.
+    O cancelamento é pedido pelo CancelToken `cancel`.
     """
-    has_occurrences = False # Flag para indicar se houve múltiplas correspondências (ambiguidade)
-    has_partial_matches = False # Flag para indicar se houve coincidências parciais
-    not_found_alunos = [] # Lista para armazenar alunos não encontrados
+    import pandas as pd
+    from client import process_remote, server_url
+    from processing import ProcessingError, process_workbook
 
     try:
-        status_label.config(text="Carregando arquivo Excel...")
-        progress_bar['value'] = 0
-        root.update_idletasks() # Atualiza a GUI
-        not_found_text_area.config(state='normal') # Habilita para escrita na thread
-        not_found_text_area.delete(1.0, tk.END) # Limpa a área de alunos não encontrados
-        not_found_text_area.config(state='disabled') # Desabilita novamente
-
-        if not os.path.exists(excel_path):
-            messagebox.showerror("Erro de Arquivo", f"Arquivo Excel não encontrado: '{excel_path}'. Por favor, verifique o caminho.")
-            status_label.config(text="Erro: Arquivo Excel não encontrado.")
-            return
-
-        xls = pd.ExcelFile(excel_path, engine='openpyxl')
-
-        try:
-            df_serie = pd.read_excel(xls, sheet_name=serie_selecionada, header=None, skiprows=6)
-        except ValueError:
-            messagebox.showerror("Erro de Planilha", f"A planilha '{serie_selecionada}' não foi encontrada no arquivo Excel. Verifique o nome da planilha.")
-            status_label.config(text="Erro: Planilha da série não encontrada.")
-            return
-
-        try:
-            df_lista_alunos = pd.read_excel(xls, sheet_name='Lista de Alunos', header=None)
-        except ValueError:
-            messagebox.showerror("Erro de Planilha", "A planilha 'Lista de Alunos' não foi encontrada no arquivo Excel. Verifique o nome da planilha.")
-            status_label.config(text="Erro: Planilha 'Lista de Alunos' não encontrada.")
-            return
-
-        status_label.config(text="Pré-processando dados...")
-        progress_bar['value'] = 10
-        root.update_idletasks()
-
-        # 2. Pré-processar DataFrames
-        # Agora usando column_note_index
-        df_serie = df_serie[[0, column_note_index]].copy()
-        df_serie.columns = ['NomeAlunoSerie', 'Nota']
-        df_serie['NomeAlunoSerie'] = df_serie['NomeAlunoSerie'].astype(str).str.strip().str.upper()
-        df_serie['Nota'] = df_serie['Nota'].astype(str).str.replace(',', '.', regex=False)
-        df_serie['Nota'] = pd.to_numeric(df_serie['Nota'], errors='coerce')
-        df_serie.dropna(subset=['Nota'], inplace=True)
-
-        df_lista_alunos = df_lista_alunos[[0, 1]].copy()
-        df_lista_alunos.columns = ['Matricula', 'NomeCompletoLista']
-        df_lista_alunos['NomeCompletoLista'] = df_lista_alunos['NomeCompletoLista'].astype(str).str.strip().str.upper()
-        df_lista_alunos['Matricula'] = df_lista_alunos['Matricula'].astype(str).str.strip()
-
-        progress_bar['value'] = 30
-        root.update_idletasks()
-
-        # 3. Comparar e gerar os arquivos TXT
-        output_file_name_main = f"{serie_selecionada} - {prova_nome}.txt"
-        output_file_name_ambiguities = f"ocorrencias {serie_selecionada} - {prova_nome}.txt" # Múltiplas matches, ambiguidade
-        output_file_name_partial = f"Coincidencias parciais {serie_selecionada} - {prova_nome}.txt" # Novo: Coincidências parciais
-        output_file_name_not_found = "alunos_nao_encontrados.txt" # Novo: Alunos não encontrados
-
         destination_path = get_output_path()
-        main_output_file_path = os.path.join(destination_path, output_file_name_main)
-        ambiguities_output_file_path = os.path.join(destination_path, output_file_name_ambiguities)
-        partial_output_file_path = os.path.join(destination_path, output_file_name_partial)
-        not_found_output_file_path = os.path.join(destination_path, output_file_name_not_found)
-
-        matched_alunos = []
-        ambiguities_list = [] # Para armazenar múltiplas correspondências (ambiguidades)
-        partial_matches_log = [] # Para armazenar logs de coincidências parciais
-        
-        processed_names_serie = set() # Para garantir nomes únicos da planilha de série
+        jobs = [(serie_selecionada, column_note_index, prova_nome)]
+        url = server_url()
+        if url: # Serviço local (server.py) configurado em NOTAS_SERVIDOR: a interface só envia o arquivo
+            result, = process_remote(url, excel_path, jobs, destination_path=destination_path, progress=channel.progress, cancel=cancel)
+        else:
+            result, = process_workbook(excel_path, jobs, destination_path=destination_path, progress=channel.progress, cancel=cancel)
+        output_file_name_main, output_file_name_ambiguities, output_file_name_partial, output_file_name_not_found = result.file_names
 
-        total_alunos_serie = len(df_serie)
-        if total_alunos_serie == 0:
-            messagebox.showinfo("Processamento", f"Nenhum aluno com nota válida encontrado na planilha '{serie_selecionada}'.")
-            status_label.config(text="Nenhum aluno processado.")
+        if result.total_alunos == 0:
+            channel.post('report', f"Nenhum aluno com nota válida encontrado na planilha '{serie_selecionada}'.")
             return
 
-        # Pre-calcula a coluna padronizada na df_lista_alunos uma vez
-        df_lista_alunos['NomeCompletoLista_STD'] = df_lista_alunos['NomeCompletoLista'].apply(remove_accents).str.strip().str.upper()
-
-        for index, row_serie in df_serie.iterrows():
-            nome_aluno_serie_original = row_serie['NomeAlunoSerie']
-            nota_serie = row_serie['Nota']
-
-            if nome_aluno_serie_original in processed_names_serie:
-                continue
-            processed_names_serie.add(nome_aluno_serie_original)
-
-            nome_aluno_serie_std = remove_accents(nome_aluno_serie_original).strip().upper()
-
-            if not nome_aluno_serie_std: # Evita erro se o nome estiver vazio após limpeza
-                print(f"Alerta: Nome vazio ou inválido na série: '{nome_aluno_serie_original}'. Ignorado.")
-                continue
-
-            pattern_parts = [re.escape(part) for part in re.split(r'\s+', nome_aluno_serie_std) if part]
-            regex_pattern_str = r".*".join(pattern_parts)
-            regex_pattern = re.compile(f"^{regex_pattern_str}.*$", re.IGNORECASE)
-
-            potential_matches = df_lista_alunos[df_lista_alunos['NomeCompletoLista_STD'].str.contains(regex_pattern, na=False)]
-
-            found_match_for_student = False
-
-            if len(potential_matches) == 1:
-                matched_name_lista_std = potential_matches.iloc[0]['NomeCompletoLista_STD']
-                matricula = potential_matches.iloc[0]['Matricula']
-
-                if matched_name_lista_std == nome_aluno_serie_std:
-                    nota_formatada = f"{nota_serie:.1f}".replace('.',',')
-                    matched_alunos.append(f"{matricula}\t{nota_formatada}")
-                    found_match_for_student = True
-                elif nome_aluno_serie_std.startswith(matched_name_lista_std) and len(nome_aluno_serie_std) > len(matched_name_lista_std):
-                    matched_alunos.append(f"{matricula}\t{nota_serie:.1f}")
-                    partial_matches_log.append(
-                        f"Aluno da Série: '{nome_aluno_serie_original}' (Nota: {nota_serie:.1f})\n"
-                        f"  Coincidência Parcial com Lista de Alunos:\n"
-                        f"  - Matrícula: {matricula}, Nome Completo: '{potential_matches.iloc[0]['NomeCompletoLista']}'\n"
-                        f"----------------------------------------\n"
-                    )
-                    has_partial_matches = True
-                    found_match_for_student = True
-                # Else: single regex match but not exact or prefix, treated as not found for now
-            elif len(potential_matches) > 1:
-                has_occurrences = True
-                ambiguity_info = f"Aluno da Série: '{nome_aluno_serie_original}' (Nota: {nota_serie:.1f})\n"
-                ambiguity_info += "Possíveis correspondências (Ambíguas) na Lista de Alunos:\n"
-                for idx, row_match in potential_matches.iterrows():
-                    ambiguity_info += f"- Matrícula: {row_match['Matricula']}, Nome: '{row_match['NomeCompletoLista']}'\n"
-                ambiguity_info += "----------------------------------------\n"
-                ambiguities_list.append(ambiguity_info)
-            
-            # Adicionar aluno à lista de não encontrados se nenhuma das condições acima for satisfeita
-            if not found_match_for_student and len(potential_matches) == 0:
-                not_found_alunos.append(nome_aluno_serie_original)
-
-
-            # Atualiza barra de progresso
-            progress = (index + 1) / total_alunos_serie * 100
-            progress_bar['value'] = 30 + (progress * 0.6)
-            status_label.config(text=f"Processando: {int(progress)}% - {nome_aluno_serie_original}")
-            root.update_idletasks()
-
-        # Remove a coluna temporária usada para padronização
-        df_lista_alunos.drop(columns=['NomeCompletoLista_STD'], inplace=True)
-
-        progress_bar['value'] = 90
-        status_label.config(text="Gerando arquivos de saída...")
-        root.update_idletasks()
-
-        # Garante que o diretório de destino exista
-        os.makedirs(destination_path, exist_ok=True)
-
-        # 4. Escrever no arquivo TXT principal
-        if matched_alunos:
-            try:
-                with open(main_output_file_path, 'w', encoding='utf-8') as f:
-                    for line in matched_alunos:
-                        f.write(line + '\n')
-            except IOError as e:
-                messagebox.showerror("Erro de Escrita", f"Não foi possível salvar o arquivo principal '{output_file_name_main}'. Erro: {e}")
-                status_label.config(text="Erro de escrita principal.")
-                progress_bar['value'] = 0
-                return
-        else:
-            messagebox.showwarning("Aviso", "Nenhum aluno correspondente único encontrado para o arquivo TXT principal.")
-
-
-        # 5. Escrever no arquivo de ambigüidades (se houver)
-        if ambiguities_list:
-            try:
-                with open(ambiguities_output_file_path, 'w', encoding='utf-8') as f:
-                    for entry in ambiguities_list:
-                        f.write(entry + '\n')
-            except IOError as e:
-                messagebox.showerror("Erro de Escrita", f"Não foi possível salvar o arquivo de ambigüidades '{output_file_name_ambiguities}'. Erro: {e}")
-                status_label.config(text="Erro de escrita de ambigüidades.")
-                progress_bar['value'] = 0
-                return
-
-        # 6. Escrever no arquivo de coincidências parciais (se houver)
-        if partial_matches_log:
-            try:
-                with open(partial_output_file_path, 'a', encoding='utf-8') as f:
-                    if os.path.getsize(partial_output_file_path) == 0:
-                        f.write(f"--- Coincidências Parciais em {serie_selecionada} - {prova_nome} ---\n\n")
-                    else:
-                        f.write(f"\n--- Novas Coincidências em {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')} ---\n\n")
-                    for entry in partial_matches_log:
-                        f.write(entry + '\n')
-            except IOError as e:
-                messagebox.showerror("Erro de Escrita", f"Não foi possível salvar o arquivo de coincidências parciais '{output_file_name_partial}'. Erro: {e}")
-                status_label.config(text="Erro de escrita de coincidências parciais.")
-                progress_bar['value'] = 0
-                return
-
-        # 7. Escrever no arquivo de alunos não encontrados (se houver)
-        if not_found_alunos:
-            try:
-                with open(not_found_output_file_path, 'a', encoding='utf-8') as f:
-                    if os.path.getsize(not_found_output_file_path) == 0:
-                        f.write(f"--- Alunos Não Encontrados em {serie_selecionada} - {prova_nome} ---\n\n")
-                    else:
-                        f.write(f"\n--- Novas Entradas em {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')} ---\n\n")
-                    for aluno in not_found_alunos:
-                        f.write(aluno + '\n')
-            except IOError as e:
-                messagebox.showerror("Erro de Escrita", f"Não foi possível salvar o arquivo de alunos não encontrados '{output_file_name_not_found}'. Erro: {e}")
-                status_label.config(text="Erro de escrita de alunos não encontrados.")
-                progress_bar['value'] = 0
-                return
-            
-            # Exibir alunos não encontrados na área de texto da GUI
-            not_found_text_area.config(state='normal')
-            not_found_text_area.insert(tk.END, "\nAlunos Não Encontrados:\n")
-            not_found_text_area.insert(tk.END, "-------------------------\n")
-            for aluno in not_found_alunos:
-                not_found_text_area.insert(tk.END, aluno + "\n")
-            not_found_text_area.see(tk.END) # Rola para o final
-            not_found_text_area.config(state='disabled')
-        else:
-            not_found_text_area.config(state='normal')
-            not_found_text_area.insert(tk.END, "\nNenhum aluno não encontrado neste processamento.\n")
-            not_found_text_area.see(tk.END)
-            not_found_text_area.config(state='disabled')
+        if not result.matched_alunos:
+            channel.post('dialog', 'warning', "Aviso", "Nenhum aluno correspondente único encontrado para o arquivo TXT principal.")
 
+        # Exibir alunos não encontrados na área de texto da GUI
+        channel.post('not_found', list(result.not_found_alunos))
 
         # Mensagem de conclusão modificada
         final_message = "Processamento finalizado!\n"
         final_message += f"Arquivo principal '{output_file_name_main}' gerado em '{destination_path}'.\n"
 
-        if has_partial_matches:
+        if result.has_partial_matches:
             final_message += f"\nATENÇÃO: Houve coincidências parciais de nomes. Verifique o arquivo '{output_file_name_partial}' para revisão."
-        if has_occurrences:
+        if result.has_occurrences:
             final_message += f"\nATENÇÃO: Houve coincidências ambíguas de nomes. Verifique o arquivo '{output_file_name_ambiguities}' para revisão manual."
-        if not_found_alunos:
+        if result.not_found_alunos:
             final_message += f"\nATENÇÃO: Alunos não encontrados. Verifique a lista abaixo ou o arquivo '{output_file_name_not_found}' para revisão."
+        if result.has_suggestions:
+            final_message += f"\nHá sugestões de nomes parecidos para {len(result.suggestions_log)} aluno(s) não encontrado(s) no arquivo '{output_file_name_partial}'."
 
-        if not has_partial_matches and not has_occurrences and not not_found_alunos:
+        if not result.has_partial_matches and not result.has_occurrences and not result.not_found_alunos:
              final_message += "\nNenhuma ocorrência ou divergência de nomes foi encontrada."
 
-        messagebox.showinfo("Concluído", final_message)
-        status_label.config(text="Concluído!")
-        progress_bar['value'] = 100
+        final_message += f"\n\n{result.stats.summary()}\nRelatório detalhado: '{report_file_name(serie_selecionada, prova_nome)}'."
+
+        channel.post('report', final_message)
 
+    except ProcessingCancelled:
+        channel.post('cancelled')
+    except ProcessingError as e:
+        channel.post('error', e.title, e.message, e.status)
     except FileNotFoundError as e:
-        messagebox.showerror("Erro de Arquivo", f"Um arquivo necessário não foi encontrado: {e}. Verifique se o arquivo Excel existe.")
-        status_label.config(text="Erro: Arquivo não encontrado.")
-        progress_bar['value'] = 0
+        channel.post('error', "Erro de Arquivo", f"Um arquivo necessário não foi encontrado: {e}. Verifique se o arquivo Excel existe.", "Erro: Arquivo não encontrado.")
     except pd.errors.EmptyDataError:
-        messagebox.showerror("Erro de Dados", "O arquivo Excel está vazio ou não contém dados na planilha selecionada.")
-        status_label.config(text="Erro: Dados vazios no Excel.")
-        progress_bar['value'] = 0
+        channel.post('error', "Erro de Dados", "O arquivo Excel está vazio ou não contém dados na planilha selecionada.", "Erro: Dados vazios no Excel.")
     except Exception as e:
-        messagebox.showerror("Erro Geral", f"Ocorreu um erro inesperado: {e}")
-        status_label.config(text="Erro: " + str(e))
-        progress_bar['value'] = 0
+        channel.post('error', "Erro Geral", f"Ocorreu um erro inesperado: {e}", "Erro: " + str(e))
     finally:
-        root.update_idletasks()
+        channel.close()
 
 
 # --- Interface Gráfica (Tkinter/ttkbootstrap) ---
@@ -324,7 +128,7 @@ class ExcelProcessorApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Processador de Notas de Alunos")
-        self.root.geometry("700x650") # Aumenta a altura da janela
+        self.root.geometry("700x820") # Aumenta a altura da janela (fila de trabalhos)
         self.root.resizable(False, False)
 
         self.excel_file_path = tk.StringVar()
@@ -332,6 +136,11 @@ class ExcelProcessorApp:
         self.serie_selecionada = tk.StringVar()
         self.series_opcoes = ["1ª Série", "2ª Série", "3ª Série"]
         self.coluna_nota = tk.StringVar() # Novo StringVar para a coluna da nota
+        self.concorrencia = tk.IntVar(value=CONCORRENCIA_PADRAO) # Trabalhos executados ao mesmo tempo
+
+        # Fila de trabalhos: cada um roda em uma thread, no máximo `concorrencia` ao mesmo tempo
+        self.scheduler = JobScheduler(self._start_job, on_change=self._on_job_changed, max_concurrent=CONCORRENCIA_PADRAO)
+        self.batch = [] # Trabalhos desde a última vez que a fila ficou vazia (para a barra e o resumo)
 
         self.create_widgets()
         # Inicializa o monitoramento para validação
@@ -342,6 +151,8 @@ class ExcelProcessorApp:
         
         # Chama a validação inicial para desabilitar o botão se os campos estiverem vazios
         self._check_all_inputs_valid()
+        self.concorrencia.trace_add("write", self._on_concurrency_changed)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
 
     def create_widgets(self):
@@ -359,6 +170,10 @@ class ExcelProcessorApp:
         help_button = ttk.Button(top_bar_frame, text="Ajuda", command=self.show_help, bootstyle="info-outline")
         help_button.pack(side=tk.RIGHT, padx=(5, 0))
 
+        # Botão para importar as resoluções manuais dos relatórios
+        aliases_button = ttk.Button(top_bar_frame, text="Importar Resoluções", command=self.import_resolutions, bootstyle="secondary-outline")
+        aliases_button.pack(side=tk.RIGHT, padx=(5, 0))
+
 
         # Campos de entrada
         prova_frame = ttk.Frame(main_frame)
@@ -393,8 +208,24 @@ class ExcelProcessorApp:
         self.browse_button = ttk.Button(excel_frame, text="Procurar", command=self.browse_excel_file)
         self.browse_button.pack(side=tk.LEFT, padx=(10, 0))
 
-        self.start_button = ttk.Button(main_frame, text="Iniciar Processamento", command=self.start_processing_thread, bootstyle="primary")
-        self.start_button.pack(pady=20)
+        self.start_button = ttk.Button(main_frame, text="Adicionar à Fila", command=self.start_processing_thread, bootstyle="primary")
+        self.start_button.pack(pady=(15, 10))
+
+        # --- Fila de trabalhos ---
+        queue_bar_frame = ttk.Frame(main_frame)
+        queue_bar_frame.pack(fill=tk.X)
+        ttk.Label(queue_bar_frame, text="Fila de Processamento:", font=("Helvetica", 10, "bold")).pack(side=tk.LEFT)
+        ttk.Button(queue_bar_frame, text="Cancelar Todos", command=self.cancel_all_jobs, bootstyle="danger-outline").pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Button(queue_bar_frame, text="Cancelar Selecionados", command=self.cancel_selected_jobs, bootstyle="warning-outline").pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Spinbox(queue_bar_frame, from_=1, to=CONCORRENCIA_MAXIMA, textvariable=self.concorrencia, width=3, state='readonly').pack(side=tk.RIGHT, padx=(5, 10))
+        ttk.Label(queue_bar_frame, text="Simultâneos:").pack(side=tk.RIGHT)
+
+        colunas_fila = ('serie', 'prova', 'coluna', 'arquivo', 'situacao')
+        self.jobs_tree = ttk.Treeview(main_frame, columns=colunas_fila, show='headings', height=6, selectmode='extended')
+        for coluna, titulo, largura in zip(colunas_fila, ("Série", "Prova", "Coluna", "Arquivo", "Situação"), (80, 140, 60, 180, 160)):
+            self.jobs_tree.heading(coluna, text=titulo)
+            self.jobs_tree.column(coluna, width=largura, stretch=(coluna in ('prova', 'arquivo')))
+        self.jobs_tree.pack(pady=5, fill=tk.X)
 
         self.progress_bar = ttk.Progressbar(main_frame, mode='determinate', length=400)
         self.progress_bar.pack(pady=10)
@@ -402,16 +233,16 @@ class ExcelProcessorApp:
         self.status_label = ttk.Label(main_frame, text="Pronto para processar.", bootstyle="info")
         self.status_label.pack(pady=5)
         
-        # --- Nova área para exibir alunos não encontrados ---
-        ttk.Label(main_frame, text="Alunos Não Encontrados Recentes:", font=("Helvetica", 10, "bold")).pack(pady=(15, 5))
+        # --- Resultados de cada trabalho (mensagem final e alunos não encontrados) ---
+        ttk.Label(main_frame, text="Resultados e Alunos Não Encontrados:", font=("Helvetica", 10, "bold")).pack(pady=(10, 5))
         self.not_found_text_area = scrolledtext.ScrolledText(main_frame, width=70, height=8, wrap=tk.WORD, font=("Consolas", 9))
         self.not_found_text_area.pack(pady=5, padx=10, fill=tk.BOTH, expand=True)
         self.not_found_text_area.config(state='disabled') # Torna a caixa de texto somente leitura
 
     def _validate_column_input(self, *args):
-        """Valida a entrada da coluna da nota (deve ser uma única letra)."""
+        """Valida a entrada da coluna da nota (letras de coluna do Excel, ex: 'N' ou 'AA')."""
         value = self.coluna_nota.get().strip()
-        is_valid = bool(value and value.isalpha() and len(value) == 1)
+        is_valid = is_valid_column_letter(value)
 
         if is_valid:
             self.coluna_nota_entry.config(bootstyle="default") # Volta ao estilo normal
@@ -425,7 +256,7 @@ class ExcelProcessorApp:
         excel_ok = bool(self.excel_file_path.get())
         prova_ok = bool(self.prova_nome.get().strip())
         serie_ok = bool(self.serie_selecionada.get())
-        coluna_ok = bool(self.coluna_nota.get().strip() and self.coluna_nota.get().strip().isalpha() and len(self.coluna_nota.get().strip()) == 1)
+        coluna_ok = is_valid_column_letter(self.coluna_nota.get().strip())
 
         if excel_ok and prova_ok and serie_ok and coluna_ok:
             self.start_button.config(state=tk.NORMAL)
@@ -440,12 +271,50 @@ class ExcelProcessorApp:
         if file_path:
             self.excel_file_path.set(file_path)
             self.status_label.config(text="Arquivo selecionado.")
-            self.progress_bar['value'] = 0
-            self.not_found_text_area.config(state='normal')
-            self.not_found_text_area.delete(1.0, tk.END) # Limpa área ao selecionar novo arquivo
-            self.not_found_text_area.config(state='disabled')
+            if not self.scheduler.active: # Com trabalhos na fila, os resultados deles continuam na área
+                self.progress_bar['value'] = 0
+                self.not_found_text_area.config(state='normal')
+                self.not_found_text_area.delete(1.0, tk.END) # Limpa área ao selecionar novo arquivo
+                self.not_found_text_area.config(state='disabled')
             self._check_all_inputs_valid() # Re-verifica o botão
 
+            # Lê e indexa a lista de alunos já agora, para o processamento começar pronto
+            channel = ProgressChannel(self.root, {'warm_up': self._on_warm_up})
+            threading.Thread(target=warm_up_roster, args=(file_path, channel), daemon=True).start()
+            channel.start()
+
+    def _on_warm_up(self, excel_path, total_alunos):
+        # Só informa se o arquivo ainda é o escolhido e nada está sendo processado
+        if self.scheduler.active or excel_path != self.excel_file_path.get() or total_alunos is None:
+            return
+        self.status_label.config(text=f"Arquivo selecionado. Lista de alunos pronta ({total_alunos} alunos).")
+
+    def import_resolutions(self):
+        """Importa as resoluções feitas à mão nos relatórios de ocorrências/coincidências parciais."""
+        report_paths = filedialog.askopenfilenames(
+            title="Selecione os relatórios resolvidos",
+            initialdir=get_output_path() if os.path.isdir(get_output_path()) else None,
+            filetypes=[("Relatórios", "*.txt")]
+        )
+        if not report_paths:
+            return
+        from aliases import AliasStore
+        store = AliasStore(get_alias_path())
+        total_imported, total_pending = 0, 0
+        try:
+            for report_path in report_paths:
+                imported, pending = store.import_report(report_path)
+                total_imported += imported
+                total_pending += pending
+        except Exception as e:
+            messagebox.showerror("Erro ao Importar", f"Não foi possível importar as resoluções: {e}")
+            return
+        messagebox.showinfo(
+            "Resoluções Importadas",
+            f"{total_imported} resoluções importadas; {total_pending} blocos ainda sem resolução.\n\n"
+            "Nas próximas provas, esses alunos serão reconhecidos automaticamente."
+        )
+
     def start_processing_thread(self):
         excel_path = self.excel_file_path.get()
         prova_nome = self.prova_nome.get().strip()
@@ -453,7 +322,7 @@ class ExcelProcessorApp:
         coluna_nota_letra = self.coluna_nota.get().strip()
 
         # Re-validação final (redundante, mas seguro)
-        if not (excel_path and prova_nome and serie_selecionada and coluna_nota_letra and coluna_nota_letra.isalpha() and len(coluna_nota_letra) == 1):
+        if not (excel_path and prova_nome and serie_selecionada and is_valid_column_letter(coluna_nota_letra)):
             messagebox.showwarning("Entrada Inválida", "Por favor, preencha e valide todos os campos corretamente.")
             return
         
@@ -464,26 +333,161 @@ class ExcelProcessorApp:
             self.status_label.config(text="Erro: Coluna da nota inválida.")
             return
 
-        self.start_button.config(state=tk.DISABLED)
-        self.status_label.config(text="Iniciando processamento...")
-        self.progress_bar['value'] = 0
-        self.not_found_text_area.config(state='normal') # Habilita para escrita na thread
-
+        if not self.scheduler.active:
+            self.batch = [] # Fila vazia: começa uma nova leva de trabalhos
+        job = self.scheduler.submit(excel_path, serie_selecionada, coluna_nota_letra.upper(), coluna_nota_index, prova_nome)
+        self.batch.append(job)
+        self._update_overall_progress()
+        if job.status != SITUACAO_PROCESSANDO:
+            self.status_label.config(text=f"'{serie_selecionada} - {prova_nome}' adicionado à fila.")
+
+    def _start_job(self, job):
+        """Inicia um trabalho da fila em uma thread (chamado pelo JobScheduler quando há vaga)."""
+        job.start_time = time.perf_counter()
+        self.status_label.config(text=f"{job.serie_selecionada} - {job.prova_nome}: iniciando processamento...")
+
+        # A thread de processamento só publica eventos; os widgets são atualizados aqui, na thread principal
+        channel = ProgressChannel(self.root, {
+            'progress': functools.partial(self._on_progress, job),
+            'dialog': functools.partial(self._on_dialog, job),
+            'not_found': functools.partial(self._on_not_found, job),
+            'report': functools.partial(self._on_report, job),
+            'error': functools.partial(self._on_error, job),
+            'cancelled': functools.partial(self._on_cancelled, job),
+            'done': functools.partial(self._on_done, job),
+        })
         process_thread = threading.Thread(
             target=process_excel,
-            args=(excel_path, prova_nome, serie_selecionada, coluna_nota_index,
-                  self.progress_bar, self.status_label, self.not_found_text_area, self.root)
+            args=(job.excel_path, job.prova_nome, job.serie_selecionada, job.column_note_index, channel, job.cancel_token)
         )
         process_thread.start()
+        channel.start()
 
-        self.check_thread(process_thread)
+    def cancel_selected_jobs(self):
+        for item in self.jobs_tree.selection():
+            self.scheduler.cancel(int(item))
 
-    def check_thread(self, thread):
-        if thread.is_alive():
-            self.root.after(100, lambda: self.check_thread(thread))
+    def cancel_all_jobs(self):
+        self.scheduler.cancel_all()
+
+    def _on_concurrency_changed(self, *args):
+        try:
+            self.scheduler.set_max_concurrent(self.concorrencia.get())
+        except tk.TclError:
+            pass # Valor inválido enquanto é digitado
+
+    def on_close(self):
+        """Ao fechar a janela com trabalhos pendentes, confirma e cancela todos."""
+        if self.scheduler.active:
+            if not messagebox.askyesno("Sair", "Ainda há trabalhos na fila ou em andamento. Cancelar todos e sair?"):
+                return
+            self.scheduler.cancel_all()
+        self.root.destroy()
+
+    # --- Fila de trabalhos (executado na thread principal) ---
+
+    def _job_status_text(self, job):
+        if job.status == SITUACAO_PROCESSANDO:
+            return f"{SITUACAO_PROCESSANDO} {int(job.progress)}%"
+        if job.status == SITUACAO_CONCLUIDO and job.elapsed is not None:
+            return f"{SITUACAO_CONCLUIDO} ({job.elapsed:.1f}s)".replace('.', ',')
+        return job.status
+
+    def _on_job_changed(self, job):
+        values = (job.serie_selecionada, job.prova_nome, job.column_letter, job.file_name, self._job_status_text(job))
+        item = str(job.job_id)
+        if self.jobs_tree.exists(item):
+            self.jobs_tree.item(item, values=values)
         else:
-            self.start_button.config(state=tk.NORMAL)
-            self.not_found_text_area.config(state='disabled') # Desabilita novamente após a thread terminar
+            self.jobs_tree.insert('', tk.END, iid=item, values=values)
+        self._update_overall_progress()
+        if self.batch and not self.scheduler.active:
+            self.root.after(0, self._on_queue_finished)
+
+    def _update_overall_progress(self):
+        """Barra de progresso: andamento médio dos trabalhos da leva atual."""
+        if self.batch:
+            self.progress_bar['value'] = sum(100 if job.finished else job.progress for job in self.batch) / len(self.batch)
+
+    def _on_queue_finished(self):
+        """Fila vazia: mostra o resultado (de um trabalho) ou o resumo da leva."""
+        batch, self.batch = self.batch, []
+        if not batch or self.scheduler.active:
+            return
+        if len(batch) == 1:
+            job, = batch
+            if job.status == SITUACAO_CONCLUIDO:
+                messagebox.showinfo("Concluído", job.message)
+                self.status_label.config(text=self._job_status_text(job) + "!")
+            elif job.status == SITUACAO_ERRO:
+                messagebox.showerror("Erro", job.message)
+                self.status_label.config(text="Erro: veja a área de resultados.")
+            else:
+                self.status_label.config(text="Processamento cancelado.")
+            return
+
+        contagem = {status: sum(1 for job in batch if job.status == status) for status in (SITUACAO_CONCLUIDO, SITUACAO_ERRO, SITUACAO_CANCELADO)}
+        resumo = (f"{contagem[SITUACAO_CONCLUIDO]} concluído(s), {contagem[SITUACAO_ERRO]} com erro, "
+                  f"{contagem[SITUACAO_CANCELADO]} cancelado(s).")
+        self.status_label.config(text=f"Fila concluída: {resumo}")
+        messagebox.showinfo("Fila Concluída", f"{resumo}\n\nO resultado de cada trabalho está na área de resultados.")
+
+    # --- Eventos do processamento (executados na thread principal) ---
+
+    def _log(self, job, text):
+        """Acrescenta uma mensagem do trabalho na área de resultados."""
+        self.not_found_text_area.config(state='normal')
+        self.not_found_text_area.insert(tk.END, f"[{job.serie_selecionada} - {job.prova_nome}] {text}\n")
+        self.not_found_text_area.see(tk.END) # Rola para o final
+        self.not_found_text_area.config(state='disabled')
+
+    def _on_progress(self, job, value, text=None):
+        job.progress = value
+        if job.status == SITUACAO_PROCESSANDO:
+            self.jobs_tree.set(str(job.job_id), 'situacao', self._job_status_text(job))
+        if text is not None:
+            self.status_label.config(text=f"{job.serie_selecionada} - {job.prova_nome}: {text}")
+        self._update_overall_progress()
+
+    def _on_dialog(self, job, kind, title, message):
+        self._log(job, f"{title}: {message}")
+
+    def _on_not_found(self, job, not_found_alunos):
+        self.not_found_text_area.config(state='normal')
+        if not_found_alunos:
+            self.not_found_text_area.insert(tk.END, f"\nAlunos Não Encontrados ({job.serie_selecionada} - {job.prova_nome}):\n")
+            self.not_found_text_area.insert(tk.END, "-------------------------\n")
+            self.not_found_text_area.insert(tk.END, "".join(aluno + "\n" for aluno in not_found_alunos))
+        else:
+            self.not_found_text_area.insert(tk.END, f"\nNenhum aluno não encontrado em {job.serie_selecionada} - {job.prova_nome}.\n")
+        self.not_found_text_area.see(tk.END) # Rola para o final
+        self.not_found_text_area.config(state='disabled')
+
+    def _elapsed(self, job):
+        """Tempo desde o início do trabalho até o resultado."""
+        job.elapsed = time.perf_counter() - job.start_time
+        print(f"Tempo até o resultado ({job.serie_selecionada} - {job.prova_nome}): {job.elapsed:.2f}s")
+
+    def _on_report(self, job, final_message):
+        self._elapsed(job)
+        self._log(job, final_message)
+        if job.status == SITUACAO_CANCELANDO:
+            # O processamento verifica o cancelamento até o início da gravação; depois disso os arquivos já existem
+            self._log(job, "O cancelamento chegou depois da gravação dos arquivos.")
+        self.scheduler.finished(job, SITUACAO_CONCLUIDO, final_message)
+
+    def _on_error(self, job, title, message, status):
+        self._elapsed(job)
+        self._log(job, f"{title}: {message}")
+        self.scheduler.finished(job, SITUACAO_ERRO, message)
+
+    def _on_cancelled(self, job):
+        self._log(job, "Cancelado.")
+        self.scheduler.finished(job, SITUACAO_CANCELADO)
+
+    def _on_done(self, job):
+        if not job.finished: # A thread terminou sem informar o resultado
+            self.scheduler.finished(job, SITUACAO_ERRO, "O processamento terminou sem resultado.")
 
     def show_help(self):
         """Exibe a janela de ajuda com explicações e botão para abrir pasta."""
@@ -502,14 +506,21 @@ class ExcelProcessorApp:
         help_text = (
             "1. Nome da Prova: Digite um nome para a prova. Ele será usado para nomear os arquivos de saída (ex: 'Avaliação Final').\n\n"
             "2. Série: Selecione a série correspondente à planilha de notas no arquivo Excel (ex: '1ª Série').\n\n"
-            "3. Coluna da Nota: Digite a letra da coluna (ex: 'N' ou 'P') onde as notas estão localizadas na planilha da série. Apenas uma letra é aceita.\n\n"
+            "3. Coluna da Nota: Digite a letra da coluna (ex: 'N', 'P' ou 'AA') onde as notas estão localizadas na planilha da série.\n\n"
             "4. Arquivo Excel: Clique em 'Procurar' para selecionar o arquivo Excel (.xlsx ou .xls) com as notas e a lista de alunos.\n\n"
-            "5. Iniciar Processamento: Clique neste botão para iniciar a análise e a geração dos arquivos TXT.\n\n"
+            "5. Adicionar à Fila: Clique neste botão para colocar o trabalho (arquivo, série, coluna e prova) na fila de processamento. "
+            "Enquanto ele roda, outras séries e provas podem ser adicionadas; 'Simultâneos' define quantos trabalhos rodam ao mesmo tempo. "
+            "Selecione trabalhos na lista e use 'Cancelar Selecionados' (ou 'Cancelar Todos') para interrompê-los; um trabalho cancelado não gera arquivos.\n\n"
             "Arquivos Gerados:\n"
             "- {Série} - {Prova}.txt: Contém Matrícula e Nota dos alunos encontrados.\n"
             "- ocorrencias {Série} - {Prova}.txt: Lista alunos com nomes ambíguos que precisam de revisão manual.\n"
-            "- Coincidencias parciais {Série} - {Prova}.txt: Lista alunos com nomes parcialmente correspondentes (ex: truncados).\n"
-            "- alunos_nao_encontrados.txt: Lista alunos da planilha de série que não foram encontrados na 'Lista de Alunos'."
+            "- Coincidencias parciais {Série} - {Prova}.txt: Lista alunos com nomes parcialmente correspondentes (ex: truncados) e sugestões de nomes parecidos para os alunos não encontrados.\n"
+            "- alunos_nao_encontrados {Série} - {Prova}.txt: Lista alunos da planilha de série que não foram encontrados na 'Lista de Alunos'.\n"
+            "- relatorio {Série} - {Prova}.json: Tempos de cada etapa e contadores do processamento.\n\n"
+            "Resoluções Manuais:\n"
+            "No relatório de ocorrências, deixe em cada aluno só a linha da matrícula correta (ou marque-a com '*' no início); "
+            "no de coincidências parciais, marque com '*' as confirmadas. Depois, use 'Importar Resoluções'. Nas próximas provas esses alunos são reconhecidos "
+            "automaticamente (arquivo resolucoes.sqlite na pasta de saída)."
         )
         help_display = scrolledtext.ScrolledText(help_frame, width=60, height=14, wrap=tk.WORD, font=("TkDefaultFont", 9))
         help_display.insert(tk.END, help_text)
@@ -524,4 +535,10 @@ class ExcelProcessorApp:
 if __name__ == "__main__":
     app_root = tb.Window(themename="darkly") # Escolha um tema ttkbootstrap
     ExcelProcessorApp(app_root)
+
+    def on_first_window():
+        print(f"Tempo até a janela: {time.perf_counter() - INICIO:.2f}s")
+        threading.Thread(target=preload_processing, daemon=True).start()
+
+    app_root.after(0, on_first_window) # Executado quando o loop do Tk começa (janela já visível)
     app_root.mainloop()
\ No newline at end of file
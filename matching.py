@@ -0,0 +1,307 @@
+import re
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+
+import pandas as pd
+
+from fuzzy import FuzzyIndex
+from normalization import normalize_series
+
+# --- Motor de Correspondência de Nomes ---
+#
+# Índice invertido sobre a 'Lista de Alunos'. A regra de correspondência
+# continua sendo a do process_excel: os tokens do nome da série devem aparecer,
+# em ordem, no nome da lista, sendo o primeiro token o início do nome
+# (regex ^TOKEN1.*TOKEN2.*...$). O índice apenas reduz quais linhas da lista
+# precisam ser testadas contra essa regex.
+
+TAMANHO_NGRAMA = 3
+LIMITE_CANDIDATOS = 32 # Abaixo disso, é mais barato testar a regex direto
+LIMITE_CACHE_TOKENS = 2000000 # Linhas guardadas no cache de tokens; acima disso, sai o token usado há mais tempo
+
+
+def build_name_pattern(nome_std):
+    """Monta a regex de tokens ordenados usada para comparar nomes."""
+    pattern_parts = [re.escape(part) for part in re.split(r'\s+', nome_std) if part]
+    regex_pattern_str = r".*".join(pattern_parts)
+    return re.compile(f"^{regex_pattern_str}.*$", re.IGNORECASE)
+
+
+def _ngramas(token):
+    return {token[i:i + TAMANHO_NGRAMA] for i in range(len(token) - TAMANHO_NGRAMA + 1)}
+
+
+class RosterIndex:
+    """Índice invertido (token do nome -> linhas da lista de alunos)."""
+
+    def __init__(self, nomes_std):
+        self.nomes = list(nomes_std)
+        self.vocabulario = [] # Tokens distintos da lista
+        self.postings = [] # Para cada token do vocabulário, as linhas em que aparece (array de inteiros, em ordem)
+        self.ngramas = {} # n-grama -> índices do vocabulário que o contêm
+        self._cache_tokens = {} # Token da série -> linhas cujo nome contém o token
+        self._linhas_cache = 0 # Total de linhas nos conjuntos do cache de tokens
+        self._fuzzy = None # FuzzyIndex, construído na primeira busca aproximada
+        self._lock = threading.Lock() # O mesmo índice atende trabalhos em threads diferentes (interface e serviço)
+
+        token_ids = {}
+        primeiros = []
+        for row_id, nome in enumerate(self.nomes):
+            for posicao, token in enumerate(nome.split()):
+                token_id = token_ids.get(token)
+                if token_id is None:
+                    token_id = token_ids[token] = len(self.vocabulario)
+                    self.vocabulario.append(token)
+                    self.postings.append(array('i'))
+                    for ngrama in _ngramas(token):
+                        self.ngramas.setdefault(ngrama, []).append(token_id)
+                if posicao == 0:
+                    primeiros.append((self.vocabulario[token_id], row_id)) # O mesmo str do vocabulário
+                postings = self.postings[token_id]
+                if not postings or postings[-1] != row_id: # Token repetido no mesmo nome
+                    postings.append(row_id)
+
+        # Primeiros tokens ordenados, para buscar por prefixo com bisect
+        primeiros.sort()
+        self._primeiros_tokens = [token for token, _ in primeiros]
+        self._primeiros_rows = array('i', [row_id for _, row_id in primeiros])
+
+    def __getstate__(self):
+        # Só o índice: o lock não é serializável, e os caches (que crescem com as buscas)
+        # e o FuzzyIndex são refeitos sob demanda, em vez de ir para o disco ou para cada processo
+        state = self.__dict__.copy()
+        for nome in ('_cache_tokens', '_linhas_cache', '_fuzzy', '_lock'):
+            del state[nome]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cache_tokens = {}
+        self._linhas_cache = 0
+        self._fuzzy = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.nomes)
+
+    def fuzzy(self):
+        """Índice de busca aproximada, construído só quando algum aluno não é encontrado."""
+        if self._fuzzy is None:
+            self._fuzzy = FuzzyIndex(self.nomes)
+        return self._fuzzy
+
+    def _rows_com_prefixo(self, prefixo):
+        """Linhas cujo primeiro token começa com o prefixo informado."""
+        inicio = bisect_left(self._primeiros_tokens, prefixo)
+        rows = set()
+        for pos in range(inicio, len(self._primeiros_tokens)):
+            if not self._primeiros_tokens[pos].startswith(prefixo):
+                break
+            rows.add(self._primeiros_rows[pos])
+        return rows
+
+    def _rows_com_substring(self, token):
+        """Linhas em que algum token do nome contém o token informado."""
+        with self._lock:
+            rows = self._cache_tokens.pop(token, None)
+            if rows is not None:
+                self._cache_tokens[token] = rows # Volta para o fim: sai primeiro o token usado há mais tempo
+                return rows
+
+        if len(token) >= TAMANHO_NGRAMA:
+            # Interseção dos n-gramas restringe os tokens do vocabulário a verificar
+            listas = []
+            for ngrama in _ngramas(token):
+                lista = self.ngramas.get(ngrama)
+                if lista is None:
+                    listas = []
+                    break
+                listas.append(lista)
+            if listas:
+                listas.sort(key=len)
+                token_ids = set(listas[0])
+                for lista in listas[1:]:
+                    token_ids.intersection_update(lista)
+                    if not token_ids:
+                        break
+            else:
+                token_ids = ()
+        else:
+            token_ids = range(len(self.vocabulario))
+
+        rows = set()
+        for token_id in token_ids:
+            if token in self.vocabulario[token_id]:
+                rows.update(self.postings[token_id])
+
+        with self._lock:
+            if token in self._cache_tokens: # Outra thread calculou o mesmo token ao mesmo tempo
+                return rows
+            self._cache_tokens[token] = rows
+            # Em listas muito grandes, tokens comuns ('SILVA') geram conjuntos enormes: o cache tem limite
+            self._linhas_cache += len(rows)
+            while self._cache_tokens and self._linhas_cache > LIMITE_CACHE_TOKENS:
+                self._linhas_cache -= len(self._cache_tokens.pop(next(iter(self._cache_tokens))))
+            if not self._cache_tokens:
+                self._linhas_cache = 0
+        return rows
+
+    def candidates(self, nome_std):
+        """Retorna as linhas que podem satisfazer a regra de tokens ordenados."""
+        tokens = [part for part in re.split(r'\s+', nome_std) if part]
+        if not tokens:
+            return []
+
+        candidatos = self._rows_com_prefixo(tokens[0])
+        restantes = sorted(set(tokens[1:]), key=len, reverse=True) # Tokens longos são mais seletivos
+        for token in restantes:
+            if len(candidatos) <= LIMITE_CANDIDATOS:
+                break
+            candidatos = candidatos & self._rows_com_substring(token)
+        return sorted(candidatos)
+
+    def match(self, nome_std, stats=None):
+        """Retorna, na ordem da lista, as linhas que correspondem ao nome padronizado."""
+        regex_pattern = build_name_pattern(nome_std)
+        candidatos = self.candidates(nome_std)
+        if stats is not None:
+            stats.count('avaliacoes_regex', len(candidatos))
+        return [row_id for row_id in candidatos if regex_pattern.match(self.nomes[row_id])]
+
+
+def exact_matches(nomes_serie_std, nomes_lista_std, roster_index, stats=None):
+    """
+    Casa de uma só vez (hash join) os nomes da série idênticos a um nome da lista.
+    Retorna, indexada como nomes_serie_std, a posição da linha correspondente na lista.
+    """
+    # Nomes repetidos na lista são ambíguos e ficam para o processamento completo
+    nomes_unicos = nomes_lista_std.drop_duplicates(keep=False)
+    posicoes = pd.Series(range(len(nomes_lista_std)), index=nomes_lista_std.index)[nomes_unicos.index]
+    posicoes.index = nomes_unicos.values
+
+    hits = nomes_serie_std[nomes_serie_std != ''].map(posicoes).dropna().astype(int)
+
+    # Um nome exato ainda é ambíguo se outro nome da lista o estender (ex.: 'ANA SILVA' e
+    # 'ANA SILVA SOUZA'), por isso o acerto só vale se a regra de tokens ordenados
+    # apontar exclusivamente para a própria linha.
+    confirmados = {
+        nome: roster_index.match(nome, stats) == [posicao]
+        for nome, posicao in zip(nomes_serie_std[hits.index], hits)
+    }
+    return hits[[confirmados[nome] for nome in nomes_serie_std[hits.index]]]
+
+
+def standardize_roster(df_lista_alunos):
+    """Padroniza as colunas matrícula e nome da 'Lista de Alunos' e acrescenta NomeCompletoLista_STD."""
+    df_lista_alunos.columns = ['Matricula', 'NomeCompletoLista']
+    df_lista_alunos['NomeCompletoLista'] = standardize_roster_names(df_lista_alunos['NomeCompletoLista'])
+    df_lista_alunos['Matricula'] = standardize_matriculas(df_lista_alunos['Matricula'])
+    df_lista_alunos['NomeCompletoLista_STD'] = normalize_series(df_lista_alunos['NomeCompletoLista'])
+    return df_lista_alunos
+
+
+def standardize_roster_names(nomes):
+    """Nome completo de cada linha da lista: texto sem espaços nas pontas, em maiúsculas."""
+    # map(str) e não astype(str): no pandas 3, astype(str) mantém as células vazias como NaN
+    return nomes.map(str).str.strip().str.upper()
+
+
+def standardize_matriculas(matriculas):
+    """Matrícula de cada linha da lista, como texto sem espaços nas pontas."""
+    return matriculas.map(str).str.strip()
+
+
+def prepare_roster(df_lista_alunos):
+    """
+    Padroniza a 'Lista de Alunos' (colunas matrícula e nome) e constrói o seu índice.
+    Retorna o DataFrame com a coluna NomeCompletoLista_STD e o RosterIndex.
+    """
+    df_lista_alunos = standardize_roster(df_lista_alunos)
+    return df_lista_alunos, RosterIndex(df_lista_alunos['NomeCompletoLista_STD'])
+
+
+# --- Acesso às Linhas da Lista de Alunos ---
+#
+# A comparação só precisa da matrícula e do nome completo de cada linha
+# candidata, pela posição na lista. RosterRows lê esses dados do DataFrame de
+# prepare_roster; CompactRoster guarda a lista em forma compacta, montada bloco
+# a bloco, para listas grandes demais para um DataFrame (streaming.py).
+
+class RosterRows:
+    """Matrícula e nome completo de cada linha do DataFrame de prepare_roster, por posição."""
+
+    def __init__(self, df_lista_alunos):
+        self._matriculas = df_lista_alunos['Matricula'].tolist()
+        self._nomes = df_lista_alunos['NomeCompletoLista'].tolist()
+
+    def __len__(self):
+        return len(self._matriculas)
+
+    def matricula(self, row_id):
+        return self._matriculas[row_id]
+
+    def nome(self, row_id):
+        return self._nomes[row_id]
+
+
+def _matricula_inteira(matricula):
+    """Indica se a matrícula volta idêntica depois de guardada como inteiro (sem zeros à esquerda)."""
+    return matricula.isascii() and matricula.isdigit() and len(matricula) <= 18 and (matricula[0] != '0' or len(matricula) == 1)
+
+
+class CompactRoster:
+    """
+    Lista de alunos compacta: nomes padronizados internados (homônimos e o índice
+    compartilham o mesmo texto, e o nome completo só é guardado à parte quando
+    tem acentos) e matrículas em um array de inteiros enquanto forem todas
+    numéricas; na primeira que não for, passam a ser guardadas como texto.
+    """
+
+    def __init__(self):
+        self.nomes = [] # Nome completo (maiúsculas), por linha
+        self.nomes_std = [] # Nome padronizado, por linha
+        self._matriculas = array('q')
+        self._matriculas_texto = None # Lista de textos, quando alguma matrícula não é numérica
+
+    def __len__(self):
+        return len(self.nomes)
+
+    def add_names(self, nomes, nomes_std):
+        """Acrescenta os nomes (standardize_roster_names) e os nomes padronizados de um bloco de linhas."""
+        for nome, nome_std in zip(nomes, nomes_std):
+            nome_std = sys.intern(nome_std)
+            self.nomes_std.append(nome_std)
+            self.nomes.append(nome_std if nome == nome_std else nome)
+
+    def add_matriculas(self, matriculas):
+        """Acrescenta as matrículas (standardize_matriculas), na ordem das linhas."""
+        for matricula in matriculas:
+            if self._matriculas_texto is None:
+                if _matricula_inteira(matricula):
+                    self._matriculas.append(int(matricula))
+                    continue
+                self._matriculas_texto = [str(valor) for valor in self._matriculas]
+                self._matriculas = None
+            self._matriculas_texto.append(matricula)
+
+    def extend(self, df_lista_alunos):
+        """Acrescenta um bloco já padronizado (standardize_roster)."""
+        self.add_names(df_lista_alunos['NomeCompletoLista'], df_lista_alunos['NomeCompletoLista_STD'])
+        self.add_matriculas(df_lista_alunos['Matricula'])
+
+    def matricula(self, row_id):
+        if self._matriculas_texto is not None:
+            return self._matriculas_texto[row_id]
+        return str(self._matriculas[row_id])
+
+    def nome(self, row_id):
+        return self.nomes[row_id]
+
+    def find_matriculas(self, matriculas):
+        """As matrículas informadas que estão na lista."""
+        procuradas = set(matriculas)
+        if not procuradas:
+            return set()
+        return {matricula for matricula in map(self.matricula, range(len(self))) if matricula in procuradas}
@@ -0,0 +1,58 @@
+import unicodedata
+from functools import lru_cache
+
+# --- Padronização de Nomes ---
+#
+# Uma única tabela de tradução (str.translate) remove acentos de maiúsculas e
+# minúsculas, de uma só vez, no lugar de várias substituições com regex.
+
+TAMANHO_MEMO = 65536 # Quantidade máxima de nomes guardados pelo normalize_name
+
+# Acentos "soltos" digitados como caractere próprio (ex.: "D´AVILA")
+ACENTOS_SOLTOS = "´`¨¸˜ˆ~^"
+
+# Letras cuja decomposição Unicode não separa o acento da letra base
+LETRAS_ESPECIAIS = {
+    'Ø': 'O', 'ø': 'o', 'Đ': 'D', 'đ': 'd', 'Ł': 'L', 'ł': 'l',
+    'Æ': 'AE', 'æ': 'ae', 'Œ': 'OE', 'œ': 'oe', 'ß': 'ss',
+}
+
+
+def _build_accent_table():
+    """Monta a tabela de tradução que remove acentos de letras latinas."""
+    table = {}
+    for codepoint in range(0x00C0, 0x0250): # Latin-1, Latin Extended-A e B
+        char = chr(codepoint)
+        base = ''.join(c for c in unicodedata.normalize('NFD', char) if not unicodedata.combining(c))
+        if base and base != char:
+            table[codepoint] = base
+    for char, base in LETRAS_ESPECIAIS.items():
+        table[ord(char)] = base
+    for char in ACENTOS_SOLTOS:
+        table[ord(char)] = None
+    for codepoint in range(0x0300, 0x0370): # Acentos combinantes (texto já decomposto)
+        table[codepoint] = None
+    return str.maketrans(table)
+
+
+ACCENT_TABLE = _build_accent_table()
+
+
+def remove_accents(text):
+    """Remove acentos de uma string para padronização."""
+    return str(text).translate(ACCENT_TABLE)
+
+
+@lru_cache(maxsize=TAMANHO_MEMO)
+def normalize_name(text):
+    """Padroniza um nome: sem acentos, em maiúsculas e com espaços simples."""
+    return ' '.join(remove_accents(text).upper().split())
+
+
+def normalize_series(series):
+    """
+    Padroniza uma coluna inteira de nomes. Cada nome passa por normalize_name,
+    cujo memo serve aos nomes repetidos entre séries e execuções. Células vazias
+    (NaN) viram 'NAN', como o str() de cada valor no processamento original.
+    """
+    return series.map(normalize_name)
@@ -0,0 +1,128 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from common import get_output_path
+from processing import ProcessingError, compute_workbook, load_roster, write_results
+
+# --- Processamento Paralelo (vários arquivos e séries) ---
+#
+# Cada par (arquivo, série) vira uma tarefa executada em um processo separado,
+# já que o processamento é pesado em CPU e threads não ganham nada por causa
+# do GIL. As tarefas recebem só caminhos e trabalhos e devolvem os SerieResult;
+# a gravação dos arquivos fica no processo principal, na ordem dos trabalhos,
+# para que o resultado seja o mesmo do processamento sequencial. As tarefas de
+# um mesmo arquivo só começam depois que a 'Lista de Alunos' dele foi lida uma
+# vez e gravada no cache: sem isso, com o cache vazio (o arquivo acabou de ser
+# salvo), cada série leria e indexaria a mesma lista ao mesmo tempo.
+
+
+def split_tasks(excel_paths, jobs):
+    """Divide os trabalhos em tarefas (arquivo, trabalhos de uma mesma série)."""
+    tasks = []
+    for excel_path in excel_paths:
+        jobs_by_serie = {}
+        for job in jobs:
+            jobs_by_serie.setdefault(job[0], []).append(job)
+        for serie_jobs in jobs_by_serie.values():
+            tasks.append((excel_path, serie_jobs))
+    return tasks
+
+
+def workbook_output_path(destination_path, excel_path, several_workbooks):
+    """Com vários arquivos, cada um grava em uma subpasta com o seu nome, para não se sobreporem."""
+    if not several_workbooks:
+        return destination_path
+    return os.path.join(destination_path, os.path.splitext(os.path.basename(excel_path))[0])
+
+
+def _warm_roster(task):
+    """Executada no processo de trabalho: deixa a lista de alunos de um arquivo no cache."""
+    excel_path, cache_dir = task
+    try:
+        load_roster(None, excel_path, cache_dir)
+    except Exception:
+        pass # O erro aparece de novo, com a mensagem certa, nas tarefas das séries
+
+
+def _run_task(task):
+    """Executada no processo de trabalho: compara uma série de um arquivo."""
+    excel_path, serie_jobs, cache_dir, profile, trace_memory, incremental, alias_path, match_workers = task
+    return compute_workbook(
+        excel_path, serie_jobs, cache_dir=cache_dir, profile=profile, trace_memory=trace_memory, incremental=incremental, alias_path=alias_path,
+        match_workers=match_workers,
+    )
+
+
+def process_workbooks(excel_paths, jobs, destination_path=None, cache_dir=None, workers=None, profile=None, trace_memory=None,
+                      incremental=True, delta=False, alias_path=None, match_workers=None):
+    """
+    Processa os mesmos trabalhos (série, índice da coluna da nota, prova) em vários
+    arquivos Excel, distribuindo as séries entre até `workers` processos (padrão:
+    número de núcleos). Retorna uma lista, na ordem dos arquivos, de pares
+    (arquivo, resultados ou ProcessingError); um arquivo com erro não impede os demais.
+    Com match_workers > 1, cada série grande ainda é comparada em partes, em até
+    match_workers processos (ver sharding.py).
+    """
+    destination_path = destination_path or get_output_path()
+    tasks = split_tasks(excel_paths, jobs)
+    workers = min(workers or os.cpu_count() or 1, len(tasks)) or 1
+
+    task_outcomes = []
+    if workers == 1:
+        for excel_path, serie_jobs in tasks:
+            try:
+                task_outcomes.append(_run_task((excel_path, serie_jobs, cache_dir, profile, trace_memory, incremental, alias_path, match_workers)))
+            except ProcessingError as e:
+                task_outcomes.append(e)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Arquivos com várias séries: a lista de alunos é lida uma vez antes de dividir as séries
+            tasks_by_path = {}
+            for excel_path, _ in tasks:
+                tasks_by_path[excel_path] = tasks_by_path.get(excel_path, 0) + 1
+            warm_ups = {
+                excel_path: executor.submit(_warm_roster, (excel_path, cache_dir))
+                for excel_path, count in tasks_by_path.items() if count > 1
+            }
+            futures = []
+            for excel_path, serie_jobs in tasks:
+                if excel_path in warm_ups:
+                    warm_ups[excel_path].result()
+                futures.append(executor.submit(
+                    _run_task, (excel_path, serie_jobs, cache_dir, profile, trace_memory, incremental, alias_path, match_workers),
+                ))
+            for future in futures:
+                try:
+                    task_outcomes.append(future.result())
+                except ProcessingError as e:
+                    task_outcomes.append(e)
+
+    # Junta os resultados de cada arquivo de volta na ordem original dos trabalhos
+    outcomes = []
+    several_workbooks = len(excel_paths) > 1
+    for excel_path in excel_paths:
+        results_by_job = {}
+        error = None
+        for (task_path, serie_jobs), outcome in zip(tasks, task_outcomes):
+            if task_path != excel_path:
+                continue
+            if isinstance(outcome, ProcessingError):
+                error = error or outcome
+                continue
+            for job, result in zip(serie_jobs, outcome):
+                results_by_job[job] = result
+
+        if error is not None:
+            outcomes.append((excel_path, error))
+            continue
+        results = [results_by_job[job] for job in jobs]
+        try:
+            write_results(
+                results, workbook_output_path(destination_path, excel_path, several_workbooks), excel_path=excel_path, delta=delta,
+                cache_dir=cache_dir,
+            )
+        except ProcessingError as e:
+            outcomes.append((excel_path, e))
+            continue
+        outcomes.append((excel_path, results))
+    return outcomes
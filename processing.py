@@ -0,0 +1,714 @@
+import hashlib
+import json
+import os
+import threading
+from array import array
+from collections import OrderedDict
+
+import pandas as pd
+
+from aliases import AliasStore
+from cache import RosterCache, SerieStateStore, sheet_content_hash, workbook_fingerprint
+from common import ProcessingError, delta_file_name, get_alias_path, get_cache_path, get_output_path, output_file_names, report_file_name
+from instrumentation import RunStats, profiling
+from matching import RosterRows, exact_matches, prepare_roster
+from normalization import normalize_series
+from sharding import map_shards, shard_count, shared_state
+from workbook import LINHA_INICIAL_SERIE, PLANILHA_LISTA_ALUNOS, open_workbook, read_columns, read_roster_sheet
+from writer import OutputWriteError, OutputWriter, write_text_atomic
+
+# --- Núcleo de Processamento (sem interface gráfica) ---
+#
+# Usado tanto pela interface (main.py) quanto pelo modo de linha de comando
+# (cli.py). Nada aqui acessa widgets: o andamento é informado por um callback
+# progress(valor, texto) e os erros por ProcessingError.
+
+class SerieResult:
+    """Resultado da comparação de uma planilha de série com a lista de alunos."""
+
+    def __init__(self, serie_selecionada, prova_nome):
+        self.serie_selecionada = serie_selecionada
+        self.prova_nome = prova_nome
+        self.total_alunos = 0 # Alunos com nota válida (nomes únicos)
+        self.matched_alunos = [] # Linhas 'matricula\tnota' do arquivo principal
+        self.ambiguities_list = [] # Múltiplas correspondências (ambiguidades)
+        self.partial_matches_log = [] # Coincidências parciais
+        self.not_found_alunos = [] # Alunos não encontrados
+        self.suggestions_log = [] # Sugestões por nome aproximado para alunos não encontrados
+        self.row_outcomes = {} # Hash da linha da série -> resultado (estado para a próxima execução)
+        self.changed_alunos = None # Linhas do arquivo principal novas ou alteradas desde a execução anterior
+        self.roster_key = None # Identifica a lista de alunos usada (o estado só vale para a mesma lista)
+        self.state = None # Estado para a próxima execução, gravado só depois dos arquivos (ver save_state)
+        self.stats = RunStats() # Tempos por etapa e contadores
+
+    @property
+    def has_occurrences(self):
+        return bool(self.ambiguities_list)
+
+    @property
+    def has_partial_matches(self):
+        return bool(self.partial_matches_log)
+
+    @property
+    def has_suggestions(self):
+        return bool(self.suggestions_log)
+
+    @property
+    def file_names(self):
+        return output_file_names(self.serie_selecionada, self.prova_nome)
+
+
+def _no_progress(value, text=None):
+    pass
+
+
+def _check_cancel(cancel):
+    """Interrompe o processamento se o CancelToken (opcional) pediu o cancelamento."""
+    if cancel is not None:
+        cancel.check()
+
+
+# --- Leitura ---
+
+def read_serie(workbook, serie_selecionada, column_note_indexes):
+    """
+    Lê, em uma única passada pela planilha da série, a coluna de nomes e todas as
+    colunas de nota pedidas. Retorna um DataFrame (nome, nota) por coluna.
+    """
+    try:
+        df = read_columns(workbook, serie_selecionada, [0] + list(column_note_indexes), start_row=LINHA_INICIAL_SERIE)
+    except ValueError:
+        raise ProcessingError(
+            "Erro de Planilha",
+            f"A planilha '{serie_selecionada}' não foi encontrada no arquivo Excel. Verifique o nome da planilha.",
+            "Erro: Planilha da série não encontrada.",
+        )
+    return [df[[0, position]].copy() for position in range(1, len(column_note_indexes) + 1)]
+
+
+# Últimas listas de alunos usadas neste processo (interface, monitoramento de
+# pastas), pelo hash da planilha 'Lista de Alunos': um novo processamento do
+# mesmo arquivo, mesmo salvo de novo com outras notas, nem lê o cache em disco.
+LISTAS_EM_MEMORIA = 4
+_rosters_em_memoria = OrderedDict() # Hash da planilha -> lista de alunos
+_hashes_em_memoria = {} # Chave rápida do arquivo -> hash da planilha (só a versão atual de cada arquivo)
+_rosters_lock = threading.Lock()
+
+
+def _roster_content_hash(excel_path, fingerprint):
+    """Hash da planilha 'Lista de Alunos', calculado uma vez por versão do arquivo."""
+    with _rosters_lock:
+        content_hash = _hashes_em_memoria.get(fingerprint)
+    if content_hash is not None:
+        return content_hash
+
+    # Arquivos que não são .xlsx não têm hash: vale a chave rápida
+    content_hash = sheet_content_hash(excel_path, PLANILHA_LISTA_ALUNOS) or fingerprint
+    excel_path_key = fingerprint.split('|', 1)[0]
+    with _rosters_lock:
+        for key in [key for key in _hashes_em_memoria if key.split('|', 1)[0] == excel_path_key]:
+            del _hashes_em_memoria[key]
+        _hashes_em_memoria[fingerprint] = content_hash
+    return content_hash
+
+
+def _memory_roster(content_hash, roster=None):
+    """Consulta (ou, com `roster`, grava) a lista de alunos guardada em memória."""
+    with _rosters_lock:
+        if roster is None:
+            roster = _rosters_em_memoria.get(content_hash)
+            if roster is not None:
+                _rosters_em_memoria.move_to_end(content_hash)
+            return roster
+        _rosters_em_memoria[content_hash] = roster
+        _rosters_em_memoria.move_to_end(content_hash)
+        while len(_rosters_em_memoria) > LISTAS_EM_MEMORIA:
+            _rosters_em_memoria.popitem(last=False)
+        return roster
+
+
+def load_roster(workbook, excel_path, cache_dir=None, stats=None):
+    """
+    Retorna a lista de alunos padronizada e indexada, usando a memória ou o cache
+    local quando possível. Com workbook=None, o arquivo só é aberto se for preciso.
+    """
+    content_hash = _roster_content_hash(excel_path, workbook_fingerprint(excel_path))
+    roster = _memory_roster(content_hash)
+    if roster is not None:
+        if stats is not None:
+            stats.count('lista_alunos_em_memoria')
+        return roster
+
+    roster_cache = RosterCache(cache_dir or get_cache_path())
+    roster = roster_cache.load(excel_path, PLANILHA_LISTA_ALUNOS)
+    if stats is not None:
+        stats.count('cache_lista_alunos_acertos' if roster is not None else 'cache_lista_alunos_faltas')
+    if roster is None:
+        own_workbook = workbook is None
+        if own_workbook:
+            workbook = open_workbook(excel_path, cache_dir or get_cache_path(), stats)
+        try:
+            df_lista_alunos = read_roster_sheet(workbook)
+        except ValueError:
+            raise ProcessingError(
+                "Erro de Planilha",
+                "A planilha 'Lista de Alunos' não foi encontrada no arquivo Excel. Verifique o nome da planilha.",
+                "Erro: Planilha 'Lista de Alunos' não encontrada.",
+            )
+        finally:
+            if own_workbook:
+                workbook.close()
+        roster = prepare_roster(df_lista_alunos)
+        roster_cache.store(excel_path, PLANILHA_LISTA_ALUNOS, roster)
+    return _memory_roster(content_hash, roster)
+
+
+def warm_up_roster(excel_path, cache_dir=None):
+    """
+    Prepara a lista de alunos (e o índice da busca aproximada) de um arquivo antes
+    do processamento, para a interface começar a carregar ao escolher o arquivo.
+    Retorna o número de alunos, ou None se não foi possível (o erro aparece de
+    novo, com a mensagem certa, quando o processamento for iniciado).
+    """
+    try:
+        roster = load_roster(None, excel_path, cache_dir)
+        roster[1].fuzzy()
+    except Exception:
+        return None
+    return len(roster[0])
+
+
+def prepare_serie(df_serie):
+    """Padroniza nomes e notas da série e mantém só a primeira ocorrência de cada nome."""
+    df_serie.columns = ['NomeAlunoSerie', 'Nota']
+    # map(str) e não astype(str): no pandas 3, astype(str) mantém as células vazias como NaN ('nan' antes)
+    df_serie['NomeAlunoSerie'] = df_serie['NomeAlunoSerie'].map(str).str.strip().str.upper()
+    df_serie['Nota'] = df_serie['Nota'].map(str).str.replace(',', '.', regex=False)
+    df_serie['Nota'] = pd.to_numeric(df_serie['Nota'], errors='coerce')
+    df_serie.dropna(subset=['Nota'], inplace=True)
+
+    # Garante nomes únicos da planilha de série (vale a primeira ocorrência)
+    df_serie = df_serie.drop_duplicates(subset='NomeAlunoSerie')
+    df_serie['NomeAlunoSerie_STD'] = normalize_series(df_serie['NomeAlunoSerie'])
+    return df_serie
+
+
+# --- Comparação ---
+
+def row_keys(df_serie):
+    """Hash (nome, nota) de cada linha da série: a linha só muda de resultado se um deles mudar."""
+    return pd.util.hash_pandas_object(df_serie[['NomeAlunoSerie', 'Nota']], index=False).tolist()
+
+
+def main_line(matricula, nota_serie):
+    """Linha 'matricula\tnota' do arquivo principal (nota com uma casa decimal e vírgula)."""
+    nota_formatada = f"{nota_serie:.1f}".replace('.',',')
+    return f"{matricula}\t{nota_formatada}"
+
+
+def match_row(nome_aluno_serie_original, nota_serie, nome_aluno_serie_std, lista, roster_index, stats):
+    """
+    Compara um aluno da série com a lista de alunos (lista: matrícula e nome por
+    linha, ver matching.RosterRows). Retorna o resultado da linha: (linha do arquivo
+    principal, coincidência parcial, ambiguidade, nome não encontrado, sugestões).
+    """
+    # Só as linhas candidatas do índice são testadas contra a regex de tokens ordenados
+    potential_matches = roster_index.match(nome_aluno_serie_std, stats)
+    return row_outcome(nome_aluno_serie_original, nota_serie, nome_aluno_serie_std, potential_matches, lista, roster_index)
+
+
+def row_outcome(nome_aluno_serie_original, nota_serie, nome_aluno_serie_std, potential_matches, lista, roster_index):
+    """Resultado da linha (ver match_row) a partir das linhas da lista que correspondem ao nome."""
+    if len(potential_matches) == 1:
+        row_id = potential_matches[0]
+        matched_name_lista_std = roster_index.nomes[row_id]
+        matricula = lista.matricula(row_id)
+
+        if matched_name_lista_std == nome_aluno_serie_std:
+            return (main_line(matricula, nota_serie), None, None, None, None)
+        elif nome_aluno_serie_std.startswith(matched_name_lista_std) and len(nome_aluno_serie_std) > len(matched_name_lista_std):
+            partial_info = (
+                f"Aluno da Série: '{nome_aluno_serie_original}' (Nota: {nota_serie:.1f})\n"
+                f"  Coincidência Parcial com Lista de Alunos:\n"
+                f"  - Matrícula: {matricula}, Nome Completo: '{lista.nome(row_id)}'\n"
+                f"----------------------------------------\n"
+            )
+            return (f"{matricula}\t{nota_serie:.1f}", partial_info, None, None, None)
+        # Else: single regex match but not exact or prefix, treated as not found for now
+        return (None, None, None, None, None)
+    elif len(potential_matches) > 1:
+        ambiguity_info = f"Aluno da Série: '{nome_aluno_serie_original}' (Nota: {nota_serie:.1f})\n"
+        ambiguity_info += "Possíveis correspondências (Ambíguas) na Lista de Alunos:\n"
+        for row_id in potential_matches:
+            ambiguity_info += f"- Matrícula: {lista.matricula(row_id)}, Nome: '{lista.nome(row_id)}'\n"
+        ambiguity_info += "----------------------------------------\n"
+        return (None, None, ambiguity_info, None, None)
+
+    # Adicionar aluno à lista de não encontrados se nenhuma das condições acima for satisfeita
+    return (None, None, None, nome_aluno_serie_original, None)
+
+
+def match_serie(df_serie, roster, serie_selecionada, prova_nome, progress=_no_progress, stats=None, previous_rows=None, aliases=None,
+                cancel=None, match_workers=None):
+    """
+    Compara os alunos da série (já preparados) com a lista de alunos. Com
+    previous_rows (hash da linha -> resultado, de uma execução anterior com a
+    mesma lista de alunos), só as linhas novas ou alteradas são comparadas.
+    aliases (nome padronizado -> matrícula) são resoluções manuais, que valem
+    antes de qualquer comparação. `cancel` (CancelToken) é verificado a cada aluno.
+    Com match_workers > 1, as séries grandes são comparadas em partes, em até
+    match_workers processos (ver sharding.py), com o mesmo resultado.
+    """
+    df_lista_alunos, roster_index = roster
+    lista = RosterRows(df_lista_alunos)
+    result = SerieResult(serie_selecionada, prova_nome)
+    if stats is not None:
+        result.stats = stats
+    stats = result.stats
+    result.total_alunos = len(df_serie)
+    stats.count('alunos', result.total_alunos)
+    if result.total_alunos == 0:
+        return result
+
+    # Resultado de cada linha da série, reaproveitado da execução anterior quando possível
+    keys = list(zip(df_serie.index, row_keys(df_serie)))
+    outcomes = {}
+
+    # Resoluções manuais: consulta direta, sem comparação (só para matrículas ainda na lista)
+    if aliases:
+        matriculas_lista = set(df_lista_alunos['Matricula'])
+        for index, nome_aluno_serie_std, nota_serie in zip(df_serie.index, df_serie['NomeAlunoSerie_STD'], df_serie['Nota']):
+            matricula = aliases.get(nome_aluno_serie_std)
+            if matricula is not None and matricula in matriculas_lista:
+                outcomes[index] = (main_line(matricula, nota_serie), None, None, None, None)
+        stats.count('resolucoes_manuais', len(outcomes))
+    resolved = set(outcomes) # Não entram no estado: dependem das resoluções, não só da linha
+
+    if previous_rows:
+        reaproveitadas = 0
+        for index, key in keys:
+            outcome = previous_rows.get(key)
+            if outcome is not None and index not in resolved:
+                outcomes[index] = outcome
+                reaproveitadas += 1
+        stats.count('linhas_reaproveitadas', reaproveitadas)
+    df_novo = df_serie.drop(index=list(outcomes)) if outcomes else df_serie
+
+    # Etapa rápida: nomes idênticos a um único nome da lista, resolvidos de uma vez
+    exatos = exact_matches(df_novo['NomeAlunoSerie_STD'], df_lista_alunos['NomeCompletoLista_STD'], roster_index, stats)
+    stats.count('exatos_etapa_rapida', len(exatos))
+    if len(exatos):
+        notas_exatas = df_novo.loc[exatos.index, 'Nota'].map('{:.1f}'.format).str.replace('.', ',', regex=False)
+        matriculas_exatas = df_lista_alunos['Matricula'].iloc[exatos.values].set_axis(exatos.index)
+        for index, line in (matriculas_exatas + '\t' + notas_exatas).items():
+            outcomes[index] = (line, None, None, None, None)
+
+    # Só os alunos restantes passam pela comparação parcial/ambígua
+    df_residual = df_novo.drop(index=exatos.index)
+    total_residual = len(df_residual)
+    if shard_count(total_residual, match_workers) > 1:
+        not_found_std = _match_residual_sharded(df_residual, lista, roster_index, outcomes, stats, match_workers, progress, cancel)
+    else:
+        not_found_std = [] # (índice, nota, nome padronizado) para a busca aproximada
+        for posicao, (index, row_serie) in enumerate(df_residual.iterrows()):
+            _check_cancel(cancel)
+            nome_aluno_serie_original = row_serie['NomeAlunoSerie']
+            nota_serie = row_serie['Nota']
+            nome_aluno_serie_std = row_serie['NomeAlunoSerie_STD']
+
+            if not nome_aluno_serie_std: # Evita erro se o nome estiver vazio após limpeza
+                print(f"Alerta: Nome vazio ou inválido na série: '{nome_aluno_serie_original}'. Ignorado.")
+                outcomes[index] = (None, None, None, None, None)
+                continue
+
+            outcomes[index] = match_row(nome_aluno_serie_original, nota_serie, nome_aluno_serie_std, lista, roster_index, stats)
+            if outcomes[index][3] is not None:
+                not_found_std.append((index, nota_serie, nome_aluno_serie_std))
+
+            # Atualiza barra de progresso
+            percent = (posicao + 1) / total_residual * 100
+            progress(30 + (percent * 0.6), f"Processando: {int(percent)}% - {nome_aluno_serie_original}")
+
+    if not_found_std:
+        progress(90, "Procurando nomes aproximados...")
+        fuzzy_index = roster_index.fuzzy()
+        sugestoes = None # Nomes parecidos de cada aluno, quando calculados em partes
+        if shard_count(len(not_found_std), match_workers) > 1:
+            nomes_std = [nome_aluno_serie_std for _, _, nome_aluno_serie_std in not_found_std]
+            partes = map_shards(_suggest_shard, (fuzzy_index, nomes_std), len(nomes_std), match_workers, cancel=cancel)
+            sugestoes = [suggestions for parte in partes for suggestions in parte]
+        for posicao, (index, nota_serie, nome_aluno_serie_std) in enumerate(not_found_std):
+            _check_cancel(cancel)
+            nome_aluno_serie_original = outcomes[index][3]
+            if sugestoes is None:
+                suggestion = suggestion_info(nome_aluno_serie_original, nota_serie, nome_aluno_serie_std, lista, fuzzy_index)
+            else:
+                suggestion = suggestion_text(nome_aluno_serie_original, nota_serie, sugestoes[posicao], lista)
+            outcomes[index] = outcomes[index][:4] + (suggestion,)
+
+    # Monta as listas na ordem da planilha da série
+    for index in df_serie.index:
+        line, partial_info, ambiguity_info, not_found_name, suggestion = outcomes[index]
+        if line is not None:
+            result.matched_alunos.append(line)
+        if partial_info is not None:
+            result.partial_matches_log.append(partial_info)
+        if ambiguity_info is not None:
+            result.ambiguities_list.append(ambiguity_info)
+        if not_found_name is not None:
+            result.not_found_alunos.append(not_found_name)
+        if suggestion is not None:
+            result.suggestions_log.append(suggestion)
+    result.row_outcomes = {key: outcomes[index] for index, key in keys if index not in resolved}
+
+    stats.count('encontrados', len(result.matched_alunos))
+    stats.count('parciais', len(result.partial_matches_log))
+    stats.count('ambiguos', len(result.ambiguities_list))
+    stats.count('nao_encontrados', len(result.not_found_alunos))
+    stats.count('sugestoes', len(result.suggestions_log))
+    return result
+
+
+def suggestion_info(nome_aluno_serie_original, nota_serie, nome_aluno_serie_std, lista, fuzzy_index):
+    """Texto com os nomes mais parecidos da lista de alunos, ou None se não houver nenhum."""
+    suggestions = fuzzy_index.suggestions(nome_aluno_serie_std)
+    return suggestion_text(nome_aluno_serie_original, nota_serie, suggestions, lista)
+
+
+def suggestion_text(nome_aluno_serie_original, nota_serie, suggestions, lista):
+    """Texto das sugestões (linha da lista, semelhança) de FuzzyIndex.suggestions, ou None se não houver nenhuma."""
+    if not suggestions:
+        return None
+    info = f"Aluno da Série: '{nome_aluno_serie_original}' (Nota: {nota_serie:.1f})\n"
+    info += "  Não encontrado. Nomes parecidos na Lista de Alunos (não incluídos no arquivo principal):\n"
+    for row_id, score in suggestions:
+        info += f"  - Matrícula: {lista.matricula(row_id)}, Nome Completo: '{lista.nome(row_id)}', Semelhança: {score:.0%}\n"
+    info += "----------------------------------------\n"
+    return info
+
+
+# --- Comparação em Partes (ver sharding.py) ---
+
+def _match_shard(inicio, fim):
+    """Executada no processo de trabalho: linhas da lista que correspondem a cada nome da parte."""
+    roster_index, nomes_std = shared_state()
+    stats = RunStats()
+    quantidades = array('i') # Linhas correspondentes de cada nome, em sequência em `linhas`
+    linhas = array('i')
+    for nome_aluno_serie_std in nomes_std[inicio:fim]:
+        potential_matches = roster_index.match(nome_aluno_serie_std, stats)
+        quantidades.append(len(potential_matches))
+        linhas.extend(potential_matches)
+    return quantidades, linhas, stats.counters
+
+
+def _suggest_shard(inicio, fim):
+    """Executada no processo de trabalho: nomes parecidos (FuzzyIndex.suggestions) de cada nome da parte."""
+    fuzzy_index, nomes_std = shared_state()
+    return [fuzzy_index.suggestions(nome_aluno_serie_std) for nome_aluno_serie_std in nomes_std[inicio:fim]]
+
+
+def _match_residual_sharded(df_residual, lista, roster_index, outcomes, stats, match_workers, progress, cancel):
+    """
+    Como o laço de match_serie, mas com a busca no índice feita em partes por até
+    match_workers processos. Preenche `outcomes` e retorna os não encontrados
+    (índice, nota, nome padronizado), na ordem da planilha.
+    """
+    rows = [] # (índice, nome original, nota, nome padronizado) a comparar
+    for index, nome_aluno_serie_original, nota_serie, nome_aluno_serie_std in zip(
+        df_residual.index, df_residual['NomeAlunoSerie'], df_residual['Nota'], df_residual['NomeAlunoSerie_STD'],
+    ):
+        if not nome_aluno_serie_std: # Evita erro se o nome estiver vazio após limpeza
+            print(f"Alerta: Nome vazio ou inválido na série: '{nome_aluno_serie_original}'. Ignorado.")
+            outcomes[index] = (None, None, None, None, None)
+            continue
+        rows.append((index, nome_aluno_serie_original, nota_serie, nome_aluno_serie_std))
+
+    def shard_progress(feitas, partes):
+        progress(30 + 60 * feitas / partes, f"Processando: {feitas * 100 // partes}% ({feitas} de {partes} partes)")
+
+    nomes_std = [row[3] for row in rows]
+    partes = map_shards(_match_shard, (roster_index, nomes_std), len(rows), match_workers, shard_progress, cancel)
+    stats.count('partes_comparacao', len(partes))
+
+    # Junta as partes na ordem: a posição de cada nome em `rows` segue a das partes
+    not_found_std = []
+    rows = iter(rows)
+    for quantidades, linhas, counters in partes:
+        for name, amount in counters.items():
+            stats.count(name, amount)
+        inicio = 0
+        for quantidade in quantidades:
+            index, nome_aluno_serie_original, nota_serie, nome_aluno_serie_std = next(rows)
+            potential_matches = linhas[inicio:inicio + quantidade].tolist()
+            inicio += quantidade
+            outcomes[index] = row_outcome(nome_aluno_serie_original, nota_serie, nome_aluno_serie_std, potential_matches, lista, roster_index)
+            if outcomes[index][3] is not None:
+                not_found_std.append((index, nota_serie, nome_aluno_serie_std))
+    return not_found_std
+
+
+# --- Escrita ---
+
+def run_header(titulo, serie_selecionada, prova_nome):
+    """Cabeçalho dos relatórios: o que é, de qual série/prova e de quando é a execução."""
+    return f"--- {titulo} em {serie_selecionada} - {prova_nome} ---\nExecução: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+
+
+def build_outputs(result, destination_path=None, delta=False):
+    """
+    Monta em um OutputWriter (ainda sem gravar) os arquivos TXT de um resultado:
+    os que ficariam vazios são marcados para remoção. Com `delta`, inclui também
+    o arquivo de alterações (mesmo vazio).
+    """
+    serie_selecionada, prova_nome = result.serie_selecionada, result.prova_nome
+    output_file_name_main, output_file_name_ambiguities, output_file_name_partial, output_file_name_not_found = result.file_names
+    output_file_name_delta = delta_file_name(serie_selecionada, prova_nome)
+    writer = OutputWriter(destination_path)
+
+    # 4. Arquivo TXT principal
+    if result.matched_alunos:
+        writer.write_lines(output_file_name_main, result.matched_alunos)
+    else:
+        writer.remove(output_file_name_main)
+
+    # 5. Arquivo de ambigüidades (se houver)
+    if result.ambiguities_list:
+        writer.write(output_file_name_ambiguities, run_header("Ocorrências (Ambíguas)", serie_selecionada, prova_nome))
+        writer.write_lines(output_file_name_ambiguities, result.ambiguities_list)
+    else:
+        writer.remove(output_file_name_ambiguities)
+
+    # 6. Arquivo de coincidências parciais (se houver), com as sugestões para não encontrados
+    if result.partial_matches_log or result.suggestions_log:
+        writer.write(output_file_name_partial, run_header("Coincidências Parciais", serie_selecionada, prova_nome))
+        writer.write_lines(output_file_name_partial, result.partial_matches_log)
+        if result.suggestions_log:
+            writer.write(output_file_name_partial, "--- Sugestões para Alunos Não Encontrados (confirme antes de usar) ---\n\n")
+            writer.write_lines(output_file_name_partial, result.suggestions_log)
+    else:
+        writer.remove(output_file_name_partial)
+
+    # 7. Arquivo de alunos não encontrados (se houver)
+    if result.not_found_alunos:
+        writer.write(output_file_name_not_found, run_header("Alunos Não Encontrados", serie_selecionada, prova_nome))
+        writer.write_lines(output_file_name_not_found, result.not_found_alunos)
+    else:
+        writer.remove(output_file_name_not_found)
+
+    if delta:
+        writer.write_lines(output_file_name_delta, result.changed_alunos or [])
+    return writer
+
+
+def write_outputs(result, destination_path, delta=False):
+    """
+    Grava os arquivos TXT de um resultado no diretório de destino, de uma só vez e
+    de forma atômica (ver writer.py). Cada arquivo é reescrito com o resultado da
+    execução atual; arquivos de uma execução anterior que agora ficariam vazios
+    são apagados. Com `delta`, grava também o arquivo de alterações (mesmo vazio).
+    """
+    writer = build_outputs(result, destination_path, delta)
+    try:
+        writer.commit()
+    except (OutputWriteError, OSError) as e:
+        raise write_error(result, destination_path, e)
+
+
+def write_error(result, destination_path, error):
+    """ProcessingError com a descrição do arquivo de saída que não pôde ser gravado."""
+    file_name = getattr(error, 'file_name', None)
+    output_file_name_main, output_file_name_ambiguities, output_file_name_partial, output_file_name_not_found = result.file_names
+    output_file_name_delta = delta_file_name(result.serie_selecionada, result.prova_nome)
+    descricao, status = {
+        output_file_name_main: ("o arquivo principal", "Erro de escrita principal."),
+        output_file_name_ambiguities: ("o arquivo de ambigüidades", "Erro de escrita de ambigüidades."),
+        output_file_name_partial: ("o arquivo de coincidências parciais", "Erro de escrita de coincidências parciais."),
+        output_file_name_not_found: ("o arquivo de alunos não encontrados", "Erro de escrita de alunos não encontrados."),
+        output_file_name_delta: ("o arquivo de alterações", "Erro de escrita de alterações."),
+    }.get(file_name, ("os arquivos de saída em", "Erro de escrita."))
+    erro = getattr(error, 'error', error)
+    return ProcessingError("Erro de Escrita", f"Não foi possível salvar {descricao} '{file_name or destination_path}'. Erro: {erro}", status)
+
+
+def report_data(result, excel_path=None):
+    """Conteúdo do relatório JSON: tempos por etapa e contadores da execução."""
+    report = {
+        'serie': result.serie_selecionada,
+        'prova': result.prova_nome,
+        'arquivo_excel': excel_path,
+        'data': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    report.update(result.stats.to_dict())
+    return report
+
+
+def write_report(result, destination_path, excel_path=None):
+    """Grava o relatório JSON (tempos por etapa e contadores) ao lado do arquivo TXT."""
+    report = report_data(result, excel_path)
+    report_path = os.path.join(destination_path, report_file_name(result.serie_selecionada, result.prova_nome))
+    try:
+        write_text_atomic(destination_path, os.path.basename(report_path), json.dumps(report, ensure_ascii=False, indent=2))
+    except (OutputWriteError, OSError) as e:
+        # O relatório é informativo: não impede o uso dos arquivos já gravados
+        print(f"Alerta: não foi possível salvar o relatório '{report_path}'. Erro: {e}")
+
+
+# --- Execução Completa ---
+
+def roster_content_key(df_lista_alunos):
+    """Hash do conteúdo da lista de alunos (matrículas e nomes)."""
+    hashes = pd.util.hash_pandas_object(df_lista_alunos[['Matricula', 'NomeCompletoLista']], index=False)
+    return hashlib.sha256(hashes.values.tobytes()).hexdigest()
+
+
+def changed_lines(previous_lines, lines):
+    """Linhas 'matricula\\tnota' novas ou com nota diferente das da execução anterior."""
+    previous = {line.split('\t', 1)[0]: line for line in previous_lines}
+    return [line for line in lines if previous.get(line.split('\t', 1)[0]) != line]
+
+
+def compute_workbook(excel_path, jobs, cache_dir=None, progress=_no_progress, profile=None, trace_memory=None, incremental=True,
+                     alias_path=None, cancel=None, match_workers=None):
+    """
+    Executa a comparação de vários trabalhos (série, índice da coluna da nota, nome
+    da prova) de um mesmo arquivo Excel, abrindo-o uma única vez. A lista de alunos
+    é lida (ou carregada do cache) uma vez e compartilhada por todos os trabalhos,
+    e cada planilha de série é percorrida uma única vez, mesmo com várias colunas
+    de nota. Retorna os SerieResult na ordem dos trabalhos, sem gravar arquivos.
+    Cada resultado traz em `stats` os tempos das etapas compartilhadas e as suas
+    próprias; profile/trace_memory ligam o cProfile/tracemalloc (padrão: variáveis
+    de ambiente NOTAS_PERFIL e NOTAS_MEMORIA). O resultado de cada linha fica em
+    `state`, que save_state grava no cache depois que os arquivos forem gravados;
+    com `incremental`, a execução seguinte da mesma série e prova só compara as
+    linhas novas ou alteradas. As resoluções manuais de nomes vêm de
+    alias_path (padrão: get_alias_path()). Com `cancel` (CancelToken), um pedido de
+    cancelamento interrompe a comparação com ProcessingCancelled, sem gravar o estado.
+    match_workers > 1 divide a comparação das séries grandes entre processos (ver match_serie);
+    é ignorado quando há outras threads em execução (interface, serviço HTTP), ver sharding.py.
+    """
+    with profiling(profile, trace_memory) as profile_output:
+        results = _compute_workbook(excel_path, jobs, cache_dir, progress, incremental, alias_path, cancel, match_workers)
+    if profile_output.text:
+        for result in results:
+            result.stats.profile_text = profile_output.text
+    return results
+
+
+def _compute_workbook(excel_path, jobs, cache_dir, progress, incremental, alias_path, cancel, match_workers):
+    progress(0, "Carregando arquivo Excel...")
+    if not os.path.exists(excel_path):
+        raise ProcessingError(
+            "Erro de Arquivo",
+            f"Arquivo Excel não encontrado: '{excel_path}'. Por favor, verifique o caminho.",
+            "Erro: Arquivo Excel não encontrado.",
+        )
+
+    # Colunas de nota pedidas para cada série, na ordem em que aparecem nos trabalhos
+    columns_by_serie = {}
+    for serie_selecionada, column_note_index, _ in jobs:
+        columns = columns_by_serie.setdefault(serie_selecionada, [])
+        if column_note_index not in columns:
+            columns.append(column_note_index)
+
+    shared_stats = RunStats() # Etapas feitas uma única vez para todos os trabalhos
+    workbook = open_workbook(excel_path, cache_dir or get_cache_path(), shared_stats)
+    try:
+        df_by_job = {}
+        with shared_stats.phase('leitura'):
+            for serie_selecionada, columns in columns_by_serie.items():
+                for column_note_index, df_serie in zip(columns, read_serie(workbook, serie_selecionada, columns)):
+                    df_by_job[(serie_selecionada, column_note_index)] = df_serie
+        with shared_stats.phase('lista_alunos'):
+            roster = load_roster(workbook, excel_path, cache_dir, shared_stats)
+    finally:
+        workbook.close()
+    shared_stats.count('linhas_lista_alunos', len(roster[0]))
+
+    with shared_stats.phase('resolucoes'):
+        aliases = AliasStore(alias_path or get_alias_path()).load()
+    state_store = SerieStateStore(cache_dir or get_cache_path())
+    with shared_stats.phase('estado'):
+        roster_key = roster_content_key(roster[0])
+
+    results = []
+    for serie_selecionada, column_note_index, prova_nome in jobs:
+        _check_cancel(cancel)
+        stats = shared_stats.copy()
+        progress(10, "Pré-processando dados...")
+        with stats.phase('pre_processamento'):
+            df_serie = df_by_job[(serie_selecionada, column_note_index)]
+            stats.count('linhas_lidas', len(df_serie))
+            df_serie = prepare_serie(df_serie.copy())
+        progress(30)
+
+        previous_rows = None
+        with stats.phase('estado'):
+            previous_state = state_store.load(excel_path, serie_selecionada, prova_nome)
+        # Resultados anteriores só valem se a lista de alunos for a mesma
+        if incremental and previous_state is not None and previous_state.get('lista_alunos') == roster_key:
+            previous_rows = previous_state['linhas']
+
+        with stats.phase('comparacao'):
+            result = match_serie(
+                df_serie, roster, serie_selecionada, prova_nome, progress, stats, previous_rows, aliases, cancel, match_workers,
+            )
+        results.append(result)
+
+        result.roster_key = roster_key
+        if previous_state is not None:
+            result.changed_alunos = changed_lines(previous_state['principal'], result.matched_alunos)
+            stats.count('linhas_alteradas', len(result.changed_alunos))
+        result.state = {
+            'lista_alunos': roster_key,
+            'linhas': result.row_outcomes,
+            'principal': result.matched_alunos,
+        }
+    return results
+
+
+def save_state(result, excel_path, cache_dir=None):
+    """
+    Grava no cache o estado do resultado (ver compute_workbook). Só depois que os
+    arquivos foram entregues: se a gravação falhar ou o trabalho for cancelado, a
+    próxima execução (e o seu arquivo de alterações) ainda parte do estado anterior.
+    """
+    if result.state is None:
+        return
+    with result.stats.phase('estado'):
+        SerieStateStore(cache_dir or get_cache_path()).store(excel_path, result.serie_selecionada, result.prova_nome, result.state)
+
+
+def write_results(results, destination_path, progress=_no_progress, excel_path=None, delta=False, cache_dir=None):
+    """
+    Grava, na ordem, os arquivos de cada resultado e o seu relatório JSON; séries
+    sem alunos com nota válida não geram arquivos. Com `delta`, grava também o
+    arquivo de alterações (quando há uma execução anterior para comparar). O estado
+    de cada resultado vai para o cache (ver save_state) logo depois dos seus arquivos.
+    """
+    for result in results:
+        if result.total_alunos:
+            progress(90, "Gerando arquivos de saída...")
+            with result.stats.phase('escrita'):
+                write_outputs(result, destination_path, delta=delta and result.changed_alunos is not None)
+        save_state(result, excel_path, cache_dir)
+        if result.total_alunos:
+            write_report(result, destination_path, excel_path)
+
+
+def process_workbook(excel_path, jobs, destination_path=None, cache_dir=None, progress=_no_progress, profile=None, trace_memory=None,
+                     incremental=True, delta=False, alias_path=None, cancel=None, match_workers=None):
+    """
+    Processa vários trabalhos de um mesmo arquivo Excel (ver compute_workbook) e
+    grava os arquivos de saída. Retorna os SerieResult na ordem dos trabalhos. Um
+    cancelamento pedido até o início da gravação interrompe sem gravar nenhum arquivo.
+    """
+    results = compute_workbook(
+        excel_path, jobs, cache_dir=cache_dir, progress=progress, profile=profile, trace_memory=trace_memory, incremental=incremental,
+        alias_path=alias_path, cancel=cancel, match_workers=match_workers,
+    )
+    _check_cancel(cancel) # Ex.: pedido durante as sugestões da última série ou logo depois da comparação
+    write_results(
+        results, destination_path or get_output_path(), progress=progress, excel_path=excel_path, delta=delta, cache_dir=cache_dir,
+    )
+    return results
@@ -0,0 +1,128 @@
+import queue
+import threading
+import time
+
+# --- Canal de Eventos entre o Processamento e a Interface ---
+#
+# O Tk só pode ser acessado pela thread principal. A thread de processamento
+# apenas publica eventos neste canal; o loop principal os consome com
+# root.after, aplicando-os nos widgets. Atualizações de progresso são
+# agrupadas: no máximo uma a cada INTERVALO_MS chega ao Tk, não importa
+# quantas linhas a planilha tenha.
+#
+# No sentido contrário, a interface pede o cancelamento por um CancelToken,
+# que o processamento consulta entre um aluno e outro.
+
+INTERVALO_MS = 50 # ~20 atualizações da interface por segundo
+EVENTO_PROGRESSO = 'progress'
+EVENTO_FIM = 'done'
+
+
+class ProgressChannel:
+    """Fila de eventos (thread-safe) consumida pelo loop principal do Tk."""
+
+    def __init__(self, root, handlers, interval_ms=INTERVALO_MS):
+        """
+        handlers: dicionário tipo de evento -> função chamada na thread principal.
+        O evento 'progress' recebe (valor, texto) e 'done' encerra o consumo.
+        """
+        self.root = root
+        self.handlers = handlers
+        self.interval_ms = interval_ms
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending_progress = None # Último progresso ainda não enviado (descartado se vier outro)
+        self._last_progress_time = 0.0
+
+    # --- Lado do processamento (qualquer thread) ---
+
+    def progress(self, value, text=None):
+        """Publica o andamento; atualizações muito próximas são agrupadas."""
+        with self._lock:
+            if text is None and self._pending_progress is not None:
+                # Mantém o último texto de status quando só o valor muda
+                text = self._pending_progress[1]
+            self._pending_progress = (value, text)
+
+            now = time.monotonic()
+            if now - self._last_progress_time >= self.interval_ms / 1000:
+                self._last_progress_time = now
+                self._flush_pending()
+
+    def post(self, kind, *args):
+        """Publica um evento; o progresso pendente é enviado antes, para manter a ordem."""
+        with self._lock:
+            self._flush_pending()
+            self._queue.put((kind, args))
+
+    def close(self):
+        """Indica que o processamento terminou (último evento do canal)."""
+        self.post(EVENTO_FIM)
+
+    def _flush_pending(self):
+        if self._pending_progress is not None:
+            self._queue.put((EVENTO_PROGRESSO, self._pending_progress))
+            self._pending_progress = None
+
+    # --- Lado da interface (thread principal) ---
+
+    def start(self):
+        """Começa a consumir os eventos no loop principal do Tk."""
+        self.root.after(self.interval_ms, self._pump)
+
+    def _pump(self):
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        finished = False
+        pending = None # Progressos seguidos são reduzidos ao último
+        for kind, args in events:
+            if kind == EVENTO_PROGRESSO:
+                value, text = args
+                if text is None and pending is not None:
+                    text = pending[1]
+                pending = (value, text)
+                continue
+            if pending is not None:
+                self._dispatch(EVENTO_PROGRESSO, pending)
+                pending = None
+            if kind == EVENTO_FIM:
+                finished = True
+            self._dispatch(kind, args)
+        if pending is not None:
+            self._dispatch(EVENTO_PROGRESSO, pending)
+
+        if not finished:
+            self.root.after(self.interval_ms, self._pump)
+
+    def _dispatch(self, kind, args):
+        handler = self.handlers.get(kind)
+        if handler is not None:
+            handler(*args)
+
+
+class ProcessingCancelled(Exception):
+    """O processamento foi interrompido por um pedido de cancelamento."""
+
+
+class CancelToken:
+    """Pedido de cancelamento (thread-safe), verificado pelo próprio processamento."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """Interrompe o processamento (ProcessingCancelled) se o cancelamento foi pedido."""
+        if self._event.is_set():
+            raise ProcessingCancelled()
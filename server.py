@@ -0,0 +1,220 @@
+import functools
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from common import ProcessingError, get_cache_path, parse_job_spec, report_file_name
+from processing import build_outputs, compute_workbook, report_data, save_state
+
+# --- Serviço Local de Processamento (HTTP) ---
+#
+# Um único processo atende as secretarias: cada pedido envia o arquivo Excel e
+# os trabalhos (série, coluna, prova) e recebe de volta o texto dos arquivos
+# gerados (TXT do Escolar Manager, relatórios e o JSON da execução), que quem
+# pediu grava na sua própria pasta (ver client.py). Como tudo roda no mesmo
+# processo, a lista de alunos já indexada (processing.load_roster), o cache de
+# nomes da comparação e os caches em disco (planilhas e resultados por linha)
+# servem a todos os pedidos. Os pedidos são executados por um grupo de
+# `workers` threads; pedidos do mesmo arquivo esperam um pelo outro.
+#
+#   GET  /saude
+#   POST /processar?nome=notas.xlsx&trabalho=1ª Série:N:Simulado 1[&trabalho=...][&completo=1][&alteracoes=1][&cliente=...]
+#        (corpo: o conteúdo do arquivo .xlsx)
+#
+# A cópia do arquivo (e com ela o estado da execução anterior e o arquivo de
+# alterações) é separada pelo endereço de quem enviou: dois computadores que
+# enviam arquivos diferentes com o mesmo nome não se misturam. 'cliente' só
+# separa, dentro do mesmo endereço, usuários diferentes do mesmo computador;
+# como vem de quem pede, não isola um endereço do outro.
+
+ENDERECO_PADRAO = '127.0.0.1' # Só aceita conexões do próprio computador
+PORTA_PADRAO = 8765
+TRABALHADORES_PADRAO = 2 # Pedidos processados ao mesmo tempo
+LIMITE_ENVIO = 64 * 1024 * 1024 # Tamanho máximo do arquivo enviado (bytes)
+PASTA_ENVIOS = 'servidor' # Dentro do cache: cópias dos arquivos enviados
+EXTENSOES_EXCEL = ('.xlsx', '.xlsm')
+
+
+class ProcessingService:
+    """Executa os pedidos de processamento, compartilhando caches entre eles."""
+
+    def __init__(self, cache_dir=None, workers=TRABALHADORES_PADRAO, alias_path=None):
+        self.cache_dir = cache_dir or get_cache_path()
+        self.alias_path = alias_path
+        self.upload_dir = os.path.join(self.cache_dir, PASTA_ENVIOS)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='processamento')
+        self._locks = {} # Caminho da cópia -> Lock (um pedido por arquivo de cada vez)
+        self._locks_lock = threading.Lock()
+
+    def _upload_path(self, nome, cliente):
+        # O mesmo nome do mesmo cliente sempre vai para o mesmo caminho, para que o estado
+        # da execução anterior (chaveado pelo caminho) seja reaproveitado no reenvio do arquivo
+        extensao = os.path.splitext(nome)[1].lower()
+        if extensao not in EXTENSOES_EXCEL:
+            extensao = '.xlsx'
+        chave = f"{cliente}\n{nome}"
+        return os.path.join(self.upload_dir, hashlib.sha256(chave.encode('utf-8')).hexdigest()[:32] + extensao)
+
+    def _lock_for(self, path):
+        with self._locks_lock:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def _save_upload(self, path, data):
+        """Grava o arquivo enviado, a não ser que a cópia já tenha o mesmo conteúdo (mantém a data e os caches)."""
+        try:
+            if os.path.getsize(path) == len(data):
+                with open(path, 'rb') as f:
+                    if f.read() == data:
+                        return
+        except OSError:
+            pass
+        os.makedirs(self.upload_dir, exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def submit(self, nome, data, jobs, incremental=True, delta=False, cliente=''):
+        """
+        Coloca o pedido no grupo de trabalho; retorna um Future com (resposta, confirmar):
+        a resposta é um dicionário, e confirmar() grava o estado da execução (ver
+        processing.save_state), a ser chamado só depois que a resposta foi entregue.
+        """
+        return self._executor.submit(self._process, nome, data, jobs, incremental, delta, cliente)
+
+    def _process(self, nome, data, jobs, incremental, delta, cliente):
+        excel_path = self._upload_path(nome, cliente)
+        with self._lock_for(excel_path):
+            self._save_upload(excel_path, data)
+            results = compute_workbook(
+                excel_path, jobs, cache_dir=self.cache_dir, incremental=incremental, alias_path=self.alias_path,
+            )
+        response = {'resultados': [_result_data(result, nome, delta) for result in results]}
+        return response, functools.partial(self._save_states, excel_path, results)
+
+    def _save_states(self, excel_path, results):
+        with self._lock_for(excel_path):
+            for result in results:
+                save_state(result, excel_path, self.cache_dir)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+def _result_data(result, nome, delta):
+    """Resposta de um trabalho: arquivos a gravar/apagar e o resumo para a interface."""
+    data = {
+        'serie': result.serie_selecionada,
+        'prova': result.prova_nome,
+        'total_alunos': result.total_alunos,
+        'encontrados': result.matched_alunos,
+        'ocorrencias': result.ambiguities_list,
+        'parciais': result.partial_matches_log,
+        'nao_encontrados': result.not_found_alunos,
+        'sugestoes': result.suggestions_log,
+        'alteracoes': result.changed_alunos,
+        'resumo': result.stats.summary(),
+        'arquivos': {},
+        'remover': [],
+    }
+    if result.total_alunos: # Séries sem alunos com nota válida não geram arquivos
+        writer = build_outputs(result, delta=delta and result.changed_alunos is not None)
+        report = report_data(result, nome)
+        data['arquivos'] = writer.contents()
+        data['arquivos'][report_file_name(result.serie_selecionada, result.prova_nome)] = json.dumps(report, ensure_ascii=False, indent=2)
+        data['remover'] = writer.removed_files()
+    return data
+
+
+def _error_data(error):
+    return {'erro': {'titulo': error.title, 'mensagem': error.message, 'status': error.status}}
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server_version = 'ProcessadorNotas'
+
+    def _send_json(self, code, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, code, title, message):
+        self._send_json(code, _error_data(ProcessingError(title, message, "Erro: " + message)))
+
+    def do_GET(self):
+        if urlsplit(self.path).path == '/saude':
+            self._send_json(200, {'situacao': 'ok'})
+        else:
+            self._send_error(404, "Não Encontrado", f"Caminho desconhecido: '{self.path}'.")
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/processar':
+            self._send_error(404, "Não Encontrado", f"Caminho desconhecido: '{self.path}'.")
+            return
+        params = parse_qs(url.query)
+        nome = os.path.basename(params.get('nome', [''])[0])
+        if not nome:
+            self._send_error(400, "Pedido Inválido", "Informe o nome do arquivo Excel ('nome').")
+            return
+        try:
+            jobs = [parse_job_spec(text) for text in params.get('trabalho', [])]
+        except ValueError as e:
+            self._send_error(400, "Pedido Inválido", str(e))
+            return
+        if not jobs:
+            self._send_error(400, "Pedido Inválido", "Informe ao menos um trabalho ('trabalho=SÉRIE:COLUNA:PROVA').")
+            return
+        try:
+            length = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            self._send_error(411, "Pedido Inválido", "Envie o arquivo Excel no corpo do pedido (Content-Length).")
+            return
+        if length < 0: # rfile.read(-1) esperaria o cliente fechar a conexão
+            self._send_error(400, "Pedido Inválido", "Content-Length inválido.")
+            return
+        if length > LIMITE_ENVIO:
+            self._send_error(413, "Arquivo Grande Demais", f"O arquivo passa do limite de {LIMITE_ENVIO // (1024 * 1024)} MB.")
+            return
+        data = self.rfile.read(length)
+        # O endereço vem da conexão e não do pedido: ninguém escolhe o estado de outro computador
+        cliente = f"{self.client_address[0]}|{params.get('cliente', [''])[0].strip()}"
+
+        future = self.server.service.submit(
+            nome, data, jobs, incremental=params.get('completo', ['0'])[0] != '1', delta=params.get('alteracoes', ['0'])[0] == '1',
+            cliente=cliente,
+        )
+        try:
+            response, confirm = future.result()
+        except ProcessingError as e:
+            self._send_json(422, _error_data(e))
+        except Exception as e: # Arquivo inválido, planilha inexistente...
+            self._send_json(422, _error_data(ProcessingError("Erro Geral", f"Ocorreu um erro inesperado: {e}", "Erro: " + str(e))))
+        else:
+            self._send_json(200, response)
+            confirm() # Se o envio da resposta falhar, o estado anterior continua valendo
+
+
+def create_server(address=ENDERECO_PADRAO, port=PORTA_PADRAO, service=None):
+    """Cria o servidor HTTP (ainda sem atender); `server.service` executa os pedidos."""
+    server = ThreadingHTTPServer((address, port), _RequestHandler)
+    server.daemon_threads = True
+    server.service = service or ProcessingService()
+    return server
+
+
+def serve(address=ENDERECO_PADRAO, port=PORTA_PADRAO, workers=TRABALHADORES_PADRAO, cache_dir=None, alias_path=None):
+    """Atende os pedidos até ser interrompido (Ctrl+C)."""
+    server = create_server(address, port, ProcessingService(cache_dir, workers, alias_path))
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        server.service.shutdown()
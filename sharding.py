@@ -0,0 +1,82 @@
+import multiprocessing
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# --- Comparação em Partes (uma série grande em vários núcleos) ---
+#
+# Uma série consolidada chega a dezenas de milhares de alunos, e a comparação
+# de cada um com a lista de alunos roda em um único núcleo. Aqui as linhas são
+# divididas em partes contíguas, comparadas em processos separados. Os dados
+# só de leitura (o índice da lista e os nomes a comparar) chegam a cada
+# processo uma única vez, na criação: com 'fork' (Linux) a memória do processo
+# principal é herdada sem cópia; no Windows, são serializados uma vez por
+# processo (initializer), nunca por tarefa. Cada tarefa recebe só (início, fim)
+# e devolve resultados compactos das suas linhas, que o processo principal
+# junta na ordem das partes: o resultado é o mesmo da comparação em um só núcleo.
+#
+# Com 'fork', o processo filho herda os locks no estado em que estavam: se outra
+# thread (da interface, do serviço HTTP) segurasse um deles no momento, o filho
+# travaria. Por isso, com mais de uma thread em execução, a comparação não é dividida.
+
+LINHAS_MINIMAS_PARTE = 2000 # Abaixo disso, criar os processos custa mais do que comparar
+PARTES_POR_PROCESSO = 4 # Partes menores equilibram a carga e atualizam o andamento mais vezes
+INTERVALO_CANCELAMENTO = 0.2 # Segundos entre as verificações de cancelamento
+
+_estado = None # Dados só de leitura da comparação em andamento (no processo de trabalho)
+
+
+def shared_state():
+    """Dados recebidos pelo processo de trabalho na criação (ver map_shards)."""
+    return _estado
+
+
+def _init_worker(estado):
+    global _estado
+    _estado = estado
+
+
+def _context():
+    # Com 'fork' os dados são herdados sem serialização; no Windows só existe 'spawn'
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def shard_count(total, workers):
+    """
+    Número de partes para `total` linhas com até `workers` processos (1: comparar
+    sem dividir). Só divide com uma única thread em execução (ver o início do módulo).
+    """
+    partes = total // LINHAS_MINIMAS_PARTE
+    if not workers or workers < 2 or partes < 2 or threading.active_count() > 1:
+        return 1
+    return min(workers * PARTES_POR_PROCESSO, partes)
+
+
+def map_shards(function, estado, total, workers, progress=None, cancel=None):
+    """
+    Executa function(início, fim) para as partes de range(total) em até `workers`
+    processos, que recebem `estado` (shared_state()) uma única vez. Retorna os
+    resultados na ordem das partes. progress(feitas, partes) é chamado a cada
+    parte concluída e `cancel` (CancelToken) é verificado durante a espera; no
+    cancelamento, as partes em andamento terminam e as demais são descartadas.
+    """
+    partes = shard_count(total, workers)
+    limites = [total * parte // partes for parte in range(partes + 1)]
+    executor = ProcessPoolExecutor(
+        max_workers=min(workers, partes), mp_context=_context(), initializer=_init_worker, initargs=(estado,),
+    )
+    try:
+        futures = [executor.submit(function, inicio, fim) for inicio, fim in zip(limites, limites[1:])]
+        pendentes = set(futures)
+        while pendentes:
+            if cancel is not None:
+                cancel.check()
+            concluidas, pendentes = wait(pendentes, timeout=INTERVALO_CANCELAMENTO, return_when=FIRST_COMPLETED)
+            for future in concluidas:
+                future.result() # Erro em uma parte interrompe as demais
+            if concluidas and progress is not None:
+                progress(partes - len(pendentes), partes)
+        return [future.result() for future in futures]
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,274 @@
+import os
+
+import numpy as np
+
+from aliases import AliasStore
+from common import ProcessingError, get_alias_path, get_output_path, output_file_names
+from instrumentation import RunStats, profiling
+from matching import CompactRoster, RosterIndex, standardize_matriculas, standardize_roster_names
+from normalization import normalize_series
+from processing import main_line, match_row, prepare_serie, run_header, suggestion_info, write_error, write_report
+from workbook import LINHA_INICIAL_SERIE, PLANILHA_LISTA_ALUNOS, open_workbook, records_to_frame
+from writer import OutputWriteError, StreamingOutputWriter
+
+# --- Pipeline em Blocos (listas e séries muito grandes) ---
+#
+# Com todas as unidades consolidadas, a 'Lista de Alunos' e as planilhas de
+# série chegam a centenas de milhares de linhas, e o processamento normal
+# mantém cada planilha inteira em memória (DataFrames, listas de resultados e
+# textos dos relatórios). Aqui cada planilha é lida, padronizada, comparada e
+# gravada em blocos de `chunk_size` linhas: a lista de alunos fica em forma
+# compacta (matching.CompactRoster) e os resultados de cada bloco vão direto
+# para os temporários dos arquivos de saída (writer.StreamingOutputWriter).
+# Além da lista indexada, a memória fica em um bloco e nos nomes já vistos
+# (para manter só a primeira ocorrência de cada nome), não importa o tamanho
+# das outras colunas da série.
+#
+# As regras de comparação e os arquivos gerados são os do processamento
+# normal. O reaproveitamento da execução anterior (e o arquivo de alterações)
+# e os caches em disco não são usados aqui, porque guardam as planilhas inteiras.
+
+TAMANHO_BLOCO_PADRAO = 50000 # Linhas lidas e comparadas de cada vez
+
+
+def _no_progress(value, text=None):
+    pass
+
+
+def _check_cancel(cancel):
+    if cancel is not None:
+        cancel.check()
+
+
+class StreamResult:
+    """Resumo de um trabalho processado em blocos (os alunos vão direto para os arquivos)."""
+
+    def __init__(self, serie_selecionada, prova_nome, stats):
+        self.serie_selecionada = serie_selecionada
+        self.prova_nome = prova_nome
+        self.stats = stats # Tempos por etapa e contadores (encontrados, parciais, ...)
+
+    def count(self, name):
+        return self.stats.counters.get(name, 0)
+
+    @property
+    def total_alunos(self):
+        return self.count('alunos')
+
+    @property
+    def file_names(self):
+        return output_file_names(self.serie_selecionada, self.prova_nome)
+
+
+class _JobOutput:
+    """Arquivos de um trabalho, escritos à medida que os blocos são comparados."""
+
+    def __init__(self, result, destination_path):
+        self.result = result
+        self.writer = StreamingOutputWriter(destination_path)
+        self.vistos = set() # Nomes (NomeAlunoSerie, como no drop_duplicates de prepare_serie) já processados
+        self._suggestions_name = result.file_names[2] + '.sugestoes' # Sugestões, até irem para o fim do arquivo parcial
+
+    def new_rows(self, df_serie):
+        """Só as linhas com nomes que não apareceram em blocos anteriores (vale a primeira ocorrência)."""
+        vistos = self.vistos
+        novos = np.fromiter((nome not in vistos for nome in df_serie['NomeAlunoSerie']), dtype=bool, count=len(df_serie))
+        df_serie = df_serie[novos]
+        vistos.update(df_serie['NomeAlunoSerie'])
+        return df_serie
+
+    def _write_entry(self, file_name, titulo, text):
+        if not self.writer.has(file_name):
+            self.writer.write(file_name, run_header(titulo, self.result.serie_selecionada, self.result.prova_nome))
+        self.writer.write(file_name, text + '\n')
+
+    def write(self, outcomes):
+        """Grava os resultados (na ordem da planilha) nos arquivos do trabalho."""
+        stats = self.result.stats
+        output_file_name_main, output_file_name_ambiguities, output_file_name_partial, output_file_name_not_found = self.result.file_names
+        for line, partial_info, ambiguity_info, not_found_name, suggestion in outcomes:
+            if line is not None:
+                self.writer.write(output_file_name_main, line + '\n')
+                stats.count('encontrados')
+            if partial_info is not None:
+                self._write_entry(output_file_name_partial, "Coincidências Parciais", partial_info)
+                stats.count('parciais')
+            if ambiguity_info is not None:
+                self._write_entry(output_file_name_ambiguities, "Ocorrências (Ambíguas)", ambiguity_info)
+                stats.count('ambiguos')
+            if not_found_name is not None:
+                self._write_entry(output_file_name_not_found, "Alunos Não Encontrados", not_found_name)
+                stats.count('nao_encontrados')
+            if suggestion is not None:
+                self.writer.write(self._suggestions_name, suggestion + '\n')
+                stats.count('sugestoes')
+
+    def finish(self):
+        """Completa o arquivo de coincidências parciais com as sugestões e troca todos os arquivos."""
+        output_file_name_main, output_file_name_ambiguities, output_file_name_partial, output_file_name_not_found = self.result.file_names
+        if self.writer.has(self._suggestions_name):
+            if not self.writer.has(output_file_name_partial):
+                self.writer.write(output_file_name_partial, run_header("Coincidências Parciais", self.result.serie_selecionada, self.result.prova_nome))
+            self.writer.write(output_file_name_partial, "--- Sugestões para Alunos Não Encontrados (confirme antes de usar) ---\n\n")
+            self.writer.append_from(output_file_name_partial, self._suggestions_name)
+        for file_name in (output_file_name_main, output_file_name_ambiguities, output_file_name_partial, output_file_name_not_found):
+            if not self.writer.has(file_name):
+                self.writer.remove(file_name) # Arquivo de uma execução anterior que ficaria vazio
+        self.writer.commit()
+
+
+def load_compact_roster(workbook, chunk_size=TAMANHO_BLOCO_PADRAO, cancel=None):
+    """Lê a 'Lista de Alunos' em blocos para uma CompactRoster. Retorna (lista, RosterIndex)."""
+    lista = CompactRoster()
+    # O tipo da coluna de matrículas depende da coluna inteira (ex.: uma célula vazia faz
+    # 1001 virar '1001.0' no processamento normal), então ela só é convertida no fim
+    matriculas = []
+    try:
+        for records in workbook.iter_chunks(PLANILHA_LISTA_ALUNOS, [0, 1], chunk_size=chunk_size):
+            _check_cancel(cancel)
+            nomes = standardize_roster_names(records_to_frame([(nome,) for _, nome in records], 1)[0])
+            lista.add_names(nomes, normalize_series(nomes))
+            matriculas.extend(matricula for matricula, _ in records)
+    except ValueError:
+        raise ProcessingError(
+            "Erro de Planilha",
+            "A planilha 'Lista de Alunos' não foi encontrada no arquivo Excel. Verifique o nome da planilha.",
+            "Erro: Planilha 'Lista de Alunos' não encontrada.",
+        )
+    lista.add_matriculas(standardize_matriculas(records_to_frame([(matricula,) for matricula in matriculas], 1)[0]))
+    return lista, RosterIndex(lista.nomes_std)
+
+
+def _match_rows(df_serie, roster, aliases, matriculas_alias, stats, cancel):
+    """Resultado de cada aluno do bloco (tupla de processing.match_row, com as sugestões), na ordem da planilha."""
+    lista, roster_index = roster
+    for nome_aluno_serie_original, nota_serie, nome_aluno_serie_std in zip(
+        df_serie['NomeAlunoSerie'], df_serie['Nota'], df_serie['NomeAlunoSerie_STD'],
+    ):
+        _check_cancel(cancel)
+        matricula = aliases.get(nome_aluno_serie_std) if aliases else None
+        if matricula is not None and matricula in matriculas_alias:
+            stats.count('resolucoes_manuais')
+            yield (main_line(matricula, nota_serie), None, None, None, None)
+            continue
+        if not nome_aluno_serie_std: # Evita erro se o nome estiver vazio após limpeza
+            print(f"Alerta: Nome vazio ou inválido na série: '{nome_aluno_serie_original}'. Ignorado.")
+            continue
+
+        outcome = match_row(nome_aluno_serie_original, nota_serie, nome_aluno_serie_std, lista, roster_index, stats)
+        if outcome[3] is not None:
+            suggestion = suggestion_info(nome_aluno_serie_original, nota_serie, nome_aluno_serie_std, lista, roster_index.fuzzy())
+            outcome = outcome[:4] + (suggestion,)
+        yield outcome
+
+
+def _add_phases(stats, other):
+    for name, seconds in other.phases.items():
+        stats.phases[name] = stats.phases.get(name, 0.0) + seconds
+
+
+def process_workbook_chunked(excel_path, jobs, destination_path=None, chunk_size=TAMANHO_BLOCO_PADRAO, progress=_no_progress,
+                             profile=None, trace_memory=None, alias_path=None, cancel=None):
+    """
+    Processa os trabalhos (série, índice da coluna da nota, prova) de um arquivo
+    Excel em blocos de chunk_size linhas e grava os arquivos de saída em
+    destination_path (padrão: get_output_path()), com o relatório JSON de cada
+    trabalho. Cada planilha de série é percorrida uma única vez, mesmo com
+    várias colunas de nota. Retorna os StreamResult na ordem dos trabalhos.
+    """
+    destination_path = destination_path or get_output_path()
+    with profiling(profile, trace_memory) as profile_output:
+        results = _process_chunked(excel_path, jobs, destination_path, chunk_size, progress, alias_path, cancel)
+    for result in results:
+        if profile_output.text:
+            result.stats.profile_text = profile_output.text
+        if result.total_alunos:
+            write_report(result, destination_path, excel_path)
+    return results
+
+
+def _process_chunked(excel_path, jobs, destination_path, chunk_size, progress, alias_path, cancel):
+    progress(0, "Carregando arquivo Excel...")
+    if not os.path.exists(excel_path):
+        raise ProcessingError(
+            "Erro de Arquivo",
+            f"Arquivo Excel não encontrado: '{excel_path}'. Por favor, verifique o caminho.",
+            "Erro: Arquivo Excel não encontrado.",
+        )
+
+    shared_stats = RunStats()
+    workbook = open_workbook(excel_path)
+    outputs = []
+    try:
+        with shared_stats.phase('lista_alunos'):
+            roster = load_compact_roster(workbook, chunk_size, cancel)
+        shared_stats.count('linhas_lista_alunos', len(roster[0]))
+        with shared_stats.phase('resolucoes'):
+            aliases = AliasStore(alias_path or get_alias_path()).load()
+            matriculas_alias = roster[0].find_matriculas(aliases.values()) if aliases else set()
+
+        # Trabalhos de cada série, com a posição da sua coluna de nota no bloco lido
+        jobs_by_serie = {}
+        for serie_selecionada, column_note_index, prova_nome in jobs:
+            output = _JobOutput(StreamResult(serie_selecionada, prova_nome, shared_stats.copy()), destination_path)
+            outputs.append(output)
+            columns, serie_outputs = jobs_by_serie.setdefault(serie_selecionada, ([], []))
+            if column_note_index not in columns:
+                columns.append(column_note_index)
+            serie_outputs.append((columns.index(column_note_index) + 1, output))
+
+        for numero, (serie_selecionada, (columns, serie_outputs)) in enumerate(jobs_by_serie.items()):
+            read_stats = RunStats() # Leitura compartilhada pelos trabalhos da série
+            total_linhas = workbook.row_count(serie_selecionada) or 0
+            lidas = 0
+            chunks = workbook.iter_chunks(serie_selecionada, [0] + columns, start_row=LINHA_INICIAL_SERIE, chunk_size=chunk_size)
+            while True:
+                _check_cancel(cancel)
+                with read_stats.phase('leitura'):
+                    try:
+                        records = next(chunks, None)
+                    except ValueError:
+                        raise ProcessingError(
+                            "Erro de Planilha",
+                            f"A planilha '{serie_selecionada}' não foi encontrada no arquivo Excel. Verifique o nome da planilha.",
+                            "Erro: Planilha da série não encontrada.",
+                        )
+                    # Mesma conversão do processamento normal (read_columns)
+                    chunk = None if records is None else records_to_frame(records, len(columns) + 1)
+                if chunk is None:
+                    break
+                lidas += len(chunk)
+                for position, output in serie_outputs:
+                    stats = output.result.stats
+                    stats.count('blocos')
+                    stats.count('linhas_lidas', len(chunk))
+                    with stats.phase('pre_processamento'):
+                        df_serie = output.new_rows(prepare_serie(chunk[[0, position]]))
+                    stats.count('alunos', len(df_serie))
+                    with stats.phase('comparacao'):
+                        # Inclui a gravação: cada resultado vai direto para o arquivo (os ambíguos de um nome curto são milhares)
+                        output.write(_match_rows(df_serie, roster, aliases, matriculas_alias, stats, cancel))
+                parte = min(lidas / total_linhas, 1.0) if total_linhas else 0.0
+                progress(10 + 80 * (numero + parte) / len(jobs_by_serie), f"Processando {serie_selecionada}: {lidas} linhas lidas...")
+            for _, output in serie_outputs:
+                _add_phases(output.result.stats, read_stats)
+    except BaseException:
+        for output in outputs:
+            output.writer.abort()
+        raise
+    finally:
+        workbook.close()
+
+    progress(90, "Gerando arquivos de saída...")
+    for output in outputs:
+        if not output.result.total_alunos: # Séries sem alunos com nota válida não geram arquivos
+            output.writer.abort()
+            continue
+        try:
+            with output.result.stats.phase('escrita'):
+                output.finish()
+        except (OutputWriteError, OSError) as e:
+            for other in outputs:
+                other.writer.abort()
+            raise write_error(output.result, destination_path, e)
+    return [output.result for output in outputs]
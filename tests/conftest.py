@@ -0,0 +1,52 @@
+import os
+import sys
+
+import openpyxl
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from workbook import LINHA_INICIAL_SERIE, PLANILHA_LISTA_ALUNOS # noqa: E402
+
+SERIE = '1ª Série'
+COLUNA_NOTA = 13 # Coluna N
+
+# Células de tipos misturados, vazias e com textos que o pandas lê como vazios ('NA')
+LISTA_MISTA = [('0105', 'ANA SOUZA'), (1002, 'NA'), (None, 'BRUNO LIMA'), (1004.0, None), ('x12', 5)]
+SERIE_MISTA = [('Ana Souza', '7,5'), (None, 8), ('Bruno Lima', None), (123, 9.25)]
+
+
+def write_workbook(path, lista, serie):
+    """Grava um .xlsx mínimo: 'Lista de Alunos' (matrícula, nome) e a série (nome, nota na coluna N)."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = SERIE
+    for linha, (nome, nota) in enumerate(serie, start=LINHA_INICIAL_SERIE):
+        ws.cell(row=linha, column=1, value=nome)
+        ws.cell(row=linha, column=COLUNA_NOTA + 1, value=nota)
+    ws_lista = wb.create_sheet(PLANILHA_LISTA_ALUNOS)
+    for linha, (matricula, nome) in enumerate(lista, start=1):
+        ws_lista.cell(row=linha, column=1, value=matricula)
+        ws_lista.cell(row=linha, column=2, value=nome)
+    wb.save(path)
+    return str(path)
+
+
+def read_outputs(destination_path):
+    """Conteúdo dos TXT gerados, sem a linha com a data da execução."""
+    contents = {}
+    for name in sorted(os.listdir(destination_path)):
+        if name.endswith('.txt'):
+            with open(os.path.join(destination_path, name), encoding='utf-8') as f:
+                contents[name] = [line for line in f.read().splitlines() if not line.startswith('Execução:')]
+    return contents
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    """Diretórios de saída e de cache e o arquivo de resoluções, dentro do tmp_path."""
+    return {
+        'saida': str(tmp_path / 'saida'),
+        'cache': str(tmp_path / 'cache'),
+        'resolucoes': str(tmp_path / 'resolucoes.sqlite'),
+    }
@@ -0,0 +1,54 @@
+from aliases import AliasStore
+from common import output_file_names
+from conftest import COLUNA_NOTA, SERIE, read_outputs, write_workbook
+from processing import process_workbook, run_header
+
+RELATORIO_PARCIAL = run_header("Coincidências Parciais", SERIE, 'P1') + (
+    "Aluno da Série: 'ANA SOUZA LIMA' (Nota: 7.0)\n"
+    "  Coincidência Parcial com Lista de Alunos:\n"
+    "  - Matrícula: 1001, Nome Completo: 'ANA SOUZA'\n"
+    "----------------------------------------\n"
+    "Aluno da Série: 'CARLA DIAS' (Nota: 5.0)\n"
+    "  Não encontrado. Nomes parecidos na Lista de Alunos (não incluídos no arquivo principal):\n"
+    "  - Matrícula: 1004, Nome Completo: 'CARLA DAIS', Semelhança: 90%\n"
+    "----------------------------------------\n"
+)
+
+
+def test_untouched_partial_report_imports_nothing(tmp_path):
+    report_path = tmp_path / 'parcial.txt'
+    report_path.write_text(RELATORIO_PARCIAL, encoding='utf-8')
+    store = AliasStore(str(tmp_path / 'resolucoes.sqlite'))
+    assert store.import_report(str(report_path)) == (0, 2)
+    assert store.load() == {}
+
+
+def test_marked_partial_report_is_imported(tmp_path):
+    report_path = tmp_path / 'parcial.txt'
+    report_path.write_text(RELATORIO_PARCIAL.replace("  - Matrícula: 1001", "* - Matrícula: 1001"), encoding='utf-8')
+    store = AliasStore(str(tmp_path / 'resolucoes.sqlite'))
+    assert store.import_report(str(report_path)) == (1, 1)
+    assert store.load() == {'ANA SOUZA LIMA': '1001'}
+
+
+def test_resolved_ambiguity_is_used_on_the_next_run(tmp_path, dirs):
+    excel_path = write_workbook(
+        tmp_path / 'notas.xlsx', [(1002, 'BRUNO LIMA COSTA'), (1003, 'BRUNO LIMA SILVA')], [('Bruno Lima', 8)],
+    )
+    jobs = [(SERIE, COLUNA_NOTA, 'P1')]
+    kwargs = dict(destination_path=dirs['saida'], cache_dir=dirs['cache'], alias_path=dirs['resolucoes'], incremental=False)
+    process_workbook(excel_path, jobs, **kwargs)
+    principal, ambiguidades = output_file_names(SERIE, 'P1')[:2]
+    assert principal not in read_outputs(dirs['saida'])
+
+    # Deixar só a linha da matrícula correta no bloco das ocorrências
+    report_path = tmp_path / 'saida' / ambiguidades
+    report = report_path.read_text(encoding='utf-8')
+    report_path.write_text(report.replace("- Matrícula: 1002, Nome: 'BRUNO LIMA COSTA'\n", ''), encoding='utf-8')
+    store = AliasStore(dirs['resolucoes'])
+    assert store.import_report(str(report_path)) == (1, 0)
+
+    process_workbook(excel_path, jobs, **kwargs)
+    outputs = read_outputs(dirs['saida'])
+    assert outputs[principal] == ['1003\t8,0']
+    assert ambiguidades not in outputs
@@ -0,0 +1,42 @@
+import os
+
+import pandas as pd
+
+from cache import SheetCache
+from conftest import COLUNA_NOTA, LISTA_MISTA, SERIE, SERIE_MISTA, write_workbook
+from instrumentation import RunStats
+from workbook import LINHA_INICIAL_SERIE, PLANILHA_LISTA_ALUNOS, open_workbook
+
+
+def _read(excel_path, cache_dir, sheet_name, columns, start_row=1):
+    stats = RunStats()
+    workbook = open_workbook(excel_path, cache_dir, stats)
+    try:
+        return workbook.read_columns(sheet_name, columns, start_row=start_row), stats.counters
+    finally:
+        workbook.close()
+
+
+def test_cached_columns_equal_the_workbook(tmp_path, dirs):
+    excel_path = write_workbook(tmp_path / 'notas.xlsx', LISTA_MISTA, SERIE_MISTA)
+    for sheet_name, columns, start_row in ((PLANILHA_LISTA_ALUNOS, [0, 1], 1), (SERIE, [0, COLUNA_NOTA], LINHA_INICIAL_SERIE)):
+        lido, counters = _read(excel_path, dirs['cache'], sheet_name, columns, start_row)
+        assert counters == {'cache_planilhas_faltas': 1}
+        do_cache, counters = _read(excel_path, dirs['cache'], sheet_name, columns, start_row)
+        assert counters == {'cache_planilhas_acertos': 1}
+        # Colunas mistas voltam como texto: o processamento as converte com map(str) de qualquer forma
+        pd.testing.assert_frame_equal(do_cache.map(str), lido.map(str))
+        assert (do_cache.dtypes == lido.dtypes).all()
+
+
+def test_saved_workbook_is_read_again(tmp_path, dirs):
+    excel_path = write_workbook(tmp_path / 'notas.xlsx', [(1001, 'ANA SOUZA')], [('Ana Souza', 7)])
+    _read(excel_path, dirs['cache'], PLANILHA_LISTA_ALUNOS, [0, 1])
+    write_workbook(tmp_path / 'notas.xlsx', [(1001, 'ANA SOUZA'), (1002, 'BRUNO LIMA')], [('Ana Souza', 7)])
+    stat = os.stat(excel_path)
+    os.utime(excel_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9)) # Data diferente mesmo se as duas gravações caírem no mesmo instante
+
+    df, counters = _read(excel_path, dirs['cache'], PLANILHA_LISTA_ALUNOS, [0, 1])
+    assert counters == {'cache_planilhas_faltas': 1}
+    assert df[1].tolist() == ['ANA SOUZA', 'BRUNO LIMA']
+    assert SheetCache(dirs['cache']).load(excel_path, PLANILHA_LISTA_ALUNOS, [0, 1]) is not None
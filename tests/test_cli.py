@@ -0,0 +1,30 @@
+import os
+
+import pytest
+
+from cli import main
+from common import parse_job_spec
+from conftest import COLUNA_NOTA, SERIE, read_outputs, write_workbook
+
+
+def test_parse_job_spec():
+    assert parse_job_spec(' 1ª Série : n : Simulado 1 ') == ('1ª Série', COLUNA_NOTA, 'Simulado 1')
+    with pytest.raises(ValueError):
+        parse_job_spec('1ª Série:N')
+
+
+def test_batch_of_workbooks(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path) # O cache padrão fica ao lado da pasta de resultados padrão (caminho relativo aqui)
+    unidade_a = write_workbook(tmp_path / 'unidade_a.xlsx', [(1001, 'ANA SOUZA')], [('Ana Souza', 7)])
+    unidade_b = write_workbook(tmp_path / 'unidade_b.xlsx', [(2001, 'BRUNO LIMA')], [('Bruno Lima', 9)])
+    saida = str(tmp_path / 'saida')
+
+    exit_code = main([
+        'processar', unidade_a, str(tmp_path / 'faltando.xlsx'), unidade_b,
+        '-j', f'{SERIE}:N:P1', '-j', f'{SERIE}:N:P2', '-o', saida, '--workers', '1',
+    ])
+    assert exit_code == 1 # Um arquivo com erro não impede os demais
+    assert 'Arquivo Excel não encontrado' in capsys.readouterr().err
+    assert read_outputs(os.path.join(saida, 'unidade_a')) == {f'{SERIE} - P1.txt': ['1001\t7,0'], f'{SERIE} - P2.txt': ['1001\t7,0']}
+    assert read_outputs(os.path.join(saida, 'unidade_b')) == {f'{SERIE} - P1.txt': ['2001\t9,0'], f'{SERIE} - P2.txt': ['2001\t9,0']}
+    assert not os.path.exists(os.path.join(saida, 'faltando'))
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+from common import output_file_names
+from conftest import COLUNA_NOTA, SERIE, read_outputs, write_workbook
+from fuzzy import MAX_CANDIDATOS, FuzzyIndex
+from processing import process_workbook
+
+NOMES = ['ANA PAULA SOUZA', 'ANA PAULA DE SOUSA', 'BRUNO LIMA', 'MARIA JOSE SILVA', 'JOAO PEDRO SANTOS']
+
+
+def test_suggestions_for_misspelled_names():
+    index = FuzzyIndex(NOMES)
+    assert [row_id for row_id, _ in index.suggestions('ANA PAULA SOUSA')] == [1, 0]
+    (row_id, score), = index.suggestions('BRUNNO LIMA')
+    assert row_id == 2 and 0.8 <= score < 1
+    assert index.suggestions('ZECA URUBU') == []
+
+
+def test_candidates_do_not_depend_on_the_hash_seed():
+    # Cada nome compartilha um só bloco (par de tokens) com a busca, e há mais empates do que
+    # MAX_CANDIDATOS: o corte não pode depender da ordem dos conjuntos de textos
+    codigo = (
+        "from fuzzy import FuzzyIndex\n"
+        "outros = ['Z' + a + 'A' + b for a in 'BCDFGHJKLMNPQRSTVX' for b in 'BCDFGHJKLMNPQRSTVX'][:%d]\n"
+        "nomes = ([f'ANA BETO {x}' for x in outros] + [f'ANA {x} CIRO' for x in outros]\n"
+        "         + [f'{x} BETO CIRO' for x in outros])\n"
+        "print(FuzzyIndex(nomes).candidates(('ANA', 'BETO', 'CIRO')))\n"
+    ) % MAX_CANDIDATOS
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    saidas = {
+        subprocess.run(
+            [sys.executable, '-c', codigo], cwd=raiz, env=dict(os.environ, PYTHONHASHSEED=seed),
+            capture_output=True, text=True, check=True,
+        ).stdout
+        for seed in ('1', '2', '3')
+    }
+    assert len(saidas) == 1
+
+
+def test_suggestions_go_to_the_partial_report(tmp_path, dirs):
+    excel_path = write_workbook(tmp_path / 'notas.xlsx', [(1000 + n, nome) for n, nome in enumerate(NOMES)], [('Brunno Lima', 6)])
+    result, = process_workbook(
+        excel_path, [(SERIE, COLUNA_NOTA, 'P1')], destination_path=dirs['saida'], cache_dir=dirs['cache'],
+        alias_path=dirs['resolucoes'], incremental=False,
+    )
+    assert result.not_found_alunos == ['BRUNNO LIMA'] # Sugestões não vão para o arquivo principal
+    parcial = read_outputs(dirs['saida'])[output_file_names(SERIE, 'P1')[2]]
+    assert "  - Matrícula: 1002, Nome Completo: 'BRUNO LIMA', Semelhança: 90%" in parcial
@@ -0,0 +1,40 @@
+import json
+
+from common import report_file_name
+from conftest import COLUNA_NOTA, SERIE, write_workbook
+from instrumentation import RunStats
+from processing import process_workbook
+
+
+def test_phases_accumulate_and_copies_are_independent():
+    stats = RunStats()
+    for _ in range(2):
+        with stats.phase('leitura'):
+            pass
+    stats.count('alunos', 3)
+    copia = stats.copy()
+    copia.count('alunos')
+    with copia.phase('escrita'):
+        pass
+
+    assert list(stats.phases) == ['leitura']
+    assert stats.counters == {'alunos': 3}
+    data = copia.to_dict()
+    assert list(data['etapas_s']) == ['leitura', 'escrita']
+    assert data['contadores'] == {'alunos': 4}
+    assert data['total_s'] == round(sum(copia.phases.values()), 6)
+
+
+def test_run_writes_json_report(tmp_path, dirs):
+    excel_path = write_workbook(tmp_path / 'notas.xlsx', [(1001, 'ANA SOUZA'), (1002, 'BRUNO LIMA')], [('Ana Souza', 7), ('Zeca', 5)])
+    process_workbook(
+        excel_path, [(SERIE, COLUNA_NOTA, 'P1')], destination_path=dirs['saida'], cache_dir=dirs['cache'],
+        alias_path=dirs['resolucoes'], incremental=False,
+    )
+    with open(tmp_path / 'saida' / report_file_name(SERIE, 'P1'), encoding='utf-8') as f:
+        report = json.load(f)
+    assert (report['serie'], report['prova'], report['arquivo_excel']) == (SERIE, 'P1', excel_path)
+    assert {'leitura', 'lista_alunos', 'comparacao', 'escrita'} <= set(report['etapas_s'])
+    assert report['contadores']['alunos'] == 2
+    assert report['contadores']['encontrados'] == 1
+    assert report['contadores']['nao_encontrados'] == 1
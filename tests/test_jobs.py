@@ -0,0 +1,33 @@
+from jobs import SITUACAO_CANCELADO, SITUACAO_CANCELANDO, SITUACAO_CONCLUIDO, SITUACAO_NA_FILA, SITUACAO_PROCESSANDO, JobScheduler
+
+
+def _submit(scheduler, prova_nome):
+    return scheduler.submit('notas.xlsx', '1ª Série', 'N', 13, prova_nome)
+
+
+def test_queue_respects_concurrency_limit():
+    started = []
+    scheduler = JobScheduler(started.append, max_concurrent=2)
+    jobs = [_submit(scheduler, f'P{n}') for n in range(1, 4)]
+    assert started == jobs[:2]
+    assert jobs[2].status == SITUACAO_NA_FILA
+
+    scheduler.finished(jobs[0], SITUACAO_CONCLUIDO, 'ok')
+    assert started == jobs
+    assert [job.status for job in jobs] == [SITUACAO_CONCLUIDO, SITUACAO_PROCESSANDO, SITUACAO_PROCESSANDO]
+
+
+def test_cancel_queued_and_running_jobs():
+    started = []
+    scheduler = JobScheduler(started.append)
+    running, queued = _submit(scheduler, 'P1'), _submit(scheduler, 'P2')
+
+    scheduler.cancel(queued.job_id)
+    assert queued.status == SITUACAO_CANCELADO and queued.cancel_token.cancelled
+    scheduler.cancel(running.job_id)
+    assert running.status == SITUACAO_CANCELANDO and running.cancel_token.cancelled
+    assert scheduler.active # Até a thread do trabalho em execução terminar
+
+    scheduler.finished(running, SITUACAO_CANCELADO)
+    assert started == [running]
+    assert not scheduler.active
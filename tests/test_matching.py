@@ -0,0 +1,77 @@
+import pickle
+import sys
+import threading
+
+import pandas as pd
+
+import matching
+from matching import RosterIndex, build_name_pattern, exact_matches
+
+NOMES = [
+    f"{primeiro} {meio} {ultimo}"
+    for primeiro in ('ANA', 'BRUNO', 'CARLA', 'DIEGO', 'ELISA')
+    for meio in ('MARIA', 'JOSE', 'DE', 'DA', 'SOUZA', 'ALVES', 'GOMES', 'ROCHA')
+    for ultimo in ('SILVA', 'SANTOS', 'OLIVEIRA', 'LIMA', 'COSTA', 'PEREIRA', 'SOARES', 'MELO', 'DIAS', 'NUNES')
+]
+BUSCAS = [
+    f"{primeiro} {meio} {ultimo}"
+    for primeiro in ('AN', 'BR', 'CARLA', 'DI')
+    for meio in ('A', 'S', 'DE', 'MA', 'OS', 'GO', 'RO')
+    for ultimo in ('SI', 'LIMA', 'ES', 'A', 'OLI', 'NU')
+]
+
+
+def test_index_matches_a_scan_of_the_whole_roster():
+    # O índice só reduz as linhas testadas: o resultado é o da regex aplicada a toda a lista
+    index = RosterIndex(NOMES)
+    for nome in BUSCAS + ['ANA', 'ANA MARIA SILVA', 'ZECA', 'A S']:
+        pattern = build_name_pattern(nome)
+        assert index.match(nome) == [row_id for row_id, nome_lista in enumerate(NOMES) if pattern.match(nome_lista)]
+
+
+def test_exact_matches_only_for_unambiguous_names():
+    nomes_lista = pd.Series(['ANA SILVA', 'ANA SILVA SOUZA', 'BRUNO LIMA', 'CARLA DIAS', 'CARLA DIAS'])
+    nomes_serie = pd.Series(['BRUNO LIMA', 'ANA SILVA', 'CARLA DIAS', 'ANA SILVA SOUZA', '', 'ZECA'], index=range(10, 16))
+    hits = exact_matches(nomes_serie, nomes_lista, RosterIndex(nomes_lista))
+    # 'ANA SILVA' é estendido por outro nome e 'CARLA DIAS' é repetido na lista: ficam para a comparação completa
+    assert hits.to_dict() == {10: 2, 13: 1}
+
+
+def test_token_cache_shared_by_threads(monkeypatch):
+    monkeypatch.setattr(matching, 'LIMITE_CACHE_TOKENS', 200) # Força remoções do cache o tempo todo
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6) # Troca de thread com frequência, para expor disputas pelo cache
+    index = RosterIndex(NOMES)
+    esperado = {nome: RosterIndex(NOMES).match(nome) for nome in BUSCAS}
+    erros = []
+
+    def buscar():
+        try:
+            for _ in range(20):
+                for nome in BUSCAS:
+                    assert index.match(nome) == esperado[nome]
+        except Exception as e: # Falhas dentro da thread não chegariam ao pytest
+            erros.append(e)
+
+    threads = [threading.Thread(target=buscar) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    sys.setswitchinterval(intervalo)
+
+    assert erros == []
+    assert index._linhas_cache == sum(len(rows) for rows in index._cache_tokens.values())
+    assert index._linhas_cache <= 200
+
+
+def test_index_survives_pickle():
+    index = RosterIndex(NOMES)
+    tamanho = len(pickle.dumps(index))
+    index.match('AN S SI')
+    index.fuzzy()
+    # Os caches das buscas não vão para o pickle (cache em disco e processos da comparação em partes)
+    assert len(pickle.dumps(index)) == tamanho
+    copia = pickle.loads(pickle.dumps(index))
+    assert copia._cache_tokens == {} and copia._fuzzy is None
+    assert copia.match('BR DE LIMA') == index.match('BR DE LIMA')
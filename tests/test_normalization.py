@@ -0,0 +1,30 @@
+import pandas as pd
+
+from conftest import COLUNA_NOTA, SERIE, read_outputs, write_workbook
+from normalization import normalize_name, normalize_series
+from processing import process_workbook
+
+
+def test_normalize_series_matches_normalize_name():
+    nomes = pd.Series(['  José   da  Conceição ', 'ÑANDÚ D´ÁVILA', 'ana\tmaria'])
+    assert normalize_series(nomes).tolist() == [normalize_name(nome) for nome in nomes]
+    assert normalize_series(nomes).tolist() == ['JOSE DA CONCEICAO', 'NANDU DAVILA', 'ANA MARIA']
+
+
+def test_normalize_series_blank_cell():
+    nomes = pd.Series(['Ana', None]).astype(str) # pandas 3: a célula vazia continua NaN
+    assert normalize_series(nomes).tolist() == ['ANA', 'NAN']
+
+
+def test_blank_roster_row(tmp_path, dirs):
+    excel_path = write_workbook(
+        tmp_path / 'notas.xlsx',
+        lista=[(1001, 'ANA SOUZA'), (1002, None), (1003, 'BRUNO LIMA')],
+        serie=[('Ana Souza', 7.5), ('Bruno Lima', 8)],
+    )
+    process_workbook(
+        excel_path, [(SERIE, COLUNA_NOTA, 'P1')], destination_path=dirs['saida'], cache_dir=dirs['cache'],
+        alias_path=dirs['resolucoes'],
+    )
+    outputs = read_outputs(dirs['saida'])
+    assert outputs[f'{SERIE} - P1.txt'] == ['1001\t7,5', '1003\t8,0']
@@ -0,0 +1,39 @@
+import openpyxl
+
+from conftest import COLUNA_NOTA, SERIE, read_outputs, write_workbook
+from parallel import process_workbooks, split_tasks
+from workbook import LINHA_INICIAL_SERIE
+
+SERIE_2 = '2ª Série'
+
+
+def _write_two_series(path):
+    write_workbook(path, [(1001, 'ANA SOUZA'), (1002, 'BRUNO LIMA')], [('Ana Souza', 7)])
+    wb = openpyxl.load_workbook(path)
+    ws = wb.create_sheet(SERIE_2)
+    ws.cell(row=LINHA_INICIAL_SERIE, column=1, value='Bruno Lima')
+    ws.cell(row=LINHA_INICIAL_SERIE, column=COLUNA_NOTA + 1, value=9)
+    wb.save(path)
+    return str(path)
+
+
+def test_split_tasks_groups_jobs_by_serie():
+    jobs = [(SERIE, 13, 'P1'), (SERIE_2, 13, 'P1'), (SERIE, 14, 'P2')]
+    assert split_tasks(['a.xlsx', 'b.xlsx'], jobs) == [
+        ('a.xlsx', [jobs[0], jobs[2]]), ('a.xlsx', [jobs[1]]), ('b.xlsx', [jobs[0], jobs[2]]), ('b.xlsx', [jobs[1]]),
+    ]
+
+
+def test_parallel_results_follow_job_order(tmp_path, dirs):
+    excel_path = _write_two_series(tmp_path / 'notas.xlsx')
+    jobs = [(SERIE_2, COLUNA_NOTA, 'P1'), (SERIE, COLUNA_NOTA, 'P1')]
+    (path, results), = process_workbooks(
+        [excel_path], jobs, destination_path=dirs['saida'], cache_dir=dirs['cache'], workers=2, alias_path=dirs['resolucoes'],
+    )
+    assert path == excel_path
+    assert [result.serie_selecionada for result in results] == [SERIE_2, SERIE]
+    # A lista de alunos foi lida uma vez, antes das séries: nenhuma das tarefas precisou lê-la do Excel
+    assert all('cache_lista_alunos_faltas' not in result.stats.counters for result in results)
+    outputs = read_outputs(dirs['saida'])
+    assert outputs[f'{SERIE} - P1.txt'] == ['1001\t7,0']
+    assert outputs[f'{SERIE_2} - P1.txt'] == ['1002\t9,0']
@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+import processing
+from common import ProcessingError, delta_file_name
+from conftest import COLUNA_NOTA, SERIE, read_outputs, write_workbook
+from processing import process_workbook
+from progress import CancelToken, ProcessingCancelled
+from writer import OutputWriter
+
+LISTA = [(1001, 'ANA SOUZA'), (1002, 'BRUNO LIMA'), (1003, 'CARLA DIAS')]
+JOBS = [(SERIE, COLUNA_NOTA, 'P1')]
+ALTERACOES = delta_file_name(SERIE, 'P1')
+
+
+def _process(excel_path, dirs, **kwargs):
+    return process_workbook(
+        excel_path, JOBS, destination_path=dirs['saida'], cache_dir=dirs['cache'], alias_path=dirs['resolucoes'], **kwargs,
+    )
+
+
+def test_delta_lists_only_changed_grades(tmp_path, dirs):
+    excel_path = tmp_path / 'notas.xlsx'
+    write_workbook(excel_path, LISTA, [('Ana Souza', 7), ('Bruno Lima', 8)])
+    _process(str(excel_path), dirs, delta=True)
+    assert ALTERACOES not in read_outputs(dirs['saida']) # Sem execução anterior para comparar
+
+    write_workbook(excel_path, LISTA, [('Ana Souza', 7), ('Bruno Lima', 9), ('Carla Dias', 6)])
+    result, = _process(str(excel_path), dirs, delta=True)
+    outputs = read_outputs(dirs['saida'])
+    assert outputs[f'{SERIE} - P1.txt'] == ['1001\t7,0', '1002\t9,0', '1003\t6,0']
+    assert outputs[ALTERACOES] == ['1002\t9,0', '1003\t6,0']
+    assert result.stats.counters['linhas_alteradas'] == 2
+
+
+def test_state_is_kept_when_writing_fails(tmp_path, dirs, monkeypatch):
+    excel_path = tmp_path / 'notas.xlsx'
+    write_workbook(excel_path, LISTA, [('Ana Souza', 7)])
+    _process(str(excel_path), dirs)
+
+    write_workbook(excel_path, LISTA, [('Ana Souza', 8)])
+
+    def falhar(self):
+        raise OSError("arquivo aberto no Excel")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(OutputWriter, 'commit', falhar)
+        with pytest.raises(ProcessingError):
+            _process(str(excel_path), dirs, delta=True)
+
+    # A alteração que não chegou a ser gravada ainda aparece no arquivo de alterações
+    _process(str(excel_path), dirs, delta=True)
+    assert read_outputs(dirs['saida'])[ALTERACOES] == ['1001\t8,0']
+
+
+def test_cancel_after_matching_writes_nothing(tmp_path, dirs, monkeypatch):
+    excel_path = write_workbook(tmp_path / 'notas.xlsx', LISTA, [('Ana Souza', 7)])
+    cancel = CancelToken()
+    compute_workbook = processing.compute_workbook
+
+    def compute_then_cancel(*args, **kwargs):
+        results = compute_workbook(*args, **kwargs)
+        cancel.cancel() # Pedido depois da comparação, antes da gravação
+        return results
+
+    monkeypatch.setattr(processing, 'compute_workbook', compute_then_cancel)
+    with pytest.raises(ProcessingCancelled):
+        _process(excel_path, dirs, cancel=cancel)
+    assert not os.path.exists(dirs['saida'])
+
+    # Nem o estado foi gravado: a próxima execução não tem com o que comparar
+    monkeypatch.undo()
+    _process(excel_path, dirs, delta=True)
+    assert ALTERACOES not in read_outputs(dirs['saida'])
+
+
+def test_rerun_reuses_unchanged_rows(tmp_path, dirs):
+    excel_path = tmp_path / 'notas.xlsx'
+    write_workbook(excel_path, LISTA, [('Ana Souza', 7), ('Bruno Lima', 8)])
+    _process(str(excel_path), dirs)
+
+    write_workbook(excel_path, LISTA, [('Ana Souza', 7), ('Bruno Lima', 9)])
+    result, = _process(str(excel_path), dirs)
+    assert result.stats.counters['linhas_reaproveitadas'] == 1
+    incremental = read_outputs(dirs['saida'])
+    _process(str(excel_path), dirs, incremental=False)
+    assert read_outputs(dirs['saida']) == incremental
+
+    # Outra lista de alunos: os resultados anteriores não valem mais
+    write_workbook(excel_path, LISTA + [(1004, 'ANA SOUZA LIMA')], [('Ana Souza', 7), ('Bruno Lima', 9)])
+    result, = _process(str(excel_path), dirs)
+    assert 'linhas_reaproveitadas' not in result.stats.counters
+    assert read_outputs(dirs['saida'])[f'{SERIE} - P1.txt'] == ['1002\t9,0']
@@ -0,0 +1,42 @@
+from progress import ProgressChannel
+
+
+class FakeRoot:
+    """Só o root.after do Tk: as funções agendadas rodam quando o teste mandar."""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, function):
+        self.scheduled.append(function)
+
+    def run_pending(self):
+        scheduled, self.scheduled = self.scheduled, []
+        for function in scheduled:
+            function()
+
+
+def test_progress_updates_are_coalesced_and_ordered():
+    root = FakeRoot()
+    events = []
+    channel = ProgressChannel(root, {
+        'progress': lambda value, text: events.append(('progress', value, text)),
+        'report': lambda message: events.append(('report', message)),
+        'done': lambda: events.append(('done',)),
+    }, interval_ms=60000)
+    channel.start()
+
+    channel.progress(0, "Carregando...")
+    for value in range(1, 1000):
+        channel.progress(value)
+    channel.post('report', 'ok')
+    channel.close()
+    root.run_pending()
+
+    # Mil atualizações viram no máximo duas chamadas na interface, antes do resultado e com o último texto
+    progressos = [event for event in events if event[0] == 'progress']
+    assert len(progressos) <= 2
+    assert progressos[-1] == ('progress', 999, "Carregando...")
+    assert events[-2:] == [('report', 'ok'), ('done',)]
+    assert root.scheduled == [] # Depois do fim, o canal não é mais consumido
+
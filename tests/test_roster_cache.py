@@ -0,0 +1,50 @@
+from collections import OrderedDict
+
+import pandas as pd
+import pytest
+
+import processing
+from conftest import write_workbook
+from instrumentation import RunStats
+from processing import load_roster, warm_up_roster
+
+LISTA = [(1001, 'ANA SOUZA'), (1002, 'BRUNO LIMA'), (1003, 'CARLA DIAS')]
+
+
+@pytest.fixture(autouse=True)
+def empty_memory(monkeypatch):
+    # Outros testes usam a mesma lista; a memória é por conteúdo, não por arquivo
+    monkeypatch.setattr(processing, '_rosters_em_memoria', OrderedDict())
+    monkeypatch.setattr(processing, '_hashes_em_memoria', {})
+
+
+def _load(excel_path, cache_dir):
+    stats = RunStats()
+    return load_roster(None, excel_path, cache_dir, stats), stats.counters
+
+
+def test_roster_comes_from_memory_then_from_disk(tmp_path, dirs, monkeypatch):
+    excel_path = write_workbook(tmp_path / 'notas.xlsx', LISTA, [])
+    (df_lista, index), counters = _load(excel_path, dirs['cache'])
+    assert counters['cache_lista_alunos_faltas'] == 1
+
+    _, counters = _load(excel_path, dirs['cache'])
+    assert counters['lista_alunos_em_memoria'] == 1
+
+    # Outro processo (memória vazia): a lista padronizada e o índice vêm do disco
+    monkeypatch.setattr(processing, '_rosters_em_memoria', OrderedDict())
+    (df_cache, index_cache), counters = _load(excel_path, dirs['cache'])
+    assert counters['cache_lista_alunos_acertos'] == 1
+    assert 'cache_lista_alunos_faltas' not in counters
+    pd.testing.assert_frame_equal(df_cache, df_lista)
+    assert index_cache.nomes == index.nomes
+    assert index_cache.match('BR LIMA') == index.match('BR LIMA') == [1]
+
+
+def test_warm_up_roster(tmp_path, dirs):
+    excel_path = write_workbook(tmp_path / 'notas.xlsx', LISTA, [])
+    assert warm_up_roster(excel_path, dirs['cache']) == 3
+    _, counters = _load(excel_path, dirs['cache'])
+    assert counters['lista_alunos_em_memoria'] == 1
+    # O erro fica para o processamento, que o mostra com a mensagem certa
+    assert warm_up_roster(str(tmp_path / 'faltando.xlsx'), dirs['cache']) is None
@@ -0,0 +1,47 @@
+import http.client
+import threading
+from urllib.parse import quote
+
+from conftest import COLUNA_NOTA, SERIE, write_workbook
+from server import ProcessingService, create_server
+
+
+def test_same_file_name_from_two_clients(tmp_path, dirs):
+    caminho_a = write_workbook(tmp_path / 'a.xlsx', [(1001, 'ANA SOUZA')], [('Ana Souza', 7)])
+    caminho_b = write_workbook(tmp_path / 'b.xlsx', [(2001, 'BRUNO LIMA')], [('Bruno Lima', 9)])
+    with open(caminho_a, 'rb') as f:
+        dados_a = f.read()
+    with open(caminho_b, 'rb') as f:
+        dados_b = f.read()
+
+    service = ProcessingService(cache_dir=dirs['cache'], workers=1, alias_path=dirs['resolucoes'])
+    jobs = [(SERIE, COLUNA_NOTA, 'P1')]
+    try:
+        for dados, cliente in ((dados_a, 'secretaria-a'), (dados_b, 'secretaria-b')):
+            _, confirmar = service.submit('notas.xlsx', dados, jobs, cliente=cliente).result()
+            confirmar()
+        # O reenvio do cliente A compara com a execução anterior dele, não com a do cliente B
+        resposta, _ = service.submit('notas.xlsx', dados_a, jobs, delta=True, cliente='secretaria-a').result()
+    finally:
+        service.shutdown()
+    resultado = resposta['resultados'][0]
+    assert resultado['encontrados'] == ['1001\t7,0']
+    assert resultado['alteracoes'] == []
+
+
+def test_negative_content_length_is_rejected(dirs):
+    server = create_server(port=0, service=ProcessingService(cache_dir=dirs['cache'], workers=1, alias_path=dirs['resolucoes']))
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        conn = http.client.HTTPConnection(*server.server_address, timeout=10)
+        conn.putrequest('POST', '/processar?nome=notas.xlsx&trabalho=' + quote(f'{SERIE}:N:P1'))
+        conn.putheader('Content-Length', '-1')
+        conn.endheaders()
+        assert conn.getresponse().status == 400 # E sem esperar o cliente fechar a conexão
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.service.shutdown()
+        thread.join()
@@ -0,0 +1,37 @@
+import threading
+
+import sharding
+from conftest import COLUNA_NOTA, SERIE, read_outputs, write_workbook
+from processing import process_workbook
+from sharding import shard_count
+
+LISTA = [(1000 + n, f'ALUNO {nome} SILVA') for n, nome in enumerate(['ANA', 'ANABEL', 'BRUNO', 'BRUNA', 'CARLA', 'CARLOS'] * 3)]
+SERIE_LINHAS = [(f'Aluno {nome}', n) for n, nome in enumerate(['Ana', 'Bru', 'Carl', 'Ana S', 'Zeca', 'Carla', 'Brunx', 'Anabel'])]
+
+
+def test_sharded_matching_matches_single_process(tmp_path, dirs, monkeypatch):
+    monkeypatch.setattr(sharding, 'LINHAS_MINIMAS_PARTE', 2)
+    excel_path = write_workbook(tmp_path / 'notas.xlsx', LISTA, SERIE_LINHAS)
+    jobs = [(SERIE, COLUNA_NOTA, 'P1')]
+    saidas = {}
+    for match_workers in (None, 2):
+        saidas[match_workers] = str(tmp_path / f'saida_{match_workers}')
+        result, = process_workbook(
+            excel_path, jobs, destination_path=saidas[match_workers], cache_dir=dirs['cache'], alias_path=dirs['resolucoes'],
+            incremental=False, match_workers=match_workers,
+        )
+    assert result.stats.counters['partes_comparacao'] > 1
+    assert read_outputs(saidas[2]) == read_outputs(saidas[None])
+
+
+def test_no_shards_while_other_threads_run(monkeypatch):
+    monkeypatch.setattr(sharding, 'LINHAS_MINIMAS_PARTE', 2)
+    assert shard_count(100, 4) > 1
+    parar = threading.Event()
+    thread = threading.Thread(target=parar.wait)
+    thread.start()
+    try:
+        assert shard_count(100, 4) == 1 # 'fork' com outra thread em execução poderia travar o processo filho
+    finally:
+        parar.set()
+        thread.join()
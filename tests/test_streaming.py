@@ -0,0 +1,26 @@
+from conftest import COLUNA_NOTA, SERIE, read_outputs, write_workbook
+from processing import process_workbook
+from streaming import process_workbook_chunked
+
+# Matrícula vazia no meio da lista (a coluna vira float no processamento normal), células vazias na série
+# e nomes repetidos em outros blocos (vale a primeira ocorrência com nota)
+LISTA = [(1001, 'ANA SOUZA'), (1002, 'BRUNO LIMA'), (None, 'CARLA DIAS'), (1004, 'DANIEL ROCHA'), (1005, 'ELISA MOURA')]
+SERIE_LINHAS = [
+    ('Ana Souza', 7.5), ('Bruno Lima', None), (None, 8), ('Daniel Rocha', '6,5'), ('Elisa Moura', 10), (' ana souza ', 3),
+    ('Bruno Lima', 5),
+]
+
+
+def test_chunked_output_matches_normal(tmp_path, dirs):
+    excel_path = write_workbook(tmp_path / 'notas.xlsx', LISTA, SERIE_LINHAS)
+    jobs = [(SERIE, COLUNA_NOTA, 'P1')]
+    process_workbook(
+        excel_path, jobs, destination_path=dirs['saida'], cache_dir=dirs['cache'], alias_path=dirs['resolucoes'],
+        incremental=False,
+    )
+    saida_blocos = str(tmp_path / 'saida_blocos')
+    process_workbook_chunked(excel_path, jobs, destination_path=saida_blocos, chunk_size=2, alias_path=dirs['resolucoes'])
+
+    normal = read_outputs(dirs['saida'])
+    assert read_outputs(saida_blocos) == normal
+    assert normal[f'{SERIE} - P1.txt'] == ['1001.0\t7,5', '1004.0\t6,5', '1005.0\t10,0', '1002.0\t5,0']
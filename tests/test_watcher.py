@@ -0,0 +1,60 @@
+import os
+
+from conftest import write_workbook
+from watcher import FolderWatcher, is_workbook_file
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_workbook_files_skip_excel_lock_files():
+    assert is_workbook_file('notas.xlsx') and is_workbook_file('NOTAS.XLSM')
+    assert not is_workbook_file('~$notas.xlsx')
+    assert not is_workbook_file('notas.csv')
+
+
+def test_file_is_ready_only_after_it_stops_changing(tmp_path):
+    clock = FakeClock()
+    watcher = FolderWatcher(str(tmp_path), settle=1.0, clock=clock)
+    path = write_workbook(tmp_path / 'notas.xlsx', [(1001, 'ANA SOUZA')], [('Ana Souza', 7)])
+
+    assert watcher.poll() == [] # Visto pela primeira vez
+    clock.now = 0.5
+    assert watcher.poll() == [] # Ainda dentro da espera
+    clock.now = 1.5
+    (ready_path, signature), = watcher.poll()
+    assert ready_path == path
+    watcher.mark_processed(ready_path, signature)
+    clock.now = 3.0
+    assert watcher.poll() == [] # Já processado
+
+    # Salvo de novo: espera estabilizar outra vez
+    write_workbook(tmp_path / 'notas.xlsx', [(1001, 'ANA SOUZA')], [('Ana Souza', 8)])
+    os.utime(path, ns=(signature[1] + 10**9, signature[1] + 10**9))
+    assert watcher.poll() == []
+    clock.now = 4.5
+    assert [ready_path for ready_path, _ in watcher.poll()] == [path]
+
+
+def test_incomplete_copy_is_not_ready(tmp_path):
+    clock = FakeClock()
+    watcher = FolderWatcher(str(tmp_path), settle=1.0, clock=clock)
+    (tmp_path / 'notas.xlsx').write_bytes(b'PK\x03\x04 copia pela metade')
+    watcher.poll()
+    clock.now = 2.0
+    assert watcher.poll() == []
+
+
+def test_skip_existing(tmp_path):
+    clock = FakeClock()
+    write_workbook(tmp_path / 'notas.xlsx', [(1001, 'ANA SOUZA')], [('Ana Souza', 7)])
+    watcher = FolderWatcher(str(tmp_path), settle=1.0, clock=clock)
+    watcher.skip_existing()
+    watcher.poll()
+    clock.now = 2.0
+    assert watcher.poll() == []
@@ -0,0 +1,31 @@
+import pandas as pd
+
+from conftest import COLUNA_NOTA, LISTA_MISTA, SERIE, SERIE_MISTA, read_outputs, write_workbook
+from processing import process_workbook
+from workbook import LINHA_INICIAL_SERIE, PLANILHA_LISTA_ALUNOS, open_workbook
+
+
+def test_read_columns_matches_read_excel(tmp_path):
+    excel_path = write_workbook(tmp_path / 'notas.xlsx', LISTA_MISTA, SERIE_MISTA)
+    workbook = open_workbook(excel_path)
+    try:
+        lista = workbook.read_columns(PLANILHA_LISTA_ALUNOS, [0, 1])
+        serie = workbook.read_columns(SERIE, [0, COLUNA_NOTA], start_row=LINHA_INICIAL_SERIE)
+    finally:
+        workbook.close()
+
+    esperado_lista = pd.read_excel(excel_path, sheet_name=PLANILHA_LISTA_ALUNOS, header=None)
+    esperado_serie = pd.read_excel(excel_path, sheet_name=SERIE, header=None, skiprows=LINHA_INICIAL_SERIE - 1)
+    pd.testing.assert_frame_equal(lista, esperado_lista)
+    pd.testing.assert_frame_equal(serie, esperado_serie[[0, COLUNA_NOTA]].set_axis([0, 1], axis=1))
+
+
+def test_numeric_text_matricula_is_read_as_number(tmp_path, dirs):
+    # Como no pd.read_excel: uma coluna só com textos numéricos vira inteira ('0105' -> 105)
+    excel_path = write_workbook(tmp_path / 'notas.xlsx', [('0105', 'ANA SOUZA'), ('0106', 'BRUNO LIMA')], [('Ana Souza', 7)])
+    for _ in range(2): # A segunda execução lê as colunas do cache de planilhas
+        process_workbook(
+            excel_path, [(SERIE, COLUNA_NOTA, 'P1')], destination_path=dirs['saida'], cache_dir=dirs['cache'],
+            alias_path=dirs['resolucoes'], incremental=False,
+        )
+        assert read_outputs(dirs['saida'])[f'{SERIE} - P1.txt'] == ['105\t7,0']
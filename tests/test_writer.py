@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from writer import OutputWriteError, OutputWriter, StreamingOutputWriter
+
+
+def _files(path):
+    return {entry.name: entry.read_text(encoding='utf-8') for entry in sorted(path.iterdir())}
+
+
+def test_commit_replaces_and_removes_files(tmp_path):
+    (tmp_path / 'principal.txt').write_text('antigo\n', encoding='utf-8')
+    (tmp_path / 'ocorrencias.txt').write_text('antigo\n', encoding='utf-8')
+    writer = OutputWriter(str(tmp_path))
+    writer.write_lines('principal.txt', ['1001\t7,0', '1002\t8,0'])
+    writer.remove('ocorrencias.txt') # Ficaria vazio nesta execução
+    writer.commit()
+    assert _files(tmp_path) == {'principal.txt': '1001\t7,0\n1002\t8,0\n'}
+
+
+def test_failed_commit_keeps_previous_files(tmp_path, monkeypatch):
+    (tmp_path / 'a.txt').write_text('antigo a\n', encoding='utf-8')
+    (tmp_path / 'b.txt').write_text('antigo b\n', encoding='utf-8')
+    writer = OutputWriter(str(tmp_path))
+    writer.write('a.txt', 'novo a\n')
+    writer.write('b.txt', 'novo b\n')
+
+    replace = os.replace
+
+    def falhar_em_b(src, dst):
+        if dst.endswith('b.txt'):
+            raise PermissionError("arquivo aberto no Excel")
+        replace(src, dst)
+
+    monkeypatch.setattr(os, 'replace', falhar_em_b)
+    with pytest.raises(OutputWriteError) as excinfo:
+        writer.commit()
+    assert excinfo.value.file_name == 'b.txt'
+    # Sem temporários esquecidos, e cada arquivo é o antigo ou o novo, inteiro
+    assert _files(tmp_path) == {'a.txt': 'novo a\n', 'b.txt': 'antigo b\n'}
+
+
+def test_streaming_writer_abort_leaves_nothing(tmp_path):
+    (tmp_path / 'principal.txt').write_text('antigo\n', encoding='utf-8')
+    writer = StreamingOutputWriter(str(tmp_path))
+    writer.write('principal.txt', 'novo\n')
+    writer.write('sugestoes.tmp', 'sugestão\n')
+    writer.append_from('principal.txt', 'sugestoes.tmp')
+    writer.abort()
+    assert _files(tmp_path) == {'principal.txt': 'antigo\n'}
+
+    writer.write('principal.txt', 'novo\n')
+    writer.write('sugestoes.tmp', 'sugestão\n')
+    writer.append_from('principal.txt', 'sugestoes.tmp')
+    writer.commit()
+    assert _files(tmp_path) == {'principal.txt': 'novo\nsugestão\n'}
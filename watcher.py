@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+import zipfile
+
+from common import get_output_path
+from parallel import workbook_output_path
+from processing import ProcessingError, process_workbook
+
+# --- Monitoramento de Pasta ---
+#
+# Os professores salvam os arquivos Excel atualizados em uma pasta compartilhada;
+# este modo fica rodando, verifica a pasta a cada `interval` segundos e processa
+# cada arquivo novo ou alterado, com os mesmos trabalhos (série, coluna, prova)
+# para todos. Um arquivo só é processado depois de ficar `settle` segundos sem
+# mudar de tamanho/data e de ser um .xlsx completo, para não ler uma cópia pela
+# metade. Tudo roda no mesmo processo, então a lista de alunos já indexada fica
+# em memória (processing.load_roster) e só é lida de novo quando a planilha
+# 'Lista de Alunos' mudar.
+
+INTERVALO_PADRAO = 0.5 # Segundos entre duas verificações da pasta
+ESPERA_PADRAO = 1.0 # Segundos sem mudanças antes de processar um arquivo
+EXTENSOES_EXCEL = ('.xlsx', '.xlsm')
+
+
+def is_workbook_file(file_name):
+    """Arquivos Excel, sem os arquivos temporários/de bloqueio do Excel (~$...)."""
+    return file_name.lower().endswith(EXTENSOES_EXCEL) and not file_name.startswith(('~$', '.'))
+
+
+class FolderWatcher:
+    """Detecta arquivos Excel novos ou alterados em uma pasta, esperando a gravação terminar."""
+
+    def __init__(self, folder, settle=ESPERA_PADRAO, clock=time.monotonic):
+        self.folder = folder
+        self.settle = settle
+        self.clock = clock
+        self._seen = {} # Caminho -> (tamanho e data, quando foi visto assim pela primeira vez)
+        self._processed = {} # Caminho -> tamanho e data da versão já processada
+
+    def _scan(self):
+        signatures = {}
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if is_workbook_file(entry.name) and entry.is_file():
+                    stat = entry.stat()
+                    signatures[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return signatures
+
+    def skip_existing(self):
+        """Considera já processados os arquivos que estão na pasta agora."""
+        self._processed.update(self._scan())
+
+    def poll(self):
+        """Retorna os (caminho, assinatura) prontos para processar, em ordem de nome."""
+        now = self.clock()
+        signatures = self._scan()
+        for path in [path for path in self._seen if path not in signatures]:
+            del self._seen[path] # Arquivo removido (ou renomeado)
+            self._processed.pop(path, None)
+
+        ready = []
+        for path, signature in sorted(signatures.items()):
+            if self._processed.get(path) == signature:
+                continue
+            seen = self._seen.get(path)
+            if seen is None or seen[0] != signature:
+                self._seen[path] = (signature, now) # Ainda mudando: espera estabilizar
+                continue
+            if now - seen[1] < self.settle:
+                continue
+            if not zipfile.is_zipfile(path):
+                continue # Cópia ainda incompleta (ou arquivo que não é .xlsx)
+            ready.append((path, signature))
+        return ready
+
+    def mark_processed(self, path, signature):
+        self._processed[path] = signature
+
+
+def watch_folder(folder, jobs, destination_path=None, interval=INTERVALO_PADRAO, settle=ESPERA_PADRAO, skip_existing=False,
+                 incremental=True, delta=False, alias_path=None, on_result=None, on_error=None, stop=None):
+    """
+    Monitora a pasta até `stop` (threading.Event) ser acionado, processando cada
+    arquivo Excel novo ou alterado com os trabalhos (série, índice da coluna da
+    nota, prova). Cada arquivo grava em uma subpasta com o seu nome dentro de
+    destination_path (padrão: get_output_path()).
+    on_result(arquivo, resultados, pasta de saída, segundos desde que foi salvo) e
+    on_error(arquivo, erro) informam o andamento; um erro não interrompe o monitoramento.
+    """
+    destination_path = destination_path or get_output_path()
+    stop = stop or threading.Event()
+    watcher = FolderWatcher(folder, settle)
+    if skip_existing:
+        watcher.skip_existing()
+
+    while not stop.is_set():
+        for excel_path, signature in watcher.poll():
+            output_path = workbook_output_path(destination_path, excel_path, True)
+            try:
+                results = process_workbook(
+                    excel_path, jobs, destination_path=output_path, incremental=incremental, delta=delta, alias_path=alias_path,
+                )
+            except ProcessingError as e:
+                if on_error is not None:
+                    on_error(excel_path, e)
+            except Exception as e: # Arquivo apagado ou inválido no meio do caminho: segue monitorando
+                if on_error is not None:
+                    on_error(excel_path, ProcessingError("Erro Geral", f"Ocorreu um erro inesperado: {e}", "Erro: " + str(e)))
+            else:
+                if on_result is not None:
+                    on_result(excel_path, results, output_path, time.time() - signature[1] / 1e9)
+            watcher.mark_processed(excel_path, signature)
+            if stop.is_set():
+                break
+        stop.wait(interval)
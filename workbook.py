@@ -0,0 +1,151 @@
+import itertools
+
+import numpy as np
+import openpyxl
+import pandas as pd
+from openpyxl.cell.cell import ERROR_CODES
+from pandas.errors import EmptyDataError
+from pandas.io.parsers import TextParser
+
+from cache import SheetCache
+
+# --- Leitura Seletiva do Arquivo Excel ---
+#
+# Em vez de carregar planilhas inteiras com pd.read_excel, as linhas são lidas
+# em modo streaming (read_only/values_only) e apenas as colunas pedidas são
+# mantidas. Os valores recebem a mesma conversão que o pandas aplica com o
+# engine openpyxl, e cada coluna passa pela mesma inferência de tipo do
+# pd.read_excel (TextParser), para que o restante do processamento não mude.
+#
+# Com um diretório de cache, as colunas lidas são guardadas no formato colunar
+# (cache.SheetCache) e o .xlsx só é aberto se alguma planilha pedida ainda não
+# estiver lá para a versão atual do arquivo.
+
+LINHA_INICIAL_SERIE = 7 # Os nomes dos alunos começam na linha 7 das planilhas de série
+PLANILHA_LISTA_ALUNOS = 'Lista de Alunos'
+
+
+class WorkbookReader:
+    """Leitor de um arquivo Excel; o arquivo só é aberto na primeira planilha que não estiver em cache."""
+
+    def __init__(self, excel_path, cache_dir=None, stats=None):
+        self.excel_path = excel_path
+        self.sheet_cache = SheetCache(cache_dir) if cache_dir else None
+        self.stats = stats
+        self._workbook = None
+
+    def _open(self):
+        if self._workbook is None:
+            self._workbook = openpyxl.load_workbook(self.excel_path, read_only=True, data_only=True)
+        return self._workbook
+
+    def _count(self, name):
+        if self.stats is not None:
+            self.stats.count(name)
+
+    def read_columns(self, sheet_name, columns, start_row=1):
+        if self.sheet_cache is not None:
+            df = self.sheet_cache.load(self.excel_path, sheet_name, columns, start_row)
+            if df is not None:
+                self._count('cache_planilhas_acertos')
+                return df
+            self._count('cache_planilhas_faltas')
+
+        df = records_to_frame(iter_columns(self._open(), sheet_name, columns, start_row=start_row), len(columns))
+        if self.sheet_cache is not None:
+            self.sheet_cache.store(self.excel_path, sheet_name, columns, start_row, df)
+        return df
+
+    def iter_chunks(self, sheet_name, columns, start_row=1, chunk_size=50000):
+        """
+        Lê as colunas pedidas em blocos de até chunk_size linhas (pipeline em
+        blocos), sem passar pelo cache de planilhas. Cada bloco é a lista das
+        linhas (tuplas de iter_columns); quem lê converte com records_to_frame,
+        como read_columns, ou junta antes a coluna inteira quando o tipo dela
+        importa (matrículas).
+        """
+        records = iter_columns(self._open(), sheet_name, columns, start_row=start_row)
+        while True:
+            chunk = list(itertools.islice(records, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def row_count(self, sheet_name):
+        """Número de linhas informado pela planilha (para o andamento), ou None."""
+        try:
+            return self._open()[sheet_name].max_row
+        except KeyError:
+            return None
+
+    def close(self):
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+
+
+def open_workbook(excel_path, cache_dir=None, stats=None):
+    """Prepara a leitura do arquivo Excel (somente leitura, em streaming), com o cache de planilhas se houver cache_dir."""
+    return WorkbookReader(excel_path, cache_dir, stats)
+
+
+def _convert_value(value):
+    """Converte o valor de uma célula como o pandas faz ao ler com openpyxl."""
+    if value is None:
+        return np.nan
+    if isinstance(value, str) and value in ERROR_CODES:
+        return np.nan
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def records_to_frame(records, n_columns):
+    """
+    Monta o DataFrame das linhas lidas com o TextParser usado pelo pd.read_excel,
+    que infere o tipo de cada coluna: uma coluna só com textos numéricos (ex.:
+    matrícula '0105') vira inteira, e inteiros com células vazias viram float.
+    """
+    try:
+        return TextParser(list(records), header=None, skip_blank_lines=False).read()
+    except EmptyDataError:
+        return pd.DataFrame(columns=range(n_columns))
+
+
+def iter_columns(workbook, sheet_name, columns, start_row=1):
+    """
+    Gera, linha a linha, somente os valores das colunas pedidas (índices base zero).
+    Linhas vazias no final da planilha são descartadas, como no pd.read_excel.
+    """
+    try:
+        worksheet = workbook[sheet_name]
+    except KeyError:
+        raise ValueError(f"Worksheet named '{sheet_name}' not found")
+
+    max_col = max(columns) + 1
+    linhas_vazias = 0 # Linhas vazias pendentes, só emitidas se vier uma linha com dados
+    for row in worksheet.iter_rows(min_row=start_row, max_col=max_col, values_only=True):
+        if all(value is None for value in row):
+            linhas_vazias += 1
+            continue
+        for _ in range(linhas_vazias):
+            yield (np.nan,) * len(columns)
+        linhas_vazias = 0
+
+        row = row + (None,) * (max_col - len(row))
+        yield tuple(_convert_value(row[column]) for column in columns)
+
+
+def read_columns(workbook, sheet_name, columns, start_row=1):
+    """Lê apenas as colunas pedidas de uma planilha para um DataFrame."""
+    return workbook.read_columns(sheet_name, columns, start_row=start_row)
+
+
+def read_serie_sheet(workbook, serie_selecionada, column_note_index):
+    """Lê a coluna de nomes (A) e a coluna da nota de uma planilha de série."""
+    return read_columns(workbook, serie_selecionada, [0, column_note_index], start_row=LINHA_INICIAL_SERIE)
+
+
+def read_roster_sheet(workbook):
+    """Lê matrícula (A) e nome completo (B) da planilha 'Lista de Alunos'."""
+    return read_columns(workbook, PLANILHA_LISTA_ALUNOS, [0, 1])
@@ -0,0 +1,231 @@
+import os
+import secrets
+import shutil
+
+# --- Gravação dos Arquivos de Saída ---
+#
+# Todos os arquivos de um processamento são montados em memória e só gravados
+# no final: cada um vai para um arquivo temporário na própria pasta de destino,
+# que é sincronizado com o disco (fsync) uma única vez e então renomeado por
+# cima do antigo (os.replace). Uma falha no meio nunca deixa um TXT pela metade
+# para o Escolar Manager importar: cada arquivo é o antigo ou o novo, inteiro.
+
+
+class OutputWriteError(Exception):
+    """Falha ao gravar um dos arquivos de saída."""
+
+    def __init__(self, file_name, error):
+        super().__init__(f"{file_name}: {error}")
+        self.file_name = file_name
+        self.error = error
+
+
+class OutputWriter:
+    """Arquivos de saída de um processamento, gravados de uma só vez em commit()."""
+
+    def __init__(self, destination_path):
+        self.destination_path = destination_path
+        self._files = {} # Nome do arquivo -> partes do texto
+        self._removed = [] # Arquivos de uma execução anterior que não valem mais
+
+    def write(self, file_name, text):
+        """Acrescenta texto ao arquivo (em memória)."""
+        self._files.setdefault(file_name, []).append(text)
+        if file_name in self._removed:
+            self._removed.remove(file_name)
+
+    def write_lines(self, file_name, lines):
+        """Acrescenta uma linha por item (cada uma terminada em '\\n')."""
+        self.write(file_name, ''.join(line + '\n' for line in lines))
+
+    def remove(self, file_name):
+        """Apaga, no commit, o arquivo de uma execução anterior (se existir)."""
+        self._files.pop(file_name, None)
+        if file_name not in self._removed:
+            self._removed.append(file_name)
+
+    def contents(self):
+        """Texto de cada arquivo montado até agora (nome -> texto), sem gravar."""
+        return {file_name: ''.join(parts) for file_name, parts in self._files.items()}
+
+    def removed_files(self):
+        """Arquivos que serão apagados no commit."""
+        return list(self._removed)
+
+    def commit(self):
+        """Grava todos os arquivos (temporário + fsync + os.replace) e apaga os que não valem mais."""
+        os.makedirs(self.destination_path, exist_ok=True)
+        temp_paths = {}
+        try:
+            for file_name, parts in self._files.items():
+                temp_paths[file_name] = _write_temp(self.destination_path, file_name, ''.join(parts))
+            for file_name, temp_path in temp_paths.items():
+                try:
+                    os.replace(temp_path, os.path.join(self.destination_path, file_name))
+                except OSError as e:
+                    raise OutputWriteError(file_name, e)
+        except BaseException:
+            for temp_path in temp_paths.values():
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            raise
+
+        for file_name in self._removed:
+            path = os.path.join(self.destination_path, file_name)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                raise OutputWriteError(file_name, e)
+        _fsync_dir(self.destination_path)
+        self._files, self._removed = {}, []
+
+
+class StreamingOutputWriter:
+    """
+    Como o OutputWriter, mas o texto vai direto para os temporários na pasta de
+    destino em vez de ficar em memória (pipeline em blocos, streaming.py). Os
+    arquivos continuam sendo trocados de uma só vez em commit(); abort()
+    descarta os temporários.
+    """
+
+    def __init__(self, destination_path):
+        self.destination_path = destination_path
+        self._files = {} # Nome do arquivo -> (caminho do temporário, arquivo aberto)
+        self._removed = []
+
+    def _file(self, file_name):
+        entry = self._files.get(file_name)
+        if entry is None:
+            os.makedirs(self.destination_path, exist_ok=True)
+            temp_path, fd = _create_temp(self.destination_path, file_name)
+            entry = self._files[file_name] = (temp_path, os.fdopen(fd, 'w+', encoding='utf-8'))
+            if file_name in self._removed:
+                self._removed.remove(file_name)
+        return entry[1]
+
+    def has(self, file_name):
+        """Indica se algo já foi escrito no arquivo."""
+        return file_name in self._files
+
+    def write(self, file_name, text):
+        try:
+            self._file(file_name).write(text)
+        except OSError as e:
+            raise OutputWriteError(file_name, e)
+
+    def write_lines(self, file_name, lines):
+        self.write(file_name, ''.join(line + '\n' for line in lines))
+
+    def append_from(self, file_name, source_name):
+        """Acrescenta ao arquivo todo o texto já escrito em source_name, que é descartado."""
+        if source_name not in self._files:
+            return
+        f = self._file(file_name)
+        source = self._files[source_name][1]
+        try:
+            source.seek(0)
+            shutil.copyfileobj(source, f)
+        except OSError as e:
+            raise OutputWriteError(file_name, e)
+        self._discard(source_name)
+
+    def _discard(self, file_name):
+        temp_path, f = self._files.pop(file_name)
+        f.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    def remove(self, file_name):
+        """Apaga, no commit, o arquivo de uma execução anterior (se existir)."""
+        if file_name in self._files:
+            self._discard(file_name)
+        if file_name not in self._removed:
+            self._removed.append(file_name)
+
+    def commit(self):
+        """Sincroniza os temporários com o disco, troca os arquivos e apaga os que não valem mais."""
+        try:
+            for file_name, (temp_path, f) in self._files.items():
+                try:
+                    f.flush()
+                    os.fsync(f.fileno())
+                    f.close()
+                except OSError as e:
+                    raise OutputWriteError(file_name, e)
+            for file_name, (temp_path, f) in list(self._files.items()):
+                try:
+                    os.replace(temp_path, os.path.join(self.destination_path, file_name))
+                except OSError as e:
+                    raise OutputWriteError(file_name, e)
+                del self._files[file_name]
+        except BaseException:
+            self.abort()
+            raise
+
+        for file_name in self._removed:
+            path = os.path.join(self.destination_path, file_name)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                raise OutputWriteError(file_name, e)
+        if os.path.isdir(self.destination_path):
+            _fsync_dir(self.destination_path)
+        self._removed = []
+
+    def abort(self):
+        """Descarta os temporários (os arquivos anteriores ficam como estavam)."""
+        for file_name in list(self._files):
+            self._discard(file_name)
+        self._removed = []
+
+
+def _create_temp(destination_path, file_name):
+    """Cria um temporário exclusivo ao lado do destino; retorna (caminho, descritor)."""
+    temp_path = os.path.join(destination_path, f".{file_name}.{os.getpid()}.{secrets.token_hex(4)}.tmp")
+    try:
+        # Criado com as permissões de um open() comum (o mkstemp restringe ao dono)
+        fd = os.open(temp_path, os.O_RDWR | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    except OSError as e:
+        raise OutputWriteError(file_name, e)
+    return temp_path, fd
+
+
+def _write_temp(destination_path, file_name, text):
+    """Grava o texto em um temporário ao lado do destino e o sincroniza com o disco."""
+    temp_path, fd = _create_temp(destination_path, file_name)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+    except OSError as e:
+        os.remove(temp_path)
+        raise OutputWriteError(file_name, e)
+    return temp_path
+
+
+def _fsync_dir(path):
+    """Garante que as renomeações chegaram ao disco (não há equivalente no Windows)."""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_text_atomic(destination_path, file_name, text):
+    """Grava um único arquivo de forma atômica."""
+    writer = OutputWriter(destination_path)
+    writer.write(file_name, text)
+    writer.commit()